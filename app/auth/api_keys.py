@@ -0,0 +1,183 @@
+"""
+Chaves de API para integrações (serviço a serviço).
+Uma chave tem 256 bits aleatórios, então basta guardar o SHA-256 dela:
+autenticar custa um hash e uma busca indexada (key_hash é UNIQUE), em vez
+de um bcrypt por login. Os usuários resolvidos ficam em um cache LRU.
+Segue Dependency Inversion Principle - depende das abstrações IApiKeyRepository
+e IUserRepository.
+"""
+import hashlib
+import logging
+import secrets
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+from app.auth.models import ApiKey, User
+from app.auth.repository import IUserRepository
+from app.auth.repository_cache import LRUIndex
+from app.auth.config import auth_config
+
+logger = logging.getLogger(__name__)
+
+# Prefixo das chaves: distingue uma chave de um JWT (que começa com "eyJ") no mesmo cabeçalho Bearer
+API_KEY_PREFIX: str = "erp_"
+# Caracteres do início da chave guardados em claro, para identificá-la em listagens
+_DISPLAY_PREFIX_LENGTH: int = 12
+
+
+def hash_api_key(key: str) -> str:
+    """
+    SHA-256 (hex) da chave.
+    Sem salt nem bcrypt: com 256 bits de entropia, força bruta sobre o hash é inviável.
+    """
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def generate_api_key() -> str:
+    """Nova chave: prefixo + 32 bytes aleatórios em base64 url-safe"""
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+class IApiKeyRepository(ABC):
+    """
+    Interface do repositório de chaves de API.
+    Segue Interface Segregation Principle - interface específica e focada.
+    """
+
+    @abstractmethod
+    async def create(self, user_id: int, name: str, prefix: str, key_hash: str) -> ApiKey:
+        """Guarda uma nova chave (somente o hash)"""
+        pass
+
+    @abstractmethod
+    async def get_by_hash(self, key_hash: str) -> Optional[ApiKey]:
+        """Busca a chave pelo hash (índice UNIQUE), inclusive revogada"""
+        pass
+
+    @abstractmethod
+    async def list_by_user(self, user_id: int) -> list[ApiKey]:
+        """Chaves do usuário, em ordem de criação"""
+        pass
+
+    @abstractmethod
+    async def revoke(self, key_id: int, user_id: int) -> Optional[ApiKey]:
+        """Revoga a chave do usuário; None se não existir ou for de outro usuário"""
+        pass
+
+    async def close(self) -> None:
+        """Libera recursos (conexões, clientes HTTP). Padrão: nada a liberar"""
+        return None
+
+
+class InMemoryApiKeyRepository(IApiKeyRepository):
+    """
+    Implementação em memória do repositório de chaves.
+    Segue Liskov Substitution Principle - pode substituir IApiKeyRepository.
+    """
+
+    def __init__(self) -> None:
+        self._keys: dict[int, ApiKey] = {}
+        self._keys_by_hash: dict[str, ApiKey] = {}
+        self._next_id: int = 1
+
+    async def create(self, user_id: int, name: str, prefix: str, key_hash: str) -> ApiKey:
+        """Cria a chave em memória"""
+        api_key: ApiKey = ApiKey(id=self._next_id, user_id=user_id, name=name, prefix=prefix, key_hash=key_hash)
+        self._keys[api_key.id] = api_key
+        self._keys_by_hash[key_hash] = api_key
+        self._next_id += 1
+        return api_key
+
+    async def get_by_hash(self, key_hash: str) -> Optional[ApiKey]:
+        """Busca a chave pelo hash"""
+        return self._keys_by_hash.get(key_hash)
+
+    async def list_by_user(self, user_id: int) -> list[ApiKey]:
+        """Chaves do usuário (varredura linear: o modo em memória é para desenvolvimento)"""
+        return [api_key for api_key in self._keys.values() if api_key.user_id == user_id]
+
+    async def revoke(self, key_id: int, user_id: int) -> Optional[ApiKey]:
+        """Marca a chave como revogada"""
+        api_key: Optional[ApiKey] = self._keys.get(key_id)
+        if api_key is None or api_key.user_id != user_id:
+            return None
+        if api_key.revoked_at is None:
+            api_key.revoked_at = datetime.utcnow()
+        return api_key
+
+
+class ApiKeyService:
+    """
+    Emissão, revogação e autenticação de chaves de API.
+    A chave autentica como o usuário que a emitiu. O usuário resolvido (ou a
+    ausência dele, para chaves inválidas) fica em cache por API_KEY_CACHE_TTL_SECONDS;
+    revogar uma chave a remove do cache desta instância na hora.
+    """
+
+    def __init__(
+        self,
+        api_key_repository: IApiKeyRepository,
+        user_repository: IUserRepository,
+        cache_size: Optional[int] = None,
+        cache_ttl_seconds: Optional[float] = None
+    ) -> None:
+        self.api_key_repository: IApiKeyRepository = api_key_repository
+        self.user_repository: IUserRepository = user_repository
+        size: int = cache_size if cache_size is not None else auth_config.API_KEY_CACHE_SIZE
+        self.cache_ttl_seconds: float = (
+            cache_ttl_seconds if cache_ttl_seconds is not None else auth_config.API_KEY_CACHE_TTL_SECONDS
+        )
+        self._principals: LRUIndex[str] = LRUIndex(size)
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Proporção de autenticações atendidas pelo cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def issue(self, user_id: int, name: str) -> tuple[str, ApiKey]:
+        """Cria uma chave para o usuário; a chave em claro só existe neste retorno"""
+        key: str = generate_api_key()
+        api_key: ApiKey = await self.api_key_repository.create(
+            user_id=user_id, name=name, prefix=key[:_DISPLAY_PREFIX_LENGTH], key_hash=hash_api_key(key)
+        )
+        logger.info("Chave de API emitida", extra={"user_id": user_id, "api_key_id": api_key.id})
+        return key, api_key
+
+    async def list_keys(self, user_id: int) -> list[ApiKey]:
+        """Chaves do usuário, inclusive revogadas"""
+        return await self.api_key_repository.list_by_user(user_id)
+
+    async def revoke(self, user_id: int, key_id: int) -> bool:
+        """Revoga a chave do usuário; False se ela não existir"""
+        api_key: Optional[ApiKey] = await self.api_key_repository.revoke(key_id, user_id)
+        if api_key is None:
+            return False
+        self._principals.pop(api_key.key_hash)
+        logger.info("Chave de API revogada", extra={"user_id": user_id, "api_key_id": key_id})
+        return True
+
+    async def authenticate(self, key: str) -> Optional[User]:
+        """Usuário dono da chave, ou None se ela for inválida ou estiver revogada"""
+        if not key.startswith(API_KEY_PREFIX):
+            return None
+        key_hash: str = hash_api_key(key)
+        found, user = self._principals.get(key_hash)
+        if found:
+            self.hits += 1
+            return user
+
+        self.misses += 1
+        api_key: Optional[ApiKey] = await self.api_key_repository.get_by_hash(key_hash)
+        user = None
+        if api_key is not None and api_key.revoked_at is None:
+            user = await self.user_repository.get_by_id(api_key.user_id)
+        self._principals.put(key_hash, user, self.cache_ttl_seconds)
+        return user
+
+    async def close(self) -> None:
+        """Esvazia o cache e libera o repositório de chaves"""
+        self._principals.clear()
+        await self.api_key_repository.close()
@@ -0,0 +1,312 @@
+"""
+Importação em massa de usuários a partir de NDJSON ou CSV.
+Lê a entrada em streaming, valida linha a linha com UserCreate, faz o hash
+das senhas em paralelo no pool e insere em lotes via IUserRepository.create_many.
+Os resultados por linha também saem em streaming (NDJSON), então o arquivo
+nunca é mantido inteiro em memória.
+
+CLI: python -m app.auth.bulk_import usuarios.ndjson [--format csv] [--batch-size 500]
+"""
+import asyncio
+import csv
+import json
+import logging
+from typing import Any, AsyncIterator, Optional
+from pydantic import ValidationError
+from app.auth.config import auth_config
+from app.auth.hashing import HashingQueueFullError, PasswordHasher
+from app.auth.models import NewUser, User
+from app.auth.repository import IUserRepository, RepositoryUnavailableError
+from app.auth.schemas import UserCreate
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+# (número da linha, campos do registro ou None, erro de parsing ou None)
+RawRecord = tuple[int, Optional[dict[str, Any]], Optional[str]]
+
+# (número da linha, texto ou None, erro ou None)
+RawLine = tuple[int, Optional[str], Optional[str]]
+
+INVALID_ENCODING = "Linha não está em UTF-8"
+LINE_TOO_LONG = "Linha maior que o limite (USER_IMPORT_MAX_LINE_BYTES)"
+UNCLOSED_QUOTE = "Campo entre aspas não foi fechado"
+
+
+def _decode_line(raw: bytearray, line_number: int) -> RawLine:
+    """Decodifica a linha; inválida se não for UTF-8 (a importação segue na próxima)"""
+    try:
+        return line_number, raw.decode("utf-8-sig" if line_number == 1 else "utf-8").rstrip("\r"), None
+    except UnicodeDecodeError:
+        return line_number, None, INVALID_ENCODING
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: Optional[int] = None) -> AsyncIterator[RawLine]:
+    """
+    Quebra um stream de bytes em linhas numeradas, sem acumular o conteúdo.
+    Cada linha guarda no máximo `max_line_bytes`: uma linha maior é descartada
+    até a próxima quebra e sai como inválida, assim como as que não são UTF-8.
+    """
+    limit: int = max_line_bytes if max_line_bytes is not None else auth_config.USER_IMPORT_MAX_LINE_BYTES
+    buffer = bytearray()
+    too_long = False
+    line_number = 0
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not too_long:
+                    buffer += chunk[start:]
+                    if len(buffer) > limit:
+                        too_long = True
+                        buffer.clear()
+                break
+            line_number += 1
+            if not too_long:
+                buffer += chunk[start:end]
+            if too_long or len(buffer) > limit:
+                yield line_number, None, LINE_TOO_LONG
+            else:
+                yield _decode_line(buffer, line_number)
+            buffer.clear()
+            too_long = False
+            start = end + 1
+    if too_long:
+        yield line_number + 1, None, LINE_TOO_LONG
+    elif buffer:
+        yield _decode_line(buffer, line_number + 1)
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[RawRecord]:
+    """Um objeto JSON por linha; linhas em branco são ignoradas"""
+    async for line_number, line, error in iter_lines(chunks):
+        if line is None:
+            yield line_number, None, error
+            continue
+        if not line.strip():
+            continue
+        try:
+            data: Any = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, "Cada linha deve ser um objeto JSON"
+            continue
+        yield line_number, data, None
+
+
+async def iter_csv(chunks: AsyncIterator[bytes], max_record_bytes: Optional[int] = None) -> AsyncIterator[RawRecord]:
+    """
+    CSV com cabeçalho (email,name,password); campos entre aspas podem ter quebras de linha.
+    Um registro de várias linhas vai até `max_record_bytes`: passado o limite
+    (aspas sem fechamento), é reportado como inválido e a leitura recomeça na
+    linha seguinte, sem esperar o fim do arquivo.
+    """
+    limit: int = max_record_bytes if max_record_bytes is not None else auth_config.USER_IMPORT_MAX_LINE_BYTES
+    header: Optional[list[str]] = None
+    pending: list[str] = []
+    pending_size = 0
+    quotes = 0
+    start_line = 0
+    async for line_number, line, error in iter_lines(chunks, limit):
+        if line is None:
+            # Descarta o registro inteiro (inclusive um campo entre aspas em aberto)
+            yield (start_line if pending else line_number), None, error
+            pending, pending_size, quotes = [], 0, 0
+            continue
+        if not pending:
+            start_line = line_number
+            if not line.strip():
+                continue
+        pending.append(line)
+        pending_size += len(line) + 1
+        quotes += line.count('"')
+        if quotes % 2:
+            # Campo entre aspas ainda aberto: o registro continua na próxima linha
+            if pending_size > limit:
+                yield start_line, None, UNCLOSED_QUOTE
+                pending, pending_size, quotes = [], 0, 0
+            continue
+        row = next(csv.reader(["\n".join(pending)]))
+        pending, pending_size, quotes = [], 0, 0
+        if header is None:
+            header = [column.strip() for column in row]
+            continue
+        if len(row) != len(header):
+            yield start_line, None, f"Esperadas {len(header)} colunas, encontradas {len(row)}"
+            continue
+        yield start_line, dict(zip(header, row)), None
+    if pending:
+        yield start_line, None, UNCLOSED_QUOTE
+
+
+def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[RawRecord]:
+    """Seleciona o parser pelo formato"""
+    if fmt == "csv":
+        return iter_csv(chunks)
+    if fmt == "ndjson":
+        return iter_ndjson(chunks)
+    raise ValueError(f"Formato inválido: {fmt} (use {' ou '.join(FORMATS)})")
+
+
+class UserImporter:
+    """
+    Pipeline de importação: valida, faz o hash em paralelo e insere em lotes.
+    Cada linha gera um resultado: created, duplicate, invalid ou error.
+    Se o backend falhar em um lote, as linhas dele saem como error e a
+    importação para; o resumo final sai sempre, com "aborted": true nesse caso.
+    """
+
+    def __init__(
+        self,
+        user_repository: IUserRepository,
+        password_hasher: PasswordHasher,
+        batch_size: Optional[int] = None
+    ) -> None:
+        self.user_repository: IUserRepository = user_repository
+        self.password_hasher: PasswordHasher = password_hasher
+        self.batch_size: int = max(1, batch_size or auth_config.USER_IMPORT_BATCH_SIZE)
+        # Mantém no máximo um hash por worker em andamento, sem encher a fila do pool
+        self._hash_slots: asyncio.Semaphore = asyncio.Semaphore(password_hasher.workers)
+        self.aborted: bool = False
+
+    async def run(self, records: AsyncIterator[RawRecord]) -> AsyncIterator[dict[str, Any]]:
+        """Processa os registros e produz um resultado por linha e um resumo final"""
+        summary: dict[str, int] = {"created": 0, "duplicate": 0, "invalid": 0, "error": 0}
+        batch: list[tuple[int, Optional[UserCreate], Optional[dict[str, Any]]]] = []
+
+        async for line_number, data, error in records:
+            if error is not None or data is None:
+                batch.append((line_number, None, self._invalid(line_number, [error or "Registro vazio"])))
+            else:
+                try:
+                    batch.append((line_number, UserCreate.model_validate(data), None))
+                except ValidationError as e:
+                    batch.append((line_number, None, self._invalid(line_number, self._errors(e))))
+
+            if len(batch) >= self.batch_size:
+                async for result in self._flush(batch, summary):
+                    yield result
+                batch = []
+                if self.aborted:
+                    yield {"summary": summary, "aborted": True}
+                    return
+
+        async for result in self._flush(batch, summary):
+            yield result
+        yield {"summary": summary, "aborted": True} if self.aborted else {"summary": summary}
+
+    async def _flush(
+        self,
+        batch: list[tuple[int, Optional[UserCreate], Optional[dict[str, Any]]]],
+        summary: dict[str, int]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Insere os registros válidos do lote e emite os resultados na ordem de entrada"""
+        valid = [user for _, user, _ in batch if user is not None]
+        failure: Optional[str] = None
+        created: list[Optional[User]] = []
+        try:
+            hashes = await asyncio.gather(*(self._hash(user.password) for user in valid))
+            created = await self.user_repository.create_many([
+                NewUser(email=user.email, name=user.name, hashed_password=hashed)
+                for user, hashed in zip(valid, hashes)
+            ]) if valid else []
+        except RepositoryUnavailableError as e:
+            failure = str(e)
+        except Exception:
+            logger.exception("Falha ao inserir lote da importação em massa")
+            failure = "Falha ao gravar no serviço de usuários"
+        if failure is not None:
+            self.aborted = True
+
+        outcomes = iter(created)
+        for line_number, user, invalid in batch:
+            if invalid is not None:
+                summary["invalid"] += 1
+                yield invalid
+                continue
+            assert user is not None
+            if failure is not None:
+                summary["error"] += 1
+                yield {"line": line_number, "status": "error", "email": user.email, "error": failure}
+                continue
+            created_user = next(outcomes)
+            if created_user is None:
+                summary["duplicate"] += 1
+                yield {"line": line_number, "status": "duplicate", "email": user.email,
+                       "error": "Email já está cadastrado"}
+            else:
+                summary["created"] += 1
+                yield {"line": line_number, "status": "created", "email": created_user.email,
+                       "id": created_user.id}
+
+    async def _hash(self, password: str) -> str:
+        """Hash no pool; se a fila estiver cheia por outras requisições, espera e tenta de novo"""
+        async with self._hash_slots:
+            while True:
+                try:
+                    return await self.password_hasher.hash(password)
+                except HashingQueueFullError:
+                    if self.password_hasher.closed:
+                        # Shutdown: não adianta esperar, o lote falha e a importação para
+                        raise
+                    await asyncio.sleep(0.05)
+
+    def _invalid(self, line_number: int, errors: list[str]) -> dict[str, Any]:
+        """Resultado de uma linha rejeitada"""
+        return {"line": line_number, "status": "invalid", "errors": errors}
+
+    def _errors(self, error: ValidationError) -> list[str]:
+        """Mensagens de validação no formato campo: mensagem"""
+        return [
+            f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+            for item in error.errors()
+        ]
+
+
+async def _read_file(path: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Lê o arquivo (ou stdin com '-') em blocos"""
+    import sys
+
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        while chunk := stream.read(chunk_size):
+            yield chunk
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+async def _main(path: str, fmt: str, batch_size: Optional[int]) -> None:
+    from app.auth.dependencies import build_user_repository
+
+    # Sem setup_logging, avisos do repositório vão para stderr; stdout fica só com os resultados
+    user_repository = build_user_repository()
+    password_hasher = PasswordHasher()
+    try:
+        importer = UserImporter(user_repository, password_hasher, batch_size)
+        async for result in importer.run(iter_records(_read_file(path), fmt)):
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    finally:
+        await user_repository.close()
+        password_hasher.close()
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importa usuários em massa (NDJSON ou CSV)")
+    parser.add_argument("path", help="arquivo de entrada ('-' para stdin)")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="padrão: pela extensão do arquivo")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    fmt: str = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    asyncio.run(_main(args.path, fmt, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
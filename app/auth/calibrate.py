@@ -0,0 +1,27 @@
+"""
+Calibra o custo do bcrypt para esta máquina.
+Execute: python -m app.auth.calibrate [--target-ms 250]
+
+Imprime o maior BCRYPT_ROUNDS cujo hash fica dentro do tempo alvo.
+Hashes existentes com outro custo são migrados no próximo login bem-sucedido.
+"""
+import argparse
+from app.auth.config import auth_config
+from app.auth.hashing import calibrate_rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibra BCRYPT_ROUNDS para um tempo alvo de hash")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="tempo máximo por hash (ms)")
+    parser.add_argument("--min-rounds", type=int, default=4)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    args = parser.parse_args()
+
+    rounds, elapsed_ms = calibrate_rounds(args.target_ms, args.min_rounds, args.max_rounds)
+    print(f"Custo atual (BCRYPT_ROUNDS): {auth_config.BCRYPT_ROUNDS}")
+    print(f"Custo recomendado para {args.target_ms:.0f} ms: {rounds} ({elapsed_ms:.1f} ms medidos)")
+    print(f"BCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Limites de concorrência por classe de rota, com descarte de carga.
+As rotas que fazem bcrypt (register, login, importação) e as rotas baratas de
+token (me, refresh, logout, introspecção, chaves de API) têm orçamentos separados: um pico
+de logins não aumenta a latência de /auth/me. Acima do limite, a requisição
+espera em uma fila limitada por um prazo; com a fila cheia ou o prazo
+esgotado, responde 503 com Retry-After na hora, antes de ler o corpo.
+"""
+import asyncio
+import math
+from collections import deque
+from typing import Optional
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.auth.config import auth_config
+from app.metrics import registry as metrics_registry
+
+ROUTE_CLASS_HASH: str = "hash"
+ROUTE_CLASS_TOKEN: str = "token"
+
+# Caminho (ou prefixo, para rotas com parâmetro) -> classe de rota
+_ROUTE_CLASSES: tuple[tuple[str, str], ...] = (
+    ("/auth/register", ROUTE_CLASS_HASH),
+    ("/auth/login", ROUTE_CLASS_HASH),
+    ("/auth/users/import", ROUTE_CLASS_HASH),
+    ("/auth/me", ROUTE_CLASS_TOKEN),
+    ("/auth/refresh", ROUTE_CLASS_TOKEN),
+    ("/auth/logout", ROUTE_CLASS_TOKEN),
+    ("/auth/api-keys", ROUTE_CLASS_TOKEN),
+    ("/auth/introspect", ROUTE_CLASS_TOKEN),
+)
+
+ROUTE_REJECTED = metrics_registry.counter(
+    "route_concurrency_rejected_total",
+    "Requisições recusadas com 503 pelo limite de concorrência (fila cheia ou prazo na fila)",
+    ("route_class", "reason"),
+)
+
+
+class ConcurrencyLimitExceededError(RuntimeError):
+    """Sem vaga na classe de rota (fila cheia ou prazo de espera esgotado)"""
+
+    def __init__(
+        self,
+        message: str = "Servidor ocupado, tente novamente em instantes",
+        retry_after: float = 1.0
+    ) -> None:
+        super().__init__(message)
+        self.retry_after: float = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Valor do cabeçalho Retry-After (segundos inteiros, mínimo 1)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def route_class(path: str) -> Optional[str]:
+    """Classe de rota do caminho; None para rotas sem limite"""
+    for prefix, name in _ROUTE_CLASSES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return name
+    return None
+
+
+class ConcurrencyLimiter:
+    """
+    No máximo `limit` requisições ao mesmo tempo; até `max_queue` esperam, em
+    ordem de chegada, por no máximo `queue_timeout` segundos.
+    Quem libera uma vaga a entrega direto ao primeiro da fila, então uma
+    requisição nova não passa na frente de quem já esperava.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float) -> None:
+        self.name: str = name
+        self.limit: int = max(1, limit)
+        self.max_queue: int = max(0, max_queue)
+        self.queue_timeout: float = queue_timeout
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self.in_flight: int = 0
+        self.rejected: int = 0
+        self.timed_out: int = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Requisições esperando uma vaga"""
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """Ocupa uma vaga ou levanta ConcurrencyLimitExceededError"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            ROUTE_REJECTED.inc(1, self.name, "queue_full")
+            raise ConcurrencyLimitExceededError()
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # A vaga chegou junto com o prazo: fica com ela em vez de perdê-la
+                return
+            self.timed_out += 1
+            ROUTE_REJECTED.inc(1, self.name, "deadline")
+            raise ConcurrencyLimitExceededError(retry_after=self.queue_timeout) from None
+        except BaseException:
+            # Cancelada (cliente desconectou) depois de receber a vaga: repassa para o próximo
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                self._remove(waiter)
+
+    def release(self) -> None:
+        """Libera a vaga, entregando-a ao primeiro da fila que ainda espera"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _remove(self, waiter: asyncio.Future[None]) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Middleware ASGI que aplica o limitador da classe de cada rota.
+    Os limitadores ficam em app.state (criados no lifespan, ver init_auth_state);
+    sem eles, a requisição passa direto. A vaga é mantida até o fim da resposta,
+    inclusive do corpo em streaming.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        name: Optional[str] = route_class(scope["path"])
+        limiters: Optional[dict[str, ConcurrencyLimiter]] = (
+            getattr(scope["app"].state, "route_limiters", None) if name is not None and "app" in scope else None
+        )
+        limiter: Optional[ConcurrencyLimiter] = limiters.get(name) if limiters and name is not None else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except ConcurrencyLimitExceededError as e:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": str(e)},
+                headers={"Retry-After": e.retry_after_header},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+def build_route_limiters() -> dict[str, ConcurrencyLimiter]:
+    """Limitadores das classes de rota configurados em AuthConfig"""
+    return {
+        ROUTE_CLASS_HASH: ConcurrencyLimiter(
+            ROUTE_CLASS_HASH,
+            auth_config.HASH_ROUTES_MAX_CONCURRENCY,
+            auth_config.HASH_ROUTES_MAX_QUEUE,
+            auth_config.HASH_ROUTES_QUEUE_TIMEOUT_SECONDS,
+        ),
+        ROUTE_CLASS_TOKEN: ConcurrencyLimiter(
+            ROUTE_CLASS_TOKEN,
+            auth_config.TOKEN_ROUTES_MAX_CONCURRENCY,
+            auth_config.TOKEN_ROUTES_MAX_QUEUE,
+            auth_config.TOKEN_ROUTES_QUEUE_TIMEOUT_SECONDS,
+        ),
+    }
@@ -4,10 +4,15 @@ Em produção, essas configurações devem vir de variáveis de ambiente.
 """
 import os
 from typing import Optional
-from dotenv import load_dotenv
+from app.startup import load_environment
 
-# Carrega variáveis de ambiente do arquivo .env ANTES de ler as variáveis
-load_dotenv()
+# Carrega variáveis de ambiente do arquivo .env ANTES de ler as variáveis (no-op se app.main já carregou)
+load_environment()
+
+
+# Custos aceitos pelo bcrypt.gensalt
+BCRYPT_MIN_ROUNDS: int = 4
+BCRYPT_MAX_ROUNDS: int = 31
 
 
 class AuthConfig:
@@ -15,12 +20,154 @@ class AuthConfig:
 
     SECRET_KEY: str
     ALGORITHM: str
+    JWT_SIGNING_KEYS: str
+    JWKS_CACHE_MAX_AGE_SECONDS: int
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    USER_REPOSITORY_BACKEND: str
+    SQLITE_PATH: str
+    SQLITE_POOL_SIZE: int
+    SQLITE_BUSY_TIMEOUT: float
+    USER_REPOSITORY_FALLBACK_TO_MEMORY: bool
+    REPOSITORY_CALL_TIMEOUT_SECONDS: float
+    CIRCUIT_BREAKER_ENABLED: bool
+    CIRCUIT_BREAKER_FAILURE_RATE: float
+    CIRCUIT_BREAKER_MIN_CALLS: int
+    CIRCUIT_BREAKER_WINDOW: int
+    CIRCUIT_BREAKER_OPEN_SECONDS: float
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int
+    REPOSITORY_STALE_CACHE_SIZE: int
+    REPOSITORY_STALE_TTL_SECONDS: float
+    PASSWORD_HASHER_MODE: str
+    PASSWORD_HASHER_WORKERS: int
+    PASSWORD_HASHER_MAX_QUEUE: int
+    BCRYPT_ROUNDS: int
+    TOKEN_CACHE_SIZE: int
+    TOKEN_CACHE_TTL_SECONDS: float
+    AUTH_STATELESS: bool
+    USER_CACHE_ENABLED: bool
+    USER_LOOKUP_BATCHING: bool
+    USER_LOOKUP_MAX_BATCH: int
+    USER_IMPORT_BATCH_SIZE: int
+    USER_IMPORT_MAX_LINE_BYTES: int
+    USER_IMPORT_ADMIN_EMAILS: frozenset[str]
+    USER_CACHE_SIZE: int
+    USER_CACHE_TTL_SECONDS: float
+    USER_CACHE_NEGATIVE_TTL_SECONDS: float
+    LOGIN_RATE_LIMIT_ENABLED: bool
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float
+    LOGIN_RATE_LIMIT_PER_EMAIL: int
+    LOGIN_RATE_LIMIT_PER_IP: int
+    LOGIN_RATE_LIMIT_MAX_KEYS: int
+    TRUST_PROXY_HEADERS: bool
+    TRUSTED_PROXY_HOPS: int
+    FAST_JSON_RESPONSES: bool
+    REFRESH_TOKEN_EXPIRE_DAYS: int
+    REVOCATION_BLOOM_CAPACITY: int
+    REVOCATION_BLOOM_ERROR_RATE: float
+    API_KEY_CACHE_SIZE: int
+    API_KEY_CACHE_TTL_SECONDS: float
+    CONCURRENCY_LIMITS_ENABLED: bool
+    HASH_ROUTES_MAX_CONCURRENCY: int
+    HASH_ROUTES_MAX_QUEUE: int
+    HASH_ROUTES_QUEUE_TIMEOUT_SECONDS: float
+    TOKEN_ROUTES_MAX_CONCURRENCY: int
+    TOKEN_ROUTES_MAX_QUEUE: int
+    TOKEN_ROUTES_QUEUE_TIMEOUT_SECONDS: float
+    INTROSPECT_MAX_TOKENS: int
 
     def __init__(self) -> None:
         self.SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
+        # HS256 (SECRET_KEY compartilhado) ou RS256/ES256 (e variantes 384/512), com chaves públicas no JWKS
         self.ALGORITHM = os.getenv("ALGORITHM", "HS256")
+        # Algoritmos assimétricos: "kid:caminho.pem,..."; a primeira (privada) assina, as demais só verificam
+        self.JWT_SIGNING_KEYS = os.getenv("JWT_SIGNING_KEYS", "")
+        # Cache-Control de /.well-known/jwks.json
+        self.JWKS_CACHE_MAX_AGE_SECONDS = int(os.getenv("JWKS_CACHE_MAX_AGE_SECONDS", "86400"))
         self.ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+        # auto (PostgREST assíncrono se Supabase configurado, senão memória),
+        # postgrest, supabase (cliente síncrono), sqlite (arquivo local) ou memory
+        self.USER_REPOSITORY_BACKEND = os.getenv("USER_REPOSITORY_BACKEND", "auto").lower()
+        # Backend sqlite: arquivo do banco, conexões (threads) e espera por lock de escrita
+        self.SQLITE_PATH = os.getenv("SQLITE_PATH", "users.db")
+        self.SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "4"))
+        self.SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))
+        # Se o Supabase configurado falhar no startup: usa memória (true) ou não sobe (false)
+        self.USER_REPOSITORY_FALLBACK_TO_MEMORY = os.getenv(
+            "USER_REPOSITORY_FALLBACK_TO_MEMORY", "true"
+        ).lower() in ("1", "true", "yes")
+        # Prazo por chamada e circuit breaker em volta do repositório persistente (0 = sem prazo)
+        self.REPOSITORY_CALL_TIMEOUT_SECONDS = float(os.getenv("REPOSITORY_CALL_TIMEOUT_SECONDS", "3"))
+        self.CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+        self.CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "10"))
+        self.CIRCUIT_BREAKER_WINDOW = int(os.getenv("CIRCUIT_BREAKER_WINDOW", "20"))
+        self.CIRCUIT_BREAKER_OPEN_SECONDS = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "15"))
+        self.CIRCUIT_BREAKER_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_CALLS", "1"))
+        # Cópia antiga de usuários para get_by_id com o circuito aberto (0 desativa)
+        self.REPOSITORY_STALE_CACHE_SIZE = int(os.getenv("REPOSITORY_STALE_CACHE_SIZE", "0"))
+        self.REPOSITORY_STALE_TTL_SECONDS = float(os.getenv("REPOSITORY_STALE_TTL_SECONDS", "600"))
+        # Pool do bcrypt: thread, process ou inline; 0 workers = automático
+        self.PASSWORD_HASHER_MODE = os.getenv("PASSWORD_HASHER_MODE", "thread").lower()
+        self.PASSWORD_HASHER_WORKERS = int(os.getenv("PASSWORD_HASHER_WORKERS", "0"))
+        self.PASSWORD_HASHER_MAX_QUEUE = int(os.getenv("PASSWORD_HASHER_MAX_QUEUE", "64"))
+        # Custo (log2 das iterações) do bcrypt; hashes com outro custo são refeitos no login
+        self.BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+        if not BCRYPT_MIN_ROUNDS <= self.BCRYPT_ROUNDS <= BCRYPT_MAX_ROUNDS:
+            # Falha no startup, não no primeiro register/login (dentro do bcrypt.gensalt)
+            raise ValueError(
+                f"BCRYPT_ROUNDS inválido: {self.BCRYPT_ROUNDS} (use de {BCRYPT_MIN_ROUNDS} a {BCRYPT_MAX_ROUNDS})"
+            )
+        # Cache de tokens JWT já verificados (0 desativa); TTL limitado pelo exp do token
+        self.TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+        self.TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+        # Modo stateless: get_current_user usa só as claims do token, sem ir ao repositório
+        self.AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() in ("1", "true", "yes")
+        # Cache read-through de usuários na frente do repositório (opt-in)
+        self.USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+        self.USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+        self.USER_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("USER_CACHE_NEGATIVE_TTL_SECONDS", "5"))
+        # Coalescência de buscas concorrentes em consultas em lote (in.(...))
+        self.USER_LOOKUP_BATCHING = os.getenv("USER_LOOKUP_BATCHING", "false").lower() in ("1", "true", "yes")
+        self.USER_LOOKUP_MAX_BATCH = int(os.getenv("USER_LOOKUP_MAX_BATCH", "100"))
+        # Registros por INSERT na importação em massa
+        self.USER_IMPORT_BATCH_SIZE = int(os.getenv("USER_IMPORT_BATCH_SIZE", "500"))
+        # Tamanho máximo de uma linha e de um registro CSV de várias linhas na importação; maiores viram "invalid"
+        self.USER_IMPORT_MAX_LINE_BYTES = int(os.getenv("USER_IMPORT_MAX_LINE_BYTES", "65536"))
+        # Emails (separados por vírgula) autorizados a usar /auth/users/import; vazio desativa a rota
+        self.USER_IMPORT_ADMIN_EMAILS = frozenset(
+            email.strip().lower() for email in os.getenv("USER_IMPORT_ADMIN_EMAILS", "").split(",") if email.strip()
+        )
+        # Limite de tentativas de login por email e por IP (janela deslizante), antes do bcrypt
+        self.LOGIN_RATE_LIMIT_ENABLED = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.LOGIN_RATE_LIMIT_WINDOW_SECONDS = float(os.getenv("LOGIN_RATE_LIMIT_WINDOW_SECONDS", "60"))
+        self.LOGIN_RATE_LIMIT_PER_EMAIL = int(os.getenv("LOGIN_RATE_LIMIT_PER_EMAIL", "10"))
+        self.LOGIN_RATE_LIMIT_PER_IP = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "100"))
+        self.LOGIN_RATE_LIMIT_MAX_KEYS = int(os.getenv("LOGIN_RATE_LIMIT_MAX_KEYS", "100000"))
+        # Usa X-Forwarded-For como IP do cliente (atrás de proxy reverso, como no Render).
+        # Lê a entrada TRUSTED_PROXY_HOPS posições a partir da direita: as da esquerda vêm do cliente
+        self.TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() in ("1", "true", "yes")
+        self.TRUSTED_PROXY_HOPS = max(1, int(os.getenv("TRUSTED_PROXY_HOPS", "1")))
+        # /auth/me e /auth/login devolvem JSON já serializado (orjson se instalado), sem revalidar o modelo
+        self.FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+        # Refresh tokens (rotação a cada uso) e índice de jti revogados com filtro de Bloom
+        self.REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+        self.REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+        self.REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.01"))
+        # Cache dos usuários resolvidos por chave de API (revogação em outra instância vale após o TTL)
+        self.API_KEY_CACHE_SIZE = int(os.getenv("API_KEY_CACHE_SIZE", "10000"))
+        self.API_KEY_CACHE_TTL_SECONDS = float(os.getenv("API_KEY_CACHE_TTL_SECONDS", "60"))
+        # Concorrência por classe de rota: bcrypt (register, login, importação) e tokens (me, refresh...).
+        # Acima do limite, fila com prazo; fila cheia ou prazo esgotado -> 503 com Retry-After
+        self.CONCURRENCY_LIMITS_ENABLED = os.getenv("CONCURRENCY_LIMITS_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.HASH_ROUTES_MAX_CONCURRENCY = int(os.getenv("HASH_ROUTES_MAX_CONCURRENCY", "16"))
+        self.HASH_ROUTES_MAX_QUEUE = int(os.getenv("HASH_ROUTES_MAX_QUEUE", "64"))
+        self.HASH_ROUTES_QUEUE_TIMEOUT_SECONDS = float(os.getenv("HASH_ROUTES_QUEUE_TIMEOUT_SECONDS", "2"))
+        self.TOKEN_ROUTES_MAX_CONCURRENCY = int(os.getenv("TOKEN_ROUTES_MAX_CONCURRENCY", "256"))
+        self.TOKEN_ROUTES_MAX_QUEUE = int(os.getenv("TOKEN_ROUTES_MAX_QUEUE", "512"))
+        self.TOKEN_ROUTES_QUEUE_TIMEOUT_SECONDS = float(os.getenv("TOKEN_ROUTES_QUEUE_TIMEOUT_SECONDS", "1"))
+        # Tokens por chamada de POST /auth/introspect
+        self.INTROSPECT_MAX_TOKENS = int(os.getenv("INTROSPECT_MAX_TOKENS", "500"))
 
 
 class SupabaseConfig:
@@ -29,11 +176,22 @@ class SupabaseConfig:
     SUPABASE_URL: str
     SUPABASE_KEY: str
     SUPABASE_SERVICE_KEY: Optional[str]
+    SUPABASE_HTTP_MAX_CONNECTIONS: int
+    SUPABASE_HTTP_MAX_KEEPALIVE: int
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY: float
+    SUPABASE_HTTP_TIMEOUT: float
+    SUPABASE_HTTP_CONNECT_TIMEOUT: float
 
     def __init__(self) -> None:
         self.SUPABASE_URL = os.getenv("SUPABASE_URL", "")
         self.SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
         self.SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", None)
+        # Pool de conexões e timeouts do cliente HTTP assíncrono (PostgREST)
+        self.SUPABASE_HTTP_MAX_CONNECTIONS = int(os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", "20"))
+        self.SUPABASE_HTTP_MAX_KEEPALIVE = int(os.getenv("SUPABASE_HTTP_MAX_KEEPALIVE", "10"))
+        self.SUPABASE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.SUPABASE_HTTP_TIMEOUT = float(os.getenv("SUPABASE_HTTP_TIMEOUT", "10"))
+        self.SUPABASE_HTTP_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_HTTP_CONNECT_TIMEOUT", "5"))
 
 
 auth_config: AuthConfig = AuthConfig()
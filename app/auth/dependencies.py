@@ -2,79 +2,375 @@
 Dependências do FastAPI para autenticação.
 Segue Single Responsibility - apenas extração e validação de tokens.
 """
-from typing import TYPE_CHECKING, Optional
-from fastapi import Depends, HTTPException, status
+import logging
+from typing import Any, Callable, Optional
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.auth.api_keys import API_KEY_PREFIX, ApiKeyService, IApiKeyRepository, InMemoryApiKeyRepository
+from app.auth.concurrency import ROUTE_CLASS_HASH, ROUTE_CLASS_TOKEN, ConcurrencyLimiter, build_route_limiters
+from app.auth.hashing import PasswordHasher
+from app.auth.rate_limit import InMemoryRateLimitStore, LoginRateLimiter
+from app.auth.refresh_tokens import RefreshTokenStore
+from app.auth.revocation import RevokedTokenIndex, TokenVersionStore
 from app.auth.service import AuthService
-from app.auth.models import User
-from app.auth.repository import IUserRepository
+from app.auth.signing import TokenSigner
+from app.auth.token_cache import TokenCache
+from app.auth.models import AuthenticatedUser
+from app.auth.repository import IUserRepository, InMemoryUserRepository
+from app.auth.repository_metrics import InstrumentedUserRepository
+from app.metrics import registry as metrics_registry
 
-if TYPE_CHECKING:
-    from app.auth.repository_supabase import SupabaseUserRepository
+logger = logging.getLogger(__name__)
 
 security: HTTPBearer = HTTPBearer()
 
 
-def get_user_repository() -> IUserRepository:
+def build_user_repository() -> IUserRepository:
     """
     Factory function para criar instância do repositório.
-    Usa Supabase se configurado, caso contrário usa InMemoryUserRepository.
+    Seleciona a implementação por USER_REPOSITORY_BACKEND; em "auto" usa o
+    PostgREST assíncrono se o Supabase estiver configurado, senão InMemoryUserRepository.
+    "sqlite" usa o arquivo local SQLITE_PATH, sem depender do Supabase.
     Segue Open/Closed Principle - pode ser estendido sem modificar código existente.
+    Deve ser chamada uma única vez, no startup da aplicação (ver init_auth_state).
     """
-    from app.auth.config import supabase_config
-    from app.auth.repository import InMemoryUserRepository
+    from app.auth.config import auth_config, supabase_config
+
+    backend: str = auth_config.USER_REPOSITORY_BACKEND
+
+    if backend == "sqlite":
+        from app.auth.repository_sqlite import SqliteUserRepository
+        sqlite_repo = SqliteUserRepository()
+        logger.info("Usando SQLite local", extra={"repository": "SqliteUserRepository", "path": sqlite_repo.path})
+        return sqlite_repo
 
     # Verifica se Supabase está configurado
-    if supabase_config.SUPABASE_URL and supabase_config.SUPABASE_KEY:
+    if backend != "memory" and supabase_config.SUPABASE_URL and supabase_config.SUPABASE_KEY:
         try:
-            from app.auth.repository_supabase import SupabaseUserRepository
-            repo: SupabaseUserRepository = SupabaseUserRepository()
-            print("✅ Conectado ao Supabase com sucesso!")
-            print(f"📊 Repositório: SupabaseUserRepository")
+            repo: IUserRepository
+            if backend == "supabase":
+                from app.auth.repository_supabase import SupabaseUserRepository
+                repo = SupabaseUserRepository()
+            else:
+                from app.auth.repository_postgrest import PostgrestUserRepository
+                repo = PostgrestUserRepository()
+            logger.info("Conectado ao Supabase", extra={"repository": type(repo).__name__})
             return repo
         except Exception as e:
+            if not auth_config.USER_REPOSITORY_FALLBACK_TO_MEMORY:
+                raise
             # Se houver erro ao conectar, usa repositório em memória como fallback
-            import traceback
-            print(f"❌ Erro ao conectar com Supabase: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            print("⚠️  ATENÇÃO: Usando repositório em memória como fallback.")
-            print("⚠️  Os dados NÃO serão persistidos no Supabase!")
-            print(f"📊 Repositório: InMemoryUserRepository (FALLBACK)")
+            logger.exception(
+                "Erro ao conectar com Supabase: %s. Usando repositório em memória como fallback; "
+                "os dados NÃO serão persistidos no Supabase!", e,
+                extra={"repository": "InMemoryUserRepository"}
+            )
             return InMemoryUserRepository()
 
     # Fallback para repositório em memória
-    print("⚠️  Supabase não configurado. Usando repositório em memória.")
-    print("⚠️  Os dados NÃO serão persistidos!")
-    print(f"📊 Repositório: InMemoryUserRepository")
+    logger.warning(
+        "Supabase não configurado. Usando repositório em memória.",
+        extra={"repository": "InMemoryUserRepository"}
+    )
     return InMemoryUserRepository()
 
 
-def get_auth_service(
-    user_repository: IUserRepository = Depends(get_user_repository)
-) -> AuthService:
+def build_api_key_repository(backend_repository: IUserRepository) -> IApiKeyRepository:
+    """
+    Repositório de chaves de API no mesmo backend dos usuários: a tabela api_keys
+    do arquivo SQLite ou do Supabase (compartilhando o cliente HTTP do PostgREST);
+    em memória quando os usuários também estão em memória.
+    """
+    if isinstance(backend_repository, InMemoryUserRepository):
+        return InMemoryApiKeyRepository()
+
+    from app.auth.repository_sqlite import SqliteUserRepository
+    if isinstance(backend_repository, SqliteUserRepository):
+        from app.auth.repository_sqlite import SqliteApiKeyRepository
+        return SqliteApiKeyRepository(path=backend_repository.path)
+
+    from app.auth.repository_postgrest import PostgrestApiKeyRepository, PostgrestUserRepository
+    if isinstance(backend_repository, PostgrestUserRepository):
+        return PostgrestApiKeyRepository(client=backend_repository.client)
+    return PostgrestApiKeyRepository()
+
+
+async def init_auth_state(app: FastAPI) -> None:
+    """
+    Cria repositório, pool de hashing, caches, stores de revogação, chaves de
+    assinatura, AuthService e o serviço de chaves de API uma única vez
+    e guarda em app.state. Chamado pelo lifespan da aplicação.
+    """
+    from app.auth.config import auth_config
+
+    # A instrumentação fica junto ao backend: mede as idas reais ao banco, não os acertos de cache
+    backend_repository: IUserRepository = build_user_repository()
+    user_repository: IUserRepository = InstrumentedUserRepository(backend_repository)
+    if auth_config.CIRCUIT_BREAKER_ENABLED and not isinstance(backend_repository, InMemoryUserRepository):
+        from app.auth.repository_breaker import ResilientUserRepository
+        user_repository = ResilientUserRepository(user_repository)
+    if auth_config.USER_LOOKUP_BATCHING:
+        from app.auth.repository_batching import BatchingUserRepository
+        user_repository = BatchingUserRepository(user_repository)
+    if auth_config.USER_CACHE_ENABLED:
+        from app.auth.repository_cache import CachingUserRepository
+        user_repository = CachingUserRepository(user_repository)
+    password_hasher: PasswordHasher = PasswordHasher()
+    token_cache: TokenCache = TokenCache()
+    token_versions: TokenVersionStore = TokenVersionStore()
+    rate_limiter: Optional[LoginRateLimiter] = (
+        LoginRateLimiter(InMemoryRateLimitStore()) if auth_config.LOGIN_RATE_LIMIT_ENABLED else None
+    )
+    revoked_tokens: RevokedTokenIndex = RevokedTokenIndex()
+    refresh_tokens: RefreshTokenStore = RefreshTokenStore()
+    token_signer: TokenSigner = TokenSigner()
+    if not token_signer.symmetric:
+        # Chaves assimétricas carregadas já no startup: PEM inválido impede a subida
+        token_signer.load()
+    app.state.user_repository = user_repository
+    app.state.password_hasher = password_hasher
+    app.state.token_cache = token_cache
+    app.state.rate_limiter = rate_limiter
+    app.state.revoked_tokens = revoked_tokens
+    app.state.refresh_tokens = refresh_tokens
+    app.state.token_signer = token_signer
+    app.state.auth_service = AuthService(
+        user_repository, password_hasher, token_cache, token_versions, rate_limiter,
+        revoked_tokens, refresh_tokens, token_signer
+    )
+    app.state.api_key_service = ApiKeyService(build_api_key_repository(backend_repository), user_repository)
+    # Lidos pelo ConcurrencyLimitMiddleware; None desativa os limites
+    app.state.route_limiters = build_route_limiters() if auth_config.CONCURRENCY_LIMITS_ENABLED else None
+    _register_state_gauges(app)
+
+
+def _state_attribute(app: FastAPI, component: str, attribute: str) -> Callable[[], Optional[float]]:
+    """
+    Lê app.state.<component>.<attribute> na coleta, descendo pelos decoradores
+    do repositório (.inner) até achar o atributo; None se nenhum o tiver.
+    """
+    def read() -> Optional[float]:
+        target: Any = getattr(app.state, component, None)
+        while target is not None:
+            value: Any = getattr(target, attribute, None)
+            if value is not None:
+                return float(value)
+            target = getattr(target, "inner", None)
+        return None
+    return read
+
+
+def _route_limiter_attribute(app: FastAPI, name: str, attribute: str) -> Callable[[], Optional[float]]:
+    """Lê app.state.route_limiters[name].<attribute> na coleta; None com os limites desativados"""
+    def read() -> Optional[float]:
+        limiters: Optional[dict[str, ConcurrencyLimiter]] = getattr(app.state, "route_limiters", None)
+        limiter: Optional[ConcurrencyLimiter] = limiters.get(name) if limiters else None
+        return float(getattr(limiter, attribute)) if limiter is not None else None
+    return read
+
+
+def _register_state_gauges(app: FastAPI) -> None:
+    """Expõe em /metrics a profundidade da fila do bcrypt e as taxas de acerto dos caches"""
+    gauges: list[tuple[str, str, str, str]] = [
+        ("password_hasher_queue_depth", "Operações de bcrypt aguardando um worker", "password_hasher", "queue_depth"),
+        ("password_hasher_in_flight", "Operações de bcrypt em execução", "password_hasher", "in_flight"),
+        ("password_hasher_workers", "Workers do pool de bcrypt", "password_hasher", "workers"),
+        ("token_cache_hit_ratio", "Taxa de acerto do cache de tokens JWT", "token_cache", "hit_ratio"),
+        ("token_cache_hits", "Acertos do cache de tokens JWT", "token_cache", "hits"),
+        ("token_cache_misses", "Falhas do cache de tokens JWT", "token_cache", "misses"),
+        ("user_cache_hit_ratio", "Taxa de acerto do cache de usuários", "user_repository", "hit_ratio"),
+        ("user_cache_hits", "Acertos do cache de usuários", "user_repository", "hits"),
+        ("user_cache_misses", "Falhas do cache de usuários", "user_repository", "misses"),
+        ("user_lookup_batches", "Consultas em lote enviadas ao repositório", "user_repository", "batches"),
+        ("user_lookup_coalesced", "Buscas atendidas por uma busca idêntica em andamento", "user_repository", "coalesced"),
+        ("user_repository_circuit_state", "Circuit breaker do repositório (0 fechado, 1 meio-aberto, 2 aberto)", "user_repository", "breaker_state"),
+        ("user_repository_stale_cache_served", "Buscas atendidas pela cópia antiga", "user_repository", "stale_served"),
+        ("revoked_tokens", "jti revogados ainda não expirados", "revoked_tokens", "size"),
+        ("revoked_tokens_bloom_negatives", "Checagens de revogação resolvidas pelo filtro de Bloom", "revoked_tokens", "bloom_negatives"),
+        ("revoked_tokens_bloom_false_positives", "Falsos positivos do filtro de Bloom", "revoked_tokens", "bloom_false_positives"),
+        ("refresh_token_families", "Famílias de refresh tokens ativas", "refresh_tokens", "size"),
+        ("api_key_cache_hit_ratio", "Taxa de acerto do cache de chaves de API", "api_key_service", "hit_ratio"),
+        ("api_key_cache_hits", "Acertos do cache de chaves de API", "api_key_service", "hits"),
+        ("api_key_cache_misses", "Falhas do cache de chaves de API", "api_key_service", "misses"),
+    ]
+    for name, documentation, component, attribute in gauges:
+        metrics_registry.gauge(name, documentation, _state_attribute(app, component, attribute))
+
+    for route_class, label in ((ROUTE_CLASS_HASH, "rotas de bcrypt"), (ROUTE_CLASS_TOKEN, "rotas de token")):
+        for attribute, documentation in (
+            ("in_flight", f"Requisições em andamento nas {label}"),
+            ("queue_depth", f"Requisições esperando vaga nas {label}"),
+            ("rejected", f"Requisições recusadas com a fila cheia nas {label}"),
+            ("timed_out", f"Requisições recusadas pelo prazo na fila nas {label}"),
+        ):
+            metrics_registry.gauge(
+                f"{route_class}_routes_{attribute}", documentation,
+                _route_limiter_attribute(app, route_class, attribute)
+            )
+
+
+async def shutdown_auth_state(app: FastAPI) -> None:
+    """Libera os recursos criados em init_auth_state (clientes HTTP, conexões)"""
+    # Antes do repositório de usuários: pode compartilhar o cliente HTTP dele
+    api_key_service: Optional[ApiKeyService] = getattr(app.state, "api_key_service", None)
+    if api_key_service is not None:
+        await api_key_service.close()
+    user_repository: Optional[IUserRepository] = getattr(app.state, "user_repository", None)
+    if user_repository is not None:
+        await user_repository.close()
+    password_hasher: Optional[PasswordHasher] = getattr(app.state, "password_hasher", None)
+    if password_hasher is not None:
+        password_hasher.close()
+    rate_limiter: Optional[LoginRateLimiter] = getattr(app.state, "rate_limiter", None)
+    if rate_limiter is not None:
+        await rate_limiter.close()
+    app.state.user_repository = None
+    app.state.password_hasher = None
+    app.state.token_cache = None
+    app.state.rate_limiter = None
+    app.state.revoked_tokens = None
+    app.state.refresh_tokens = None
+    app.state.token_signer = None
+    app.state.auth_service = None
+    app.state.api_key_service = None
+    app.state.route_limiters = None
+
+
+def get_user_repository(request: Request) -> IUserRepository:
+    """
+    Retorna o repositório compartilhado da aplicação.
+    O repositório é criado no startup (lifespan), não a cada requisição.
+    """
+    user_repository: Optional[IUserRepository] = getattr(request.app.state, "user_repository", None)
+    if user_repository is None:
+        raise RuntimeError("Repositório não inicializado: o lifespan da aplicação não foi executado")
+    return user_repository
+
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    """Retorna o pool de hashing compartilhado da aplicação"""
+    password_hasher: Optional[PasswordHasher] = getattr(request.app.state, "password_hasher", None)
+    if password_hasher is None:
+        raise RuntimeError("Pool de hashing não inicializado: o lifespan da aplicação não foi executado")
+    return password_hasher
+
+
+def get_auth_service(request: Request) -> AuthService:
     """
-    Factory function para criar instância do AuthService.
+    Retorna o AuthService compartilhado da aplicação.
     Segue Dependency Inversion Principle.
     """
-    return AuthService(user_repository)
+    auth_service: Optional[AuthService] = getattr(request.app.state, "auth_service", None)
+    if auth_service is None:
+        raise RuntimeError("AuthService não inicializado: o lifespan da aplicação não foi executado")
+    return auth_service
+
+
+def get_token_signer(request: Request) -> TokenSigner:
+    """Retorna as chaves de assinatura dos JWT compartilhadas da aplicação"""
+    token_signer: Optional[TokenSigner] = getattr(request.app.state, "token_signer", None)
+    if token_signer is None:
+        raise RuntimeError("TokenSigner não inicializado: o lifespan da aplicação não foi executado")
+    return token_signer
+
+
+def get_api_key_service(request: Request) -> ApiKeyService:
+    """Retorna o serviço de chaves de API compartilhado da aplicação"""
+    api_key_service: Optional[ApiKeyService] = getattr(request.app.state, "api_key_service", None)
+    if api_key_service is None:
+        raise RuntimeError("ApiKeyService não inicializado: o lifespan da aplicação não foi executado")
+    return api_key_service
+
+
+def get_client_ip(request: Request) -> Optional[str]:
+    """
+    IP do cliente da requisição.
+    Com TRUST_PROXY_HEADERS, usa o IP de X-Forwarded-For adicionado pelo nosso
+    proxy mais externo: a entrada TRUSTED_PROXY_HOPS posições a partir da direita.
+    As entradas à esquerda vêm do cliente e podem ser forjadas (trocar o valor a
+    cada tentativa escaparia do limite por IP). Sem isso, todos os clientes atrás
+    do proxy dividiriam o mesmo IP.
+    """
+    from app.auth.config import auth_config
+
+    if auth_config.TRUST_PROXY_HEADERS:
+        forwarded: Optional[str] = request.headers.get("x-forwarded-for")
+        if forwarded:
+            entries: list[str] = [entry.strip() for entry in forwarded.split(",") if entry.strip()]
+            if entries:
+                return entries[max(0, len(entries) - auth_config.TRUSTED_PROXY_HOPS)]
+    return request.client.host if request.client else None
+
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token inválido ou expirado",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     auth_service: AuthService = Depends(get_auth_service)
-) -> User:
+) -> AuthenticatedUser:
     """
-    Dependency que extrai e valida o token JWT da requisição.
-    Retorna o usuário autenticado ou levanta exceção HTTP.
+    Dependency que extrai e valida o token JWT ou a chave de API da requisição.
+    Retorna o usuário autenticado (User ou, no modo stateless, Principal)
+    ou levanta exceção HTTP.
     """
     token: str = credentials.credentials
-    user: Optional[User] = await auth_service.get_current_user(token)
+    user: Optional[AuthenticatedUser]
+    if token.startswith(API_KEY_PREFIX):
+        # Lido direto do app.state: uma dependência a mais custaria um salto ao threadpool em toda requisição
+        user = await get_api_key_service(request).authenticate(token)
+    else:
+        user = await auth_service.get_current_user(token)
 
     if user is None:
+        raise _unauthorized()
+
+    return user
+
+
+async def get_import_admin(
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> AuthenticatedUser:
+    """
+    Como get_current_user, mas só aceita os usuários de USER_IMPORT_ADMIN_EMAILS
+    (token de login ou chave de API deles). Sem a lista, ninguém importa.
+    """
+    from app.auth.config import auth_config
+
+    if not auth_config.USER_IMPORT_ADMIN_EMAILS:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido ou expirado",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Importação em massa desativada (configure USER_IMPORT_ADMIN_EMAILS)",
         )
+    if current_user.email.lower() not in auth_config.USER_IMPORT_ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Usuário sem permissão para importação em massa",
+        )
+    return current_user
+
 
+async def get_session_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> AuthenticatedUser:
+    """
+    Como get_current_user, mas só aceita o access token JWT de um login.
+    Usada no gerenciamento de chaves: uma chave de API não emite nem revoga chaves.
+    """
+    token: str = credentials.credentials
+    if token.startswith(API_KEY_PREFIX):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Chaves de API não podem gerenciar chaves de API; use o token de login",
+        )
+    user: Optional[AuthenticatedUser] = await auth_service.get_current_user(token)
+    if user is None:
+        raise _unauthorized()
     return user
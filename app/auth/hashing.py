@@ -0,0 +1,172 @@
+"""
+Hash e verificação de senhas com bcrypt fora do event loop.
+O trabalho de CPU roda em um pool de threads ou processos com fila limitada,
+para que rotas baratas (ex.: /auth/me) não esperem atrás de logins.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+import bcrypt
+from app.auth.config import auth_config
+
+T = TypeVar("T")
+
+
+class HashingQueueFullError(RuntimeError):
+    """Fila do pool de hashing cheia: a requisição deve ser rejeitada (503)"""
+
+
+def _truncate_password(password: str) -> bytes:
+    """
+    Trunca a senha para 72 bytes (limitação do bcrypt).
+    Retorna os bytes da senha truncada.
+    """
+    password_bytes = password.encode('utf-8')
+    if len(password_bytes) > 72:
+        return password_bytes[:72]
+    return password_bytes
+
+
+def hash_password(password: str, rounds: int = 12) -> str:
+    """
+    Gera hash da senha usando bcrypt (bloqueante, roda no worker).
+    Bcrypt tem limitação de 72 bytes, então truncamos se necessário.
+    """
+    salt = bcrypt.gensalt(rounds=rounds)
+    hashed = bcrypt.hashpw(_truncate_password(password), salt)
+    return hashed.decode('utf-8')
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifica a senha usando bcrypt (bloqueante, roda no worker)"""
+    return bcrypt.checkpw(_truncate_password(plain_password), hashed_password.encode('utf-8'))
+
+
+def get_rounds(hashed_password: str) -> Optional[int]:
+    """Extrai o custo de um hash bcrypt ($2b$12$...); None se o formato for desconhecido"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int = 4, max_rounds: int = 16) -> tuple[int, float]:
+    """
+    Escolhe o maior custo cujo hash leva no máximo target_ms nesta máquina.
+    Retorna (custo, tempo medido em ms). Cada custo a mais dobra o tempo.
+    """
+    best: tuple[int, float] = (min_rounds, 0.0)
+    for rounds in range(min_rounds, max_rounds + 1):
+        start = time.perf_counter()
+        hash_password("calibracao-bcrypt", rounds)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > target_ms and rounds > min_rounds:
+            break
+        best = (rounds, elapsed_ms)
+    return best
+
+
+class PasswordHasher:
+    """
+    Executa hash/verificação de senha em um pool limitado.
+    Modos: "thread" (bcrypt libera o GIL), "process" ou "inline" (no event loop,
+    comportamento antigo). No máximo `workers` operações rodam ao mesmo tempo e
+    no máximo `max_queue` esperam; além disso levanta HashingQueueFullError.
+    Depois de close(), também levanta HashingQueueFullError (503): rodar o
+    bcrypt no event loop durante o shutdown travaria as demais requisições.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        rounds: Optional[int] = None
+    ) -> None:
+        self.rounds: int = rounds or auth_config.BCRYPT_ROUNDS
+        self.mode: str = (mode or auth_config.PASSWORD_HASHER_MODE).lower()
+        self.workers: int = workers or auth_config.PASSWORD_HASHER_WORKERS or min(4, os.cpu_count() or 1)
+        self.max_queue: int = max_queue if max_queue is not None else auth_config.PASSWORD_HASHER_MAX_QUEUE
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting: int = 0
+        self._running: int = 0
+        self._closed: bool = False
+
+        if self.mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        elif self.mode == "process":
+            # Importado só aqui: multiprocessing fica fora do cold start no modo thread
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        elif self.mode != "inline":
+            raise ValueError(f"PASSWORD_HASHER_MODE inválido: {self.mode}")
+
+    @property
+    def closed(self) -> bool:
+        """Pool encerrado por close(): novas operações são recusadas"""
+        return self._closed
+
+    @property
+    def queue_depth(self) -> int:
+        """Operações aguardando um worker livre"""
+        return self._waiting
+
+    @property
+    def in_flight(self) -> int:
+        """Operações em execução nos workers"""
+        return self._running
+
+    async def hash(self, password: str) -> str:
+        """Gera o hash bcrypt da senha"""
+        return await self._submit(hash_password, password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verifica a senha contra o hash bcrypt"""
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Indica se o hash foi gerado com um custo diferente do configurado"""
+        return get_rounds(hashed_password) != self.rounds
+
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        """Enfileira fn no pool respeitando os limites de concorrência e fila"""
+        if self._closed:
+            raise HashingQueueFullError("Servidor encerrando, tente novamente em instantes")
+        if self._executor is None:
+            return fn(*args)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                raise HashingQueueFullError("Servidor ocupado, tente novamente em instantes")
+            self._waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        if self._executor is None:
+            # Encerrado enquanto esperava um worker
+            self._semaphore.release()
+            raise HashingQueueFullError("Servidor encerrando, tente novamente em instantes")
+        self._running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+    def close(self) -> None:
+        """Encerra o pool de workers; as operações seguintes levantam HashingQueueFullError"""
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -3,11 +3,17 @@ Modelos de domínio para autenticação.
 Representa a entidade User no sistema.
 """
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional, Union
 
 
 class User:
-    """Modelo de domínio para usuário"""
+    """
+    Modelo de domínio para usuário.
+    Usa __slots__ (sem __dict__ por instância) para que o repositório em memória
+    e os caches comportem milhões de usuários com pouca memória.
+    """
+
+    __slots__ = ("id", "email", "name", "hashed_password", "created_at", "updated_at")
 
     def __init__(
         self,
@@ -22,5 +28,100 @@ class User:
         self.email: str = email
         self.name: str = name
         self.hashed_password: str = hashed_password
+        if created_at is None or updated_at is None:
+            # datetime é imutável: um único objeto serve aos dois campos
+            now = datetime.utcnow()
+            created_at = created_at or now
+            updated_at = updated_at or now
+        self.created_at: datetime = created_at
+        self.updated_at: datetime = updated_at
+
+    def __repr__(self) -> str:
+        return f"User(id={self.id!r}, email={self.email!r}, name={self.name!r})"
+
+
+class NewUser:
+    """Dados de um usuário a ser criado (senha já com hash)"""
+
+    __slots__ = ("email", "name", "hashed_password")
+
+    def __init__(self, email: str, name: str, hashed_password: str) -> None:
+        self.email: str = email
+        self.name: str = name
+        self.hashed_password: str = hashed_password
+
+
+class Principal:
+    """
+    Usuário autenticado reconstruído apenas a partir das claims do token.
+    Usado no modo stateless, sem consulta ao repositório.
+    """
+
+    __slots__ = ("id", "email", "name")
+
+    def __init__(self, id: int, email: str, name: str) -> None:
+        self.id: int = id
+        self.email: str = email
+        self.name: str = name
+
+
+class TokenPair:
+    """Access token e refresh token emitidos juntos (refresh_token None se desativado)"""
+
+    __slots__ = ("access_token", "refresh_token")
+
+    def __init__(self, access_token: str, refresh_token: Optional[str] = None) -> None:
+        self.access_token: str = access_token
+        self.refresh_token: Optional[str] = refresh_token
+
+
+class ApiKey:
+    """
+    Chave de API de uma integração (serviço a serviço).
+    Só o SHA-256 da chave é guardado; prefix (início da chave) serve para
+    identificá-la em listagens.
+    """
+
+    __slots__ = ("id", "user_id", "name", "prefix", "key_hash", "created_at", "revoked_at")
+
+    def __init__(
+        self,
+        id: int,
+        user_id: int,
+        name: str,
+        prefix: str,
+        key_hash: str,
+        created_at: Optional[datetime] = None,
+        revoked_at: Optional[datetime] = None
+    ) -> None:
+        self.id: int = id
+        self.user_id: int = user_id
+        self.name: str = name
+        self.prefix: str = prefix
+        self.key_hash: str = key_hash
         self.created_at: datetime = created_at or datetime.utcnow()
-        self.updated_at: datetime = updated_at or datetime.utcnow()
+        self.revoked_at: Optional[datetime] = revoked_at
+
+    def __repr__(self) -> str:
+        return f"ApiKey(id={self.id!r}, user_id={self.user_id!r}, name={self.name!r}, prefix={self.prefix!r})"
+
+
+# Usuário completo (do repositório) ou principal derivado das claims
+AuthenticatedUser = Union[User, Principal]
+
+
+class IntrospectionResult:
+    """
+    Resultado da introspecção de um token: claims se ele for um access token
+    válido (None se não for) e, quando pedido, o usuário dono dele.
+    """
+
+    __slots__ = ("claims", "user")
+
+    def __init__(self, claims: Optional[dict[str, Any]] = None, user: Optional[AuthenticatedUser] = None) -> None:
+        self.claims: Optional[dict[str, Any]] = claims
+        self.user: Optional[AuthenticatedUser] = user
+
+    @property
+    def active(self) -> bool:
+        return self.claims is not None
@@ -0,0 +1,176 @@
+"""
+Limite de tentativas de login por email e por IP.
+Cada tentativa de login com email existente custa uma verificação bcrypt completa;
+o limite é checado antes de qualquer hash, então uma rajada de credential stuffing
+recebe 429 sem consumir CPU.
+
+Usa o algoritmo de janela deslizante aproximada (contagem da janela atual mais a
+da anterior ponderada pelo tempo restante): memória constante por chave.
+O estado fica atrás de IRateLimitStore, para que um store compartilhado
+(ex.: Redis) atenda vários workers.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional
+from app.auth.config import auth_config
+from app.metrics import registry as metrics_registry
+
+LOGIN_THROTTLED = metrics_registry.counter(
+    "login_throttled_total",
+    "Tentativas de login recusadas pelo limite de taxa",
+    ("key",),
+)
+
+
+class LoginRateLimitedError(RuntimeError):
+    """Excesso de tentativas de login; retry_after em segundos"""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Muitas tentativas de login, tente novamente mais tarde")
+        self.retry_after: float = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Valor do cabeçalho Retry-After (segundos inteiros, mínimo 1)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class IRateLimitStore(ABC):
+    """
+    Interface do estado do limitador.
+    Segue Dependency Inversion Principle - o limitador depende da abstração.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window_seconds: float) -> float:
+        """
+        Registra uma tentativa para a chave se ela couber no limite e retorna 0.
+        Caso contrário não registra e retorna em quantos segundos tentar de novo.
+        """
+        pass
+
+    @abstractmethod
+    async def peek(self, key: str, limit: int, window_seconds: float) -> float:
+        """Como hit, mas sem registrar a tentativa: 0 se ela caberia no limite"""
+        pass
+
+    async def close(self) -> None:
+        """Libera recursos do store (conexões); nada a fazer por padrão"""
+        return None
+
+
+class InMemoryRateLimitStore(IRateLimitStore):
+    """
+    Store em memória do processo, com número máximo de chaves.
+    Chaves sem atividade há mais de duas janelas expiram; acima de max_keys,
+    as menos recentes são descartadas.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_keys: int = max_keys if max_keys is not None else auth_config.LOGIN_RATE_LIMIT_MAX_KEYS
+        self._clock: Callable[[], float] = clock
+        # chave -> (início da janela atual, contagem atual, contagem da janela anterior, janela)
+        self._entries: OrderedDict[str, tuple[float, int, int, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def hit(self, key: str, limit: int, window_seconds: float) -> float:
+        now = self._clock()
+        self._expire(now)
+
+        start, current, previous = self._window(key, now, window_seconds)
+        retry_after = self._check(limit, window_seconds, now - start, current, previous)
+        if retry_after:
+            return retry_after
+
+        self._entries[key] = (start, current + 1, previous, window_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+        return 0.0
+
+    async def peek(self, key: str, limit: int, window_seconds: float) -> float:
+        now = self._clock()
+        start, current, previous = self._window(key, now, window_seconds)
+        return self._check(limit, window_seconds, now - start, current, previous)
+
+    def _window(self, key: str, now: float, window_seconds: float) -> tuple[float, int, int]:
+        """Início e contagens da janela atual e da anterior, avançadas até now"""
+        start, current, previous, _ = self._entries.get(key, (now, 0, 0, window_seconds))
+        elapsed_windows = int((now - start) // window_seconds)
+        if elapsed_windows >= 1:
+            # Avança a janela; se passou mais de uma, a anterior ficou vazia
+            previous = current if elapsed_windows == 1 else 0
+            current = 0
+            start += elapsed_windows * window_seconds
+        return start, current, previous
+
+    def _check(self, limit: int, window: float, elapsed: float, current: int, previous: int) -> float:
+        """0 se mais uma tentativa cabe na estimativa da janela deslizante; senão o Retry-After"""
+        weight = 1 - elapsed / window
+        if previous * weight + current >= limit:
+            return self._retry_after(limit, window, elapsed, current, previous)
+        return 0.0
+
+    def _retry_after(self, limit: int, window: float, elapsed: float, current: int, previous: int) -> float:
+        """Tempo até a estimativa da janela deslizante cair abaixo do limite"""
+        if current < limit and previous:
+            # Ainda na janela atual: espera o peso da anterior diminuir
+            return max(window * (1 - (limit - current) / previous) - elapsed, 0.0) + 1e-3
+        # Só na próxima janela, quando a atual passa a ser a anterior
+        return (window - elapsed) + max(window * (1 - limit / current), 0.0) + 1e-3
+
+    def _expire(self, now: float) -> None:
+        """Remove as chaves menos recentes sem atividade há mais de duas janelas"""
+        while self._entries:
+            key, (start, _, _, window) = next(iter(self._entries.items()))
+            if now - start < 2 * window:
+                break
+            del self._entries[key]
+
+
+class LoginRateLimiter:
+    """Aplica os limites por email e por IP antes da verificação da senha"""
+
+    def __init__(
+        self,
+        store: Optional[IRateLimitStore] = None,
+        per_email: Optional[int] = None,
+        per_ip: Optional[int] = None,
+        window_seconds: Optional[float] = None
+    ) -> None:
+        self.store: IRateLimitStore = store if store is not None else InMemoryRateLimitStore()
+        self.per_email: int = per_email if per_email is not None else auth_config.LOGIN_RATE_LIMIT_PER_EMAIL
+        self.per_ip: int = per_ip if per_ip is not None else auth_config.LOGIN_RATE_LIMIT_PER_IP
+        self.window_seconds: float = window_seconds or auth_config.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+
+    async def check(self, email: str, client_ip: Optional[str] = None) -> None:
+        """
+        Registra a tentativa ou levanta LoginRateLimitedError (limite 0 desativa a chave).
+        Os dois limites são consultados antes de registrar qualquer um: uma tentativa
+        recusada não conta, então insistir em um email bloqueado não esgota o limite
+        do IP para os outros usuários atrás do mesmo NAT ou proxy.
+        """
+        limits: list[tuple[str, str, int]] = []
+        if self.per_email > 0:
+            limits.append(("email", f"login:email:{email.strip().lower()}", self.per_email))
+        if client_ip and self.per_ip > 0:
+            limits.append(("ip", f"login:ip:{client_ip}", self.per_ip))
+
+        for label, key, limit in limits:
+            retry_after = await self.store.peek(key, limit, self.window_seconds)
+            if retry_after:
+                LOGIN_THROTTLED.inc(1, label)
+                raise LoginRateLimitedError(retry_after)
+        for label, key, limit in limits:
+            # hit confere de novo: outra tentativa concorrente pode ter ocupado a vaga
+            retry_after = await self.store.hit(key, limit, self.window_seconds)
+            if retry_after:
+                LOGIN_THROTTLED.inc(1, label)
+                raise LoginRateLimitedError(retry_after)
+
+    async def close(self) -> None:
+        await self.store.close()
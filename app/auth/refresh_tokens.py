@@ -0,0 +1,74 @@
+"""
+Famílias de refresh tokens.
+Cada login abre uma família; cada uso do refresh token o troca por um novo
+(rotação) e só o mais recente da família vale. As claims do usuário ficam
+guardadas na família, então renovar o access token não consulta o repositório
+nem verifica senha.
+"""
+import heapq
+import time
+from typing import Any, Optional
+
+
+class RefreshFamily:
+    """Estado de uma família: o jti vigente e o último access token emitido"""
+
+    __slots__ = ("user_id", "current_jti", "claims", "expires_at", "access_jti", "access_expires_at")
+
+    def __init__(
+        self,
+        user_id: int,
+        current_jti: str,
+        claims: dict[str, Any],
+        expires_at: float,
+        access_jti: Optional[str] = None,
+        access_expires_at: float = 0.0
+    ) -> None:
+        self.user_id: int = user_id
+        self.current_jti: str = current_jti
+        self.claims: dict[str, Any] = claims
+        self.expires_at: float = expires_at
+        self.access_jti: Optional[str] = access_jti
+        self.access_expires_at: float = access_expires_at
+
+
+class RefreshTokenStore:
+    """
+    Famílias de refresh tokens em memória, por id de família (claim `fam`).
+    Famílias vencidas são removidas por um heap de expiração a cada escrita.
+    Pode ser substituído por uma implementação compartilhada entre workers.
+    """
+
+    def __init__(self) -> None:
+        self._families: dict[str, RefreshFamily] = {}
+        self._expirations: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._families)
+
+    @property
+    def size(self) -> int:
+        """Famílias ativas"""
+        return len(self._families)
+
+    def create(self, family_id: str, family: RefreshFamily) -> None:
+        self._purge(time.time())
+        self._families[family_id] = family
+        heapq.heappush(self._expirations, (family.expires_at, family_id))
+
+    def get(self, family_id: str) -> Optional[RefreshFamily]:
+        family = self._families.get(family_id)
+        if family is None or family.expires_at <= time.time():
+            return None
+        return family
+
+    def revoke(self, family_id: str) -> Optional[RefreshFamily]:
+        """Encerra a família (logout ou reuso detectado) e a retorna"""
+        return self._families.pop(family_id, None)
+
+    def _purge(self, now: float) -> None:
+        while self._expirations and self._expirations[0][0] <= now:
+            _, family_id = heapq.heappop(self._expirations)
+            family = self._families.get(family_id)
+            if family is not None and family.expires_at <= now:
+                del self._families[family_id]
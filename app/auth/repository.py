@@ -2,9 +2,42 @@
 Repositório de usuários seguindo o padrão Repository e Dependency Inversion Principle.
 Define uma interface abstrata que pode ser implementada por diferentes fontes de dados.
 """
+import logging
+import math
 from abc import ABC, abstractmethod
-from typing import Optional
-from app.auth.models import User
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Sequence
+from app.auth.models import NewUser, User
+
+logger = logging.getLogger(__name__)
+
+
+# Código SQLSTATE de violação de UNIQUE no Postgres (users.email)
+UNIQUE_VIOLATION: str = "23505"
+
+
+class EmailAlreadyRegisteredError(ValueError):
+    """Email já existe no repositório (violação da restrição UNIQUE de users.email)"""
+
+    def __init__(self, message: str = "Email já está cadastrado") -> None:
+        super().__init__(message)
+
+
+class RepositoryUnavailableError(RuntimeError):
+    """
+    Backend de usuários indisponível (circuito aberto ou prazo da chamada esgotado).
+    retry_after em segundos; a API responde 503 com Retry-After.
+    """
+
+    def __init__(self, message: str = "Serviço de usuários indisponível", retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after: float = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Valor do cabeçalho Retry-After (segundos inteiros, mínimo 1)"""
+        return str(max(1, math.ceil(self.retry_after)))
 
 
 class IUserRepository(ABC):
@@ -15,7 +48,19 @@ class IUserRepository(ABC):
 
     @abstractmethod
     async def create(self, email: str, name: str, hashed_password: str) -> User:
-        """Cria um novo usuário"""
+        """
+        Cria um novo usuário.
+        Levanta EmailAlreadyRegisteredError se o email já existir.
+        """
+        pass
+
+    @abstractmethod
+    async def create_many(self, users: Sequence[NewUser]) -> list[Optional[User]]:
+        """
+        Cria vários usuários em uma única escrita.
+        Retorna uma lista alinhada à entrada; None onde o email já existia
+        (inclusive repetido dentro do próprio lote).
+        """
         pass
 
     @abstractmethod
@@ -28,6 +73,25 @@ class IUserRepository(ABC):
         """Busca usuário por ID"""
         pass
 
+    @abstractmethod
+    async def get_many_by_ids(self, user_ids: Sequence[int]) -> dict[int, User]:
+        """Busca vários usuários por ID em uma consulta; IDs inexistentes ficam de fora"""
+        pass
+
+    @abstractmethod
+    async def get_many_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        """Busca vários usuários por email em uma consulta; emails inexistentes ficam de fora"""
+        pass
+
+    @abstractmethod
+    async def update_password(self, user_id: int, hashed_password: str) -> Optional[User]:
+        """Atualiza o hash de senha do usuário; None se o usuário não existir"""
+        pass
+
+    async def close(self) -> None:
+        """Libera recursos (conexões, clientes HTTP). Padrão: nada a liberar"""
+        return None
+
 
 class InMemoryUserRepository(IUserRepository):
     """
@@ -40,13 +104,12 @@ class InMemoryUserRepository(IUserRepository):
         self._users: dict[int, User] = {}
         self._users_by_email: dict[str, User] = {}
         self._next_id: int = 1
+        logger.warning("Usando InMemoryUserRepository - dados NÃO serão persistidos!")
 
     async def create(self, email: str, name: str, hashed_password: str) -> User:
         """Cria um novo usuário em memória"""
-        print("⚠️  ATENÇÃO: Usando InMemoryUserRepository - dados NÃO serão persistidos!")
-        print(f"📝 Criando usuário em memória: {email}")
         if email in self._users_by_email:
-            raise ValueError("Email já está em uso")
+            raise EmailAlreadyRegisteredError()
 
         user: User = User(
             id=self._next_id,
@@ -59,9 +122,32 @@ class InMemoryUserRepository(IUserRepository):
         self._users_by_email[email] = user
         self._next_id += 1
 
-        print(f"✅ Usuário criado em memória (NÃO persistido): {email} (ID: {user.id})")
+        logger.debug("Usuário criado em memória (NÃO persistido)", extra={"email": email, "user_id": user.id})
         return user
 
+    async def create_many(self, users: Sequence[NewUser]) -> list[Optional[User]]:
+        """Cria vários usuários em memória, ignorando emails já existentes"""
+        created: list[Optional[User]] = []
+        # Um único timestamp por lote, compartilhado pelos usuários criados
+        now = datetime.utcnow()
+        for new_user in users:
+            if new_user.email in self._users_by_email:
+                created.append(None)
+                continue
+            user: User = User(
+                id=self._next_id,
+                email=new_user.email,
+                name=new_user.name,
+                hashed_password=new_user.hashed_password,
+                created_at=now,
+                updated_at=now
+            )
+            self._users[self._next_id] = user
+            self._users_by_email[new_user.email] = user
+            self._next_id += 1
+            created.append(user)
+        return created
+
     async def get_by_email(self, email: str) -> Optional[User]:
         """Busca usuário por email"""
         return self._users_by_email.get(email)
@@ -69,3 +155,52 @@ class InMemoryUserRepository(IUserRepository):
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """Busca usuário por ID"""
         return self._users.get(user_id)
+
+    async def get_many_by_ids(self, user_ids: Sequence[int]) -> dict[int, User]:
+        """Busca vários usuários por ID"""
+        return {user_id: self._users[user_id] for user_id in user_ids if user_id in self._users}
+
+    async def get_many_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        """Busca vários usuários por email"""
+        return {email: self._users_by_email[email] for email in emails if email in self._users_by_email}
+
+    async def update_password(self, user_id: int, hashed_password: str) -> Optional[User]:
+        """Atualiza o hash de senha em memória"""
+        user = self._users.get(user_id)
+        if user is None:
+            return None
+        user.hashed_password = hashed_password
+        user.updated_at = datetime.utcnow()
+        return user
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    Converte timestamp ISO 8601 do PostgREST/Supabase para datetime (None se ausente ou inválido).
+    Em cache: linhas do mesmo lote costumam ter o mesmo created_at, e o datetime
+    (imutável) passa a ser compartilhado entre os usuários em vez de duplicado.
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    # Python < 3.11 não aceita o sufixo Z
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def align_created_users(users: Sequence[NewUser], rows: Sequence[User]) -> list[Optional[User]]:
+    """
+    Alinha os usuários devolvidos por um INSERT ... ON CONFLICT DO NOTHING à
+    ordem da entrada; emails ignorados (ou repetidos no lote) ficam como None.
+    """
+    by_email: dict[str, User] = {user.email: user for user in rows}
+    aligned: list[Optional[User]] = []
+    for new_user in users:
+        aligned.append(by_email.pop(new_user.email, None))
+    return aligned
@@ -0,0 +1,140 @@
+"""
+Coalescência e agrupamento (estilo DataLoader) de buscas no repositório de usuários.
+Buscas idênticas em andamento compartilham a mesma chamada ao backend, e as
+buscas feitas dentro de um mesmo tick do event loop viram uma única consulta em lote.
+Segue Open/Closed Principle - decora qualquer IUserRepository.
+"""
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Optional, Sequence, TypeVar
+from app.auth.models import NewUser, User
+from app.auth.repository import IUserRepository
+from app.auth.config import auth_config
+
+K = TypeVar("K", bound=Hashable)
+
+
+class BatchLoader(Generic[K]):
+    """
+    Agrupa chamadas a load(key) feitas no mesmo tick em uma chamada a batch_fn.
+    Chaves já pendentes ou em andamento reutilizam o mesmo Future (single-flight).
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Sequence[K]], Awaitable[dict[K, User]]],
+        max_batch_size: int = 100
+    ) -> None:
+        self._batch_fn = batch_fn
+        self.max_batch_size: int = max(1, max_batch_size)
+        self._queue: list[K] = []
+        self._futures: dict[K, "asyncio.Future[Optional[User]]"] = {}
+        self._scheduled: bool = False
+        self._tasks: set["asyncio.Task[None]"] = set()
+        self.batches: int = 0
+        self.coalesced: int = 0
+
+    async def load(self, key: K) -> Optional[User]:
+        """Retorna o usuário da chave, juntando-se a uma busca pendente se houver"""
+        future = self._futures.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+        self._queue.append(key)
+        if not self._scheduled:
+            self._scheduled = True
+            # Despacha depois que as demais tarefas prontas deste tick enfileirarem suas chaves
+            loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        """Divide a fila em lotes e dispara uma consulta por lote"""
+        self._scheduled = False
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self.max_batch_size):
+            batch = queue[start:start + self.max_batch_size]
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: list[K]) -> None:
+        """Executa batch_fn e resolve os Futures das chaves do lote"""
+        self.batches += 1
+        try:
+            found = await self._batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # Lote cancelado (shutdown): sem isso os Futures ficariam pendentes e
+            # qualquer load() futuro da mesma chave esperaria para sempre
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.cancel()
+            raise
+        for key in keys:
+            future = self._futures.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(found.get(key))
+
+
+class BatchingUserRepository(IUserRepository):
+    """
+    Decora um IUserRepository coalescendo get_by_id/get_by_email concorrentes
+    em chamadas get_many_by_ids/get_many_by_emails.
+    """
+
+    def __init__(self, inner: IUserRepository, max_batch_size: Optional[int] = None) -> None:
+        size: int = max_batch_size or auth_config.USER_LOOKUP_MAX_BATCH
+        self.inner: IUserRepository = inner
+        self._by_id: BatchLoader[int] = BatchLoader(inner.get_many_by_ids, size)
+        self._by_email: BatchLoader[str] = BatchLoader(inner.get_many_by_emails, size)
+
+    @property
+    def batches(self) -> int:
+        """Consultas em lote enviadas ao repositório interno"""
+        return self._by_id.batches + self._by_email.batches
+
+    @property
+    def coalesced(self) -> int:
+        """Buscas atendidas por uma consulta idêntica já em andamento"""
+        return self._by_id.coalesced + self._by_email.coalesced
+
+    async def create(self, email: str, name: str, hashed_password: str) -> User:
+        """Cria no repositório interno"""
+        return await self.inner.create(email=email, name=name, hashed_password=hashed_password)
+
+    async def create_many(self, users: Sequence[NewUser]) -> list[Optional[User]]:
+        """Cria em lote no repositório interno"""
+        return await self.inner.create_many(users)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Busca por email, agrupada com as demais do mesmo tick"""
+        return await self._by_email.load(email)
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Busca por ID, agrupada com as demais do mesmo tick"""
+        return await self._by_id.load(user_id)
+
+    async def get_many_by_ids(self, user_ids: Sequence[int]) -> dict[int, User]:
+        """Busca em lote direto no repositório interno"""
+        return await self.inner.get_many_by_ids(user_ids)
+
+    async def get_many_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        """Busca em lote direto no repositório interno"""
+        return await self.inner.get_many_by_emails(emails)
+
+    async def update_password(self, user_id: int, hashed_password: str) -> Optional[User]:
+        """Atualiza no repositório interno"""
+        return await self.inner.update_password(user_id, hashed_password)
+
+    async def close(self) -> None:
+        """Libera os recursos do repositório interno"""
+        await self.inner.close()
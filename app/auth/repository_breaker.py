@@ -0,0 +1,269 @@
+"""
+Prazo por chamada e circuit breaker em volta do repositório de usuários.
+Com o backend lento ou fora do ar, as chamadas deixam de esperar pelo timeout
+do cliente HTTP: cada uma tem um prazo, e depois de uma taxa de erros
+configurável o circuito abre e as requisições falham na hora com 503 até
+que uma chamada de teste (meio-aberto) confirme a recuperação.
+Opcionalmente, get_by_id é atendido por uma cópia antiga dos usuários
+enquanto o backend estiver indisponível.
+Segue Open/Closed Principle - decora qualquer IUserRepository.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, Sequence, TypeVar
+from app.auth.models import NewUser, User
+from app.auth.repository import EmailAlreadyRegisteredError, IUserRepository, RepositoryUnavailableError
+from app.auth.repository_cache import LRUIndex
+from app.auth.config import auth_config
+from app.metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED: str = "closed"
+OPEN: str = "open"
+HALF_OPEN: str = "half_open"
+
+# Valor do gauge de estado
+_STATE_VALUES: dict[str, int] = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_TRANSITIONS = metrics_registry.counter(
+    "user_repository_circuit_transitions_total",
+    "Mudanças de estado do circuit breaker do repositório de usuários",
+    ("state",),
+)
+BREAKER_REJECTED = metrics_registry.counter(
+    "user_repository_circuit_rejected_total",
+    "Chamadas ao repositório recusadas na hora (circuito aberto ou teste em andamento)",
+)
+REPOSITORY_TIMEOUTS = metrics_registry.counter(
+    "user_repository_timeouts_total",
+    "Chamadas ao repositório que estouraram o prazo",
+    ("method",),
+)
+STALE_SERVED = metrics_registry.counter(
+    "user_repository_stale_served_total",
+    "Buscas por ID atendidas pela cópia antiga com o backend indisponível",
+)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por taxa de erros sobre as últimas `window_size` chamadas.
+    fechado: tudo passa; abre quando há pelo menos `minimum_calls` resultados e
+             a fração de falhas chega a `failure_rate`.
+    aberto: recusa tudo por `open_seconds`, depois passa a meio-aberto.
+    meio-aberto: deixa passar até `half_open_calls` chamadas de teste; sucesso
+                 fecha o circuito, falha o abre de novo.
+    """
+
+    def __init__(
+        self,
+        failure_rate: Optional[float] = None,
+        minimum_calls: Optional[int] = None,
+        window_size: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+        half_open_calls: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.failure_rate: float = (
+            failure_rate if failure_rate is not None else auth_config.CIRCUIT_BREAKER_FAILURE_RATE
+        )
+        self.minimum_calls: int = minimum_calls if minimum_calls is not None else auth_config.CIRCUIT_BREAKER_MIN_CALLS
+        self.window_size: int = max(
+            1, window_size if window_size is not None else auth_config.CIRCUIT_BREAKER_WINDOW, self.minimum_calls
+        )
+        self.open_seconds: float = (
+            open_seconds if open_seconds is not None else auth_config.CIRCUIT_BREAKER_OPEN_SECONDS
+        )
+        self.half_open_calls: int = max(
+            1, half_open_calls if half_open_calls is not None else auth_config.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+        )
+        self._clock: Callable[[], float] = clock
+        self._state: str = CLOSED
+        # True = falha
+        self._outcomes: deque[bool] = deque(maxlen=self.window_size)
+        self._failures: int = 0
+        self._opened_at: float = 0.0
+        self._probes: int = 0
+        self.rejected: int = 0
+
+    @property
+    def state(self) -> str:
+        """Estado atual; um circuito aberto vira meio-aberto ao fim de open_seconds"""
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    @property
+    def state_value(self) -> int:
+        """Estado como número, para o gauge (0 fechado, 1 meio-aberto, 2 aberto)"""
+        return _STATE_VALUES[self.state]
+
+    @property
+    def retry_after(self) -> float:
+        """Segundos até o próximo teste de recuperação"""
+        return max(self.open_seconds - (self._clock() - self._opened_at), 0.0)
+
+    def acquire(self) -> None:
+        """Autoriza uma chamada ou levanta RepositoryUnavailableError"""
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and self._probes < self.half_open_calls:
+            self._probes += 1
+            return
+        self.rejected += 1
+        BREAKER_REJECTED.inc()
+        raise RepositoryUnavailableError(retry_after=self.retry_after if state == OPEN else 1.0)
+
+    def release(self) -> None:
+        """Devolve a vaga de uma chamada cancelada sem resultado (ex.: cliente desconectou)"""
+        if self._state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record_success(self) -> None:
+        if self._state == HALF_OPEN:
+            self._transition(CLOSED)
+            return
+        self._record(False)
+
+    def record_failure(self) -> None:
+        if self._state == HALF_OPEN:
+            self._transition(OPEN)
+            return
+        self._record(True)
+        if (
+            self._state == CLOSED
+            and len(self._outcomes) >= self.minimum_calls
+            and self._failures >= self.failure_rate * len(self._outcomes)
+        ):
+            self._transition(OPEN)
+
+    def _record(self, failed: bool) -> None:
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(failed)
+        if failed:
+            self._failures += 1
+
+    def _transition(self, state: str) -> None:
+        if state == OPEN:
+            self._opened_at = self._clock()
+        self._outcomes.clear()
+        self._failures = 0
+        self._probes = 0
+        self._state = state
+        BREAKER_TRANSITIONS.inc(1, state)
+        log = logger.info if state == CLOSED else logger.warning
+        log("Circuit breaker do repositório de usuários: %s", state, extra={"state": state})
+
+
+class ResilientUserRepository(IUserRepository):
+    """
+    Decora um IUserRepository com prazo por chamada e circuit breaker.
+    Timeouts e erros do backend contam como falha; EmailAlreadyRegisteredError é
+    uma resposta normal do banco e conta como sucesso. Com stale_cache_size > 0,
+    guarda os últimos usuários lidos e responde get_by_id com eles enquanto o
+    backend falha.
+    """
+
+    def __init__(
+        self,
+        inner: IUserRepository,
+        breaker: Optional[CircuitBreaker] = None,
+        timeout: Optional[float] = None,
+        stale_cache_size: Optional[int] = None,
+        stale_ttl_seconds: Optional[float] = None
+    ) -> None:
+        self.inner: IUserRepository = inner
+        self.breaker: CircuitBreaker = breaker or CircuitBreaker()
+        self.timeout: float = timeout if timeout is not None else auth_config.REPOSITORY_CALL_TIMEOUT_SECONDS
+        size: int = stale_cache_size if stale_cache_size is not None else auth_config.REPOSITORY_STALE_CACHE_SIZE
+        self.stale_ttl_seconds: float = (
+            stale_ttl_seconds if stale_ttl_seconds is not None else auth_config.REPOSITORY_STALE_TTL_SECONDS
+        )
+        self._stale: LRUIndex[int] = LRUIndex(size)
+        self.stale_served: int = 0
+
+    @property
+    def breaker_state(self) -> int:
+        return self.breaker.state_value
+
+    @property
+    def breaker_rejected(self) -> int:
+        return self.breaker.rejected
+
+    async def _call(self, method: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Executa a chamada dentro do prazo, registrando o resultado no breaker"""
+        self.breaker.acquire()
+        try:
+            result = await asyncio.wait_for(call(), self.timeout) if self.timeout > 0 else await call()
+        except EmailAlreadyRegisteredError:
+            self.breaker.record_success()
+            raise
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except asyncio.TimeoutError as e:
+            self.breaker.record_failure()
+            REPOSITORY_TIMEOUTS.inc(1, method)
+            raise RepositoryUnavailableError(f"Serviço de usuários não respondeu em {self.timeout:g}s") from e
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def create(self, email: str, name: str, hashed_password: str) -> User:
+        user = await self._call(
+            "create", lambda: self.inner.create(email=email, name=name, hashed_password=hashed_password)
+        )
+        self._remember(user)
+        return user
+
+    async def create_many(self, users: Sequence[NewUser]) -> list[Optional[User]]:
+        return await self._call("create_many", lambda: self.inner.create_many(users))
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        return await self._call("get_by_email", lambda: self.inner.get_by_email(email))
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Busca por ID; com o backend indisponível, usa a cópia antiga se houver"""
+        try:
+            user = await self._call("get_by_id", lambda: self.inner.get_by_id(user_id))
+        except Exception:
+            found, stale = self._stale.get(user_id)
+            if not found:
+                raise
+            self.stale_served += 1
+            STALE_SERVED.inc()
+            return stale
+        self._remember(user)
+        return user
+
+    async def get_many_by_ids(self, user_ids: Sequence[int]) -> dict[int, User]:
+        users = await self._call("get_many_by_ids", lambda: self.inner.get_many_by_ids(user_ids))
+        for user in users.values():
+            self._remember(user)
+        return users
+
+    async def get_many_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        return await self._call("get_many_by_emails", lambda: self.inner.get_many_by_emails(emails))
+
+    async def update_password(self, user_id: int, hashed_password: str) -> Optional[User]:
+        user = await self._call("update_password", lambda: self.inner.update_password(user_id, hashed_password))
+        self._remember(user)
+        return user
+
+    async def close(self) -> None:
+        """Libera a cópia antiga e os recursos do repositório interno"""
+        self._stale.clear()
+        await self.inner.close()
+
+    def _remember(self, user: Optional[User]) -> None:
+        if user is not None:
+            self._stale.put(user.id, user, self.stale_ttl_seconds)
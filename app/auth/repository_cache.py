@@ -0,0 +1,219 @@
+"""
+Decorator de cache read-through para qualquer IUserRepository.
+Segue Open/Closed Principle - adiciona cache sem modificar os repositórios.
+"""
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Sequence, TypeVar
+from app.auth.models import NewUser, User
+from app.auth.repository import IUserRepository
+from app.auth.config import auth_config
+
+K = TypeVar("K", bound=Hashable)
+
+
+class LRUIndex(Generic[K]):
+    """Índice LRU com expiração por entrada; None em cache significa 'não existe'"""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size: int = max_size
+        self._entries: OrderedDict[K, tuple[float, Optional[User]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> tuple[bool, Optional[User]]:
+        """Retorna (encontrado, usuário); entradas expiradas contam como ausentes"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, user
+
+    def put(self, key: K, user: Optional[User], ttl_seconds: float) -> None:
+        """Guarda o resultado por ttl_seconds, descartando o menos usado se cheio"""
+        if self.max_size <= 0 or ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """Remove a entrada, se existir"""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Esvazia o índice"""
+        self._entries.clear()
+
+
+class CachingUserRepository(IUserRepository):
+    """
+    Envolve um IUserRepository com cache TTL + LRU em memória.
+    Mantém índices separados por ID e por email, guarda também resultados
+    negativos (usuário inexistente) por um TTL menor e invalida as entradas
+    afetadas em create e update_password.
+    """
+
+    def __init__(
+        self,
+        inner: IUserRepository,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        negative_ttl_seconds: Optional[float] = None
+    ) -> None:
+        size: int = max_size if max_size is not None else auth_config.USER_CACHE_SIZE
+        self.inner: IUserRepository = inner
+        self.ttl_seconds: float = ttl_seconds if ttl_seconds is not None else auth_config.USER_CACHE_TTL_SECONDS
+        self.negative_ttl_seconds: float = (
+            negative_ttl_seconds if negative_ttl_seconds is not None
+            else auth_config.USER_CACHE_NEGATIVE_TTL_SECONDS
+        )
+        self._by_id: LRUIndex[int] = LRUIndex(size)
+        self._by_email: LRUIndex[str] = LRUIndex(size)
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Proporção de buscas atendidas pelo cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def create(self, email: str, name: str, hashed_password: str) -> User:
+        """Cria no repositório interno e substitui qualquer resultado negativo em cache"""
+        self._by_email.pop(email)
+        user = await self.inner.create(email=email, name=name, hashed_password=hashed_password)
+        self._store(user)
+        return user
+
+    async def create_many(self, users: Sequence[NewUser]) -> list[Optional[User]]:
+        """Cria em lote no repositório interno e indexa os usuários criados"""
+        for new_user in users:
+            self._by_email.pop(new_user.email)
+        created = await self.inner.create_many(users)
+        for user in created:
+            if user is not None:
+                self._store(user)
+        return created
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Busca por email, consultando o repositório interno só em cache miss"""
+        found, user = self._by_email.get(email)
+        if found:
+            self.hits += 1
+            return user
+        self.misses += 1
+
+        user = await self.inner.get_by_email(email)
+        if user is None:
+            self._by_email.put(email, None, self.negative_ttl_seconds)
+        else:
+            self._store(user)
+        return user
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Busca por ID, consultando o repositório interno só em cache miss"""
+        found, user = self._by_id.get(user_id)
+        if found:
+            self.hits += 1
+            return user
+        self.misses += 1
+
+        user = await self.inner.get_by_id(user_id)
+        if user is None:
+            self._by_id.put(user_id, None, self.negative_ttl_seconds)
+        else:
+            self._store(user)
+        return user
+
+    async def get_many_by_ids(self, user_ids: Sequence[int]) -> dict[int, User]:
+        """Busca em lote; só os IDs fora do cache vão ao repositório interno"""
+        result: dict[int, User] = {}
+        missing: list[int] = []
+        unique = list(dict.fromkeys(user_ids))
+        for user_id in unique:
+            found, user = self._by_id.get(user_id)
+            if not found:
+                missing.append(user_id)
+            elif user is not None:
+                result[user_id] = user
+        self.hits += len(unique) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            fetched = await self.inner.get_many_by_ids(missing)
+            for user_id in missing:
+                user = fetched.get(user_id)
+                if user is None:
+                    self._by_id.put(user_id, None, self.negative_ttl_seconds)
+                else:
+                    self._store(user)
+                    result[user_id] = user
+        return result
+
+    async def get_many_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        """Busca em lote; só os emails fora do cache vão ao repositório interno"""
+        result: dict[str, User] = {}
+        missing: list[str] = []
+        unique = list(dict.fromkeys(emails))
+        for email in unique:
+            found, user = self._by_email.get(email)
+            if not found:
+                missing.append(email)
+            elif user is not None:
+                result[email] = user
+        self.hits += len(unique) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            fetched = await self.inner.get_many_by_emails(missing)
+            for email in missing:
+                user = fetched.get(email)
+                if user is None:
+                    self._by_email.put(email, None, self.negative_ttl_seconds)
+                else:
+                    self._store(user)
+                    result[email] = user
+        return result
+
+    async def update_password(self, user_id: int, hashed_password: str) -> Optional[User]:
+        """Atualiza no repositório interno e renova as entradas do usuário"""
+        self.invalidate(user_id=user_id)
+        user = await self.inner.update_password(user_id, hashed_password)
+        if user is not None:
+            self._store(user)
+        return user
+
+    async def close(self) -> None:
+        """Libera o cache e os recursos do repositório interno"""
+        self.clear()
+        await self.inner.close()
+
+    def invalidate(self, user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+        """Remove as entradas de um usuário dos dois índices"""
+        if user_id is not None:
+            found, user = self._by_id.get(user_id)
+            if found and user is not None:
+                self._by_email.pop(user.email)
+            self._by_id.pop(user_id)
+        if email is not None:
+            found, user = self._by_email.get(email)
+            if found and user is not None:
+                self._by_id.pop(user.id)
+            self._by_email.pop(email)
+
+    def clear(self) -> None:
+        """Esvazia os dois índices"""
+        self._by_id.clear()
+        self._by_email.clear()
+
+    def _store(self, user: User) -> None:
+        """Indexa o usuário por ID e por email"""
+        self._by_id.put(user.id, user, self.ttl_seconds)
+        self._by_email.put(user.email, user, self.ttl_seconds)
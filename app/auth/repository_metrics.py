@@ -0,0 +1,49 @@
+"""
+Instrumentação do repositório de usuários.
+Mede a duração de cada chamada ao backend (Supabase/PostgREST, memória)
+no histograma user_repository_call_duration_seconds, por método e resultado.
+Segue Open/Closed Principle - decora qualquer IUserRepository.
+"""
+from typing import Optional, Sequence
+from app.auth.models import NewUser, User
+from app.auth.repository import IUserRepository
+from app.metrics import REPOSITORY_CALL_SECONDS, timed
+
+
+class InstrumentedUserRepository(IUserRepository):
+    """Decora um IUserRepository registrando a latência de cada método"""
+
+    def __init__(self, inner: IUserRepository) -> None:
+        self.inner: IUserRepository = inner
+
+    @timed(REPOSITORY_CALL_SECONDS, "create")
+    async def create(self, email: str, name: str, hashed_password: str) -> User:
+        return await self.inner.create(email=email, name=name, hashed_password=hashed_password)
+
+    @timed(REPOSITORY_CALL_SECONDS, "create_many")
+    async def create_many(self, users: Sequence[NewUser]) -> list[Optional[User]]:
+        return await self.inner.create_many(users)
+
+    @timed(REPOSITORY_CALL_SECONDS, "get_by_email")
+    async def get_by_email(self, email: str) -> Optional[User]:
+        return await self.inner.get_by_email(email)
+
+    @timed(REPOSITORY_CALL_SECONDS, "get_by_id")
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        return await self.inner.get_by_id(user_id)
+
+    @timed(REPOSITORY_CALL_SECONDS, "get_many_by_ids")
+    async def get_many_by_ids(self, user_ids: Sequence[int]) -> dict[int, User]:
+        return await self.inner.get_many_by_ids(user_ids)
+
+    @timed(REPOSITORY_CALL_SECONDS, "get_many_by_emails")
+    async def get_many_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        return await self.inner.get_many_by_emails(emails)
+
+    @timed(REPOSITORY_CALL_SECONDS, "update_password")
+    async def update_password(self, user_id: int, hashed_password: str) -> Optional[User]:
+        return await self.inner.update_password(user_id, hashed_password)
+
+    async def close(self) -> None:
+        """Libera os recursos do repositório interno"""
+        await self.inner.close()
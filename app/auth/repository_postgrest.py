@@ -0,0 +1,301 @@
+"""
+Implementação assíncrona dos repositórios de usuários e de chaves de API sobre a API PostgREST do Supabase.
+Usa um único httpx.AsyncClient com keep-alive, então nenhuma chamada ao banco
+bloqueia o event loop.
+Segue Liskov Substitution Principle - pode substituir IUserRepository.
+"""
+from datetime import datetime
+from typing import Optional, Any, Sequence
+import httpx
+from app.auth.api_keys import IApiKeyRepository
+from app.auth.models import ApiKey, NewUser, User
+from app.auth.repository import (
+    UNIQUE_VIOLATION,
+    EmailAlreadyRegisteredError,
+    IUserRepository,
+    align_created_users,
+    parse_timestamp,
+)
+from app.auth.config import supabase_config
+
+
+def _in_filter(values: Sequence[Any]) -> str:
+    """Monta o operador in.(...) do PostgREST, com aspas para valores textuais"""
+    items: list[str] = []
+    for value in values:
+        if isinstance(value, str):
+            escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'"{escaped}"')
+        else:
+            items.append(str(value))
+    return f"in.({','.join(items)})"
+
+
+def build_client(
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> httpx.AsyncClient:
+    """Cria o cliente HTTP do PostgREST com limites de pool e timeouts configuráveis"""
+    url: str = base_url or supabase_config.SUPABASE_URL
+    if not url:
+        raise ValueError("SUPABASE_URL deve estar configurado nas variáveis de ambiente")
+
+    # Usa Service Key se disponível (bypassa RLS), senão usa anon key
+    key: Optional[str] = api_key or supabase_config.SUPABASE_SERVICE_KEY or supabase_config.SUPABASE_KEY
+    if not key:
+        raise ValueError(
+            "SUPABASE_KEY ou SUPABASE_SERVICE_KEY deve estar configurado nas variáveis de ambiente"
+        )
+
+    return httpx.AsyncClient(
+        base_url=f"{url.rstrip('/')}/rest/v1",
+        headers={
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Accept": "application/json",
+        },
+        limits=httpx.Limits(
+            max_connections=supabase_config.SUPABASE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=supabase_config.SUPABASE_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=supabase_config.SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            supabase_config.SUPABASE_HTTP_TIMEOUT,
+            connect=supabase_config.SUPABASE_HTTP_CONNECT_TIMEOUT,
+        ),
+        transport=transport,
+    )
+
+
+def _response_rows(response: httpx.Response) -> list[dict[str, Any]]:
+    """Valida o status da resposta e retorna as linhas JSON"""
+    if response.status_code >= 400:
+        raise ValueError(f"Erro do Supabase: {response.status_code} {response.text}")
+    data: Any = response.json()
+    if isinstance(data, dict):
+        return [data]
+    return data or []
+
+
+class PostgrestUserRepository(IUserRepository):
+    """
+    Repositório de usuários sobre PostgREST com cliente HTTP assíncrono compartilhado.
+    Aceita um cliente ou transport injetado (ex.: httpx.ASGITransport de um
+    PostgREST simulado) para testes e benchmarks.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        """Cria o cliente HTTP com limites de pool e timeouts configuráveis"""
+        self.table_name: str = "users"
+        self._owns_client: bool = client is None
+        self.client: httpx.AsyncClient = client or build_client(base_url, api_key, transport)
+
+    async def create(self, email: str, name: str, hashed_password: str) -> User:
+        """
+        Cria um novo usuário com um único POST no PostgREST.
+        A unicidade do email é garantida pela restrição UNIQUE da tabela.
+        """
+        try:
+            response = await self.client.post(
+                f"/{self.table_name}",
+                json={"email": email, "name": name, "hashed_password": hashed_password},
+                headers={"Prefer": "return=representation"},
+            )
+        except httpx.HTTPError as e:
+            raise ValueError(f"Erro ao criar usuário no Supabase: {type(e).__name__}: {str(e)}") from e
+
+        if response.status_code == 409 and self._error_code(response) == UNIQUE_VIOLATION:
+            raise EmailAlreadyRegisteredError()
+
+        rows = self._rows(response)
+        if not rows:
+            raise ValueError(
+                f"Erro ao criar usuário no banco de dados: resposta vazia do Supabase (Status: {response.status_code})"
+            )
+        return self._map_to_user(rows[0])
+
+    async def create_many(self, users: Sequence[NewUser]) -> list[Optional[User]]:
+        """Cria vários usuários com um único POST (ON CONFLICT (email) DO NOTHING)"""
+        if not users:
+            return []
+        try:
+            response = await self.client.post(
+                f"/{self.table_name}",
+                params={"on_conflict": "email"},
+                json=[
+                    {"email": user.email, "name": user.name, "hashed_password": user.hashed_password}
+                    for user in users
+                ],
+                headers={"Prefer": "return=representation,resolution=ignore-duplicates"},
+            )
+        except httpx.HTTPError as e:
+            raise ValueError(f"Erro ao criar usuários no Supabase: {type(e).__name__}: {str(e)}") from e
+        rows = [self._map_to_user(row) for row in self._rows(response)]
+        return align_created_users(users, rows)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Busca usuário por email no PostgREST"""
+        return await self._get_one("email", email)
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Busca usuário por ID no PostgREST"""
+        return await self._get_one("id", user_id)
+
+    async def get_many_by_ids(self, user_ids: Sequence[int]) -> dict[int, User]:
+        """Busca vários usuários por ID em uma única requisição"""
+        users = await self._get_many("id", user_ids)
+        return {user.id: user for user in users}
+
+    async def get_many_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        """Busca vários usuários por email em uma única requisição"""
+        users = await self._get_many("email", emails)
+        return {user.email: user for user in users}
+
+    async def update_password(self, user_id: int, hashed_password: str) -> Optional[User]:
+        """Atualiza o hash de senha via PATCH no PostgREST"""
+        response = await self.client.patch(
+            f"/{self.table_name}",
+            params={"id": f"eq.{user_id}"},
+            json={"hashed_password": hashed_password},
+            headers={"Prefer": "return=representation"},
+        )
+        rows = self._rows(response)
+        if not rows:
+            return None
+        return self._map_to_user(rows[0])
+
+    async def close(self) -> None:
+        """Fecha o pool de conexões, se o cliente foi criado aqui"""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def _get_one(self, column: str, value: Any) -> Optional[User]:
+        """Executa SELECT com filtro de igualdade e retorna o primeiro registro"""
+        response = await self.client.get(
+            f"/{self.table_name}",
+            params={"select": "*", column: f"eq.{value}", "limit": "1"},
+        )
+        rows = self._rows(response)
+        if not rows:
+            return None
+        return self._map_to_user(rows[0])
+
+    async def _get_many(self, column: str, values: Sequence[Any]) -> list[User]:
+        """Executa SELECT com filtro in.(...) sobre a coluna"""
+        if not values:
+            return []
+        response = await self.client.get(
+            f"/{self.table_name}",
+            params={"select": "*", column: _in_filter(list(dict.fromkeys(values)))},
+        )
+        return [self._map_to_user(row) for row in self._rows(response)]
+
+    def _rows(self, response: httpx.Response) -> list[dict[str, Any]]:
+        """Valida o status da resposta e retorna as linhas JSON"""
+        return _response_rows(response)
+
+    def _error_code(self, response: httpx.Response) -> Optional[str]:
+        """Código SQLSTATE de uma resposta de erro do PostgREST, se houver"""
+        try:
+            data: Any = response.json()
+        except ValueError:
+            return None
+        return data.get("code") if isinstance(data, dict) else None
+
+    def _map_to_user(self, data: dict[str, Any]) -> User:
+        """Mapeia dados do banco para o modelo User"""
+        return User(
+            id=data["id"],
+            email=data["email"],
+            name=data["name"],
+            hashed_password=data["hashed_password"],
+            created_at=parse_timestamp(data.get("created_at")),
+            updated_at=parse_timestamp(data.get("updated_at"))
+        )
+
+
+class PostgrestApiKeyRepository(IApiKeyRepository):
+    """
+    Chaves de API na tabela api_keys (ver supabase_schema.sql) via PostgREST.
+    Normalmente compartilha o cliente HTTP (e o pool de conexões) do
+    PostgrestUserRepository; sem cliente injetado, cria o seu.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        self.table_name: str = "api_keys"
+        self._owns_client: bool = client is None
+        self.client: httpx.AsyncClient = client or build_client(base_url, api_key, transport)
+
+    async def create(self, user_id: int, name: str, prefix: str, key_hash: str) -> ApiKey:
+        """Guarda a chave com um único POST"""
+        try:
+            response = await self.client.post(
+                f"/{self.table_name}",
+                json={"user_id": user_id, "name": name, "prefix": prefix, "key_hash": key_hash},
+                headers={"Prefer": "return=representation"},
+            )
+        except httpx.HTTPError as e:
+            raise ValueError(f"Erro ao criar chave de API no Supabase: {type(e).__name__}: {str(e)}") from e
+        rows = _response_rows(response)
+        if not rows:
+            raise ValueError(
+                f"Erro ao criar chave de API: resposta vazia do Supabase (Status: {response.status_code})"
+            )
+        return self._map_to_api_key(rows[0])
+
+    async def get_by_hash(self, key_hash: str) -> Optional[ApiKey]:
+        """Busca a chave pelo hash (índice UNIQUE)"""
+        rows = await self._select({"key_hash": f"eq.{key_hash}", "limit": "1"})
+        return rows[0] if rows else None
+
+    async def list_by_user(self, user_id: int) -> list[ApiKey]:
+        """Chaves do usuário, em ordem de criação"""
+        return await self._select({"user_id": f"eq.{user_id}", "order": "id"})
+
+    async def revoke(self, key_id: int, user_id: int) -> Optional[ApiKey]:
+        """Marca a chave como revogada; se já estava, devolve a revogação anterior"""
+        response = await self.client.patch(
+            f"/{self.table_name}",
+            params={"id": f"eq.{key_id}", "user_id": f"eq.{user_id}", "revoked_at": "is.null"},
+            json={"revoked_at": datetime.utcnow().isoformat()},
+            headers={"Prefer": "return=representation"},
+        )
+        rows = _response_rows(response)
+        if rows:
+            return self._map_to_api_key(rows[0])
+        revoked = await self._select({"id": f"eq.{key_id}", "user_id": f"eq.{user_id}", "limit": "1"})
+        return revoked[0] if revoked else None
+
+    async def close(self) -> None:
+        """Fecha o pool de conexões, se o cliente foi criado aqui"""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def _select(self, params: dict[str, str]) -> list[ApiKey]:
+        response = await self.client.get(f"/{self.table_name}", params={"select": "*", **params})
+        return [self._map_to_api_key(row) for row in _response_rows(response)]
+
+    def _map_to_api_key(self, data: dict[str, Any]) -> ApiKey:
+        """Mapeia dados do banco para o modelo ApiKey"""
+        return ApiKey(
+            id=data["id"],
+            user_id=data["user_id"],
+            name=data["name"],
+            prefix=data["prefix"],
+            key_hash=data["key_hash"],
+            created_at=parse_timestamp(data.get("created_at")),
+            revoked_at=parse_timestamp(data.get("revoked_at"))
+        )
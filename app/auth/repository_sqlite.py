@@ -0,0 +1,306 @@
+"""
+Implementação dos repositórios de usuários e de chaves de API sobre SQLite local (arquivo embutido).
+Backend persistente e sem rede, para instalações na borda e benchmarks.
+O sqlite3 é síncrono: cada operação roda em um pool de threads, com uma conexão
+por thread, então nenhuma chamada ao banco bloqueia o event loop. Em modo WAL
+as leituras não esperam pela escrita em andamento.
+Segue Liskov Substitution Principle - pode substituir IUserRepository (e IApiKeyRepository).
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, TypeVar
+from app.auth.api_keys import IApiKeyRepository
+from app.auth.models import ApiKey, NewUser, User
+from app.auth.repository import EmailAlreadyRegisteredError, IUserRepository, parse_timestamp
+from app.auth.config import auth_config
+
+T = TypeVar("T")
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    hashed_password TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+# SQL fixo: o sqlite3 mantém as instruções compiladas em cache por conexão
+# (cached_statements), então cada consulta é preparada uma única vez.
+# As buscas em lote passam a lista como um único parâmetro JSON (json_each),
+# em vez de um IN (?, ?, ...) com texto diferente para cada tamanho de lote.
+_COLUMNS: str = "id, email, name, hashed_password, created_at, updated_at"
+_INSERT: str = (
+    f"INSERT INTO users (email, name, hashed_password, created_at, updated_at) "
+    f"VALUES (?, ?, ?, ?, ?) RETURNING {_COLUMNS}"
+)
+_INSERT_IGNORE: str = (
+    f"INSERT INTO users (email, name, hashed_password, created_at, updated_at) "
+    f"VALUES (?, ?, ?, ?, ?) ON CONFLICT (email) DO NOTHING RETURNING {_COLUMNS}"
+)
+_SELECT_BY_ID: str = f"SELECT {_COLUMNS} FROM users WHERE id = ?"
+_SELECT_BY_EMAIL: str = f"SELECT {_COLUMNS} FROM users WHERE email = ?"
+_SELECT_BY_IDS: str = f"SELECT {_COLUMNS} FROM users WHERE id IN (SELECT value FROM json_each(?))"
+_SELECT_BY_EMAILS: str = f"SELECT {_COLUMNS} FROM users WHERE email IN (SELECT value FROM json_each(?))"
+_UPDATE_PASSWORD: str = (
+    f"UPDATE users SET hashed_password = ?, updated_at = ? WHERE id = ? RETURNING {_COLUMNS}"
+)
+
+_API_KEYS_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS api_keys (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    key_hash TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    revoked_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_api_keys_user_id ON api_keys(user_id);
+"""
+
+_API_KEY_COLUMNS: str = "id, user_id, name, prefix, key_hash, created_at, revoked_at"
+_INSERT_API_KEY: str = (
+    f"INSERT INTO api_keys (user_id, name, prefix, key_hash, created_at) "
+    f"VALUES (?, ?, ?, ?, ?) RETURNING {_API_KEY_COLUMNS}"
+)
+_SELECT_API_KEY_BY_HASH: str = f"SELECT {_API_KEY_COLUMNS} FROM api_keys WHERE key_hash = ?"
+_SELECT_API_KEYS_BY_USER: str = f"SELECT {_API_KEY_COLUMNS} FROM api_keys WHERE user_id = ? ORDER BY id"
+_REVOKE_API_KEY: str = (
+    f"UPDATE api_keys SET revoked_at = COALESCE(revoked_at, ?) WHERE id = ? AND user_id = ? "
+    f"RETURNING {_API_KEY_COLUMNS}"
+)
+
+
+class _SqlitePool:
+    """
+    Conexões SQLite sobre um pool de threads.
+    O pool de conexões é o próprio pool de threads: cada thread abre sua conexão
+    na primeira operação e a reutiliza até close().
+    """
+
+    def __init__(
+        self,
+        schema: str,
+        path: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        busy_timeout: Optional[float] = None
+    ) -> None:
+        """Cria o schema (se necessário) e o pool de threads"""
+        self.path: str = path or auth_config.SQLITE_PATH
+        self.pool_size: int = max(1, pool_size or auth_config.SQLITE_POOL_SIZE)
+        self.busy_timeout: float = busy_timeout if busy_timeout is not None else auth_config.SQLITE_BUSY_TIMEOUT
+        self._local: threading.local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=self.pool_size, thread_name_prefix="sqlite-repo"
+        )
+
+        connection = self._connect()
+        try:
+            connection.executescript(schema)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre uma conexão configurada (WAL, autocommit, cache de instruções)"""
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Em WAL, NORMAL só sincroniza no checkpoint: durável contra falha do processo
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão da thread atual do pool"""
+        connection: Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    async def _run(self, operation: Callable[[sqlite3.Connection], T]) -> T:
+        """Executa a operação em uma thread do pool, com a conexão dessa thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: operation(self._connection()))
+
+    async def close(self) -> None:
+        """Encerra o pool de threads e fecha as conexões"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+
+class SqliteUserRepository(_SqlitePool, IUserRepository):
+    """Repositório de usuários em um arquivo SQLite"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        busy_timeout: Optional[float] = None
+    ) -> None:
+        super().__init__(_SCHEMA, path, pool_size, busy_timeout)
+
+    async def create(self, email: str, name: str, hashed_password: str) -> User:
+        """
+        Cria um novo usuário com um único INSERT.
+        A unicidade do email é garantida pela restrição UNIQUE da tabela.
+        """
+        now = datetime.utcnow().isoformat()
+
+        def insert(connection: sqlite3.Connection) -> tuple[Any, ...]:
+            return connection.execute(_INSERT, (email, name, hashed_password, now, now)).fetchone()
+
+        try:
+            row = await self._run(insert)
+        except sqlite3.IntegrityError as e:
+            raise EmailAlreadyRegisteredError() from e
+        return self._map_to_user(row)
+
+    async def create_many(self, users: Sequence[NewUser]) -> list[Optional[User]]:
+        """Cria vários usuários em uma única transação (ON CONFLICT (email) DO NOTHING)"""
+        if not users:
+            return []
+        now = datetime.utcnow().isoformat()
+
+        def insert_many(connection: sqlite3.Connection) -> list[Optional[tuple[Any, ...]]]:
+            rows: list[Optional[tuple[Any, ...]]] = []
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for user in users:
+                    rows.append(connection.execute(
+                        _INSERT_IGNORE, (user.email, user.name, user.hashed_password, now, now)
+                    ).fetchone())
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return rows
+
+        # Cada INSERT devolve a linha criada ou nada: o resultado já sai alinhado à entrada
+        rows = await self._run(insert_many)
+        return [self._map_to_user(row) if row is not None else None for row in rows]
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Busca usuário por email (índice UNIQUE)"""
+        return await self._get_one(_SELECT_BY_EMAIL, email)
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Busca usuário por ID (chave primária)"""
+        return await self._get_one(_SELECT_BY_ID, user_id)
+
+    async def get_many_by_ids(self, user_ids: Sequence[int]) -> dict[int, User]:
+        """Busca vários usuários por ID em uma única consulta"""
+        users = await self._get_many(_SELECT_BY_IDS, user_ids)
+        return {user.id: user for user in users}
+
+    async def get_many_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        """Busca vários usuários por email em uma única consulta"""
+        users = await self._get_many(_SELECT_BY_EMAILS, emails)
+        return {user.email: user for user in users}
+
+    async def update_password(self, user_id: int, hashed_password: str) -> Optional[User]:
+        """Atualiza o hash de senha com um único UPDATE"""
+        now = datetime.utcnow().isoformat()
+
+        def update(connection: sqlite3.Connection) -> Optional[tuple[Any, ...]]:
+            return connection.execute(_UPDATE_PASSWORD, (hashed_password, now, user_id)).fetchone()
+
+        row = await self._run(update)
+        return self._map_to_user(row) if row is not None else None
+
+    async def _get_one(self, sql: str, value: Any) -> Optional[User]:
+        """Executa SELECT com filtro de igualdade e retorna o registro, se houver"""
+        row = await self._run(lambda connection: connection.execute(sql, (value,)).fetchone())
+        return self._map_to_user(row) if row is not None else None
+
+    async def _get_many(self, sql: str, values: Sequence[Any]) -> list[User]:
+        """Executa SELECT ... IN (json_each(?)) com a lista de valores"""
+        if not values:
+            return []
+        parameter = json.dumps(list(dict.fromkeys(values)))
+        rows = await self._run(lambda connection: connection.execute(sql, (parameter,)).fetchall())
+        return [self._map_to_user(row) for row in rows]
+
+    def _map_to_user(self, row: tuple[Any, ...]) -> User:
+        """Mapeia uma linha (na ordem de _COLUMNS) para o modelo User"""
+        return User(
+            id=row[0],
+            email=row[1],
+            name=row[2],
+            hashed_password=row[3],
+            created_at=parse_timestamp(row[4]),
+            updated_at=parse_timestamp(row[5])
+        )
+
+
+class SqliteApiKeyRepository(_SqlitePool, IApiKeyRepository):
+    """
+    Chaves de API na tabela api_keys do mesmo arquivo SQLite dos usuários.
+    key_hash é UNIQUE: a autenticação é uma busca no índice.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        busy_timeout: Optional[float] = None
+    ) -> None:
+        super().__init__(_API_KEYS_SCHEMA, path, pool_size, busy_timeout)
+
+    async def create(self, user_id: int, name: str, prefix: str, key_hash: str) -> ApiKey:
+        """Guarda a chave com um único INSERT"""
+        now = datetime.utcnow().isoformat()
+        row = await self._run(
+            lambda connection: connection.execute(_INSERT_API_KEY, (user_id, name, prefix, key_hash, now)).fetchone()
+        )
+        return self._map_to_api_key(row)
+
+    async def get_by_hash(self, key_hash: str) -> Optional[ApiKey]:
+        """Busca a chave pelo hash (índice UNIQUE)"""
+        row = await self._run(lambda connection: connection.execute(_SELECT_API_KEY_BY_HASH, (key_hash,)).fetchone())
+        return self._map_to_api_key(row) if row is not None else None
+
+    async def list_by_user(self, user_id: int) -> list[ApiKey]:
+        """Chaves do usuário (índice em user_id)"""
+        rows = await self._run(lambda connection: connection.execute(_SELECT_API_KEYS_BY_USER, (user_id,)).fetchall())
+        return [self._map_to_api_key(row) for row in rows]
+
+    async def revoke(self, key_id: int, user_id: int) -> Optional[ApiKey]:
+        """Marca a chave como revogada (mantém a data da primeira revogação)"""
+        now = datetime.utcnow().isoformat()
+        row = await self._run(
+            lambda connection: connection.execute(_REVOKE_API_KEY, (now, key_id, user_id)).fetchone()
+        )
+        return self._map_to_api_key(row) if row is not None else None
+
+    def _map_to_api_key(self, row: tuple[Any, ...]) -> ApiKey:
+        """Mapeia uma linha (na ordem de _API_KEY_COLUMNS) para o modelo ApiKey"""
+        return ApiKey(
+            id=row[0],
+            user_id=row[1],
+            name=row[2],
+            prefix=row[3],
+            key_hash=row[4],
+            created_at=parse_timestamp(row[5]),
+            revoked_at=parse_timestamp(row[6])
+        )
@@ -2,13 +2,22 @@
 Implementação do repositório de usuários usando Supabase.
 Segue Liskov Substitution Principle - pode substituir IUserRepository.
 """
-from typing import Optional, Any
-from datetime import datetime
+import logging
+from typing import Optional, Any, Sequence
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
-from app.auth.models import User
-from app.auth.repository import IUserRepository
+from app.auth.models import NewUser, User
+from app.auth.repository import (
+    UNIQUE_VIOLATION,
+    EmailAlreadyRegisteredError,
+    IUserRepository,
+    align_created_users,
+    parse_timestamp,
+)
 from app.auth.config import supabase_config
 
+logger = logging.getLogger(__name__)
+
 
 class SupabaseUserRepository(IUserRepository):
     """
@@ -33,19 +42,18 @@ class SupabaseUserRepository(IUserRepository):
             api_key
         )
         self.table_name: str = "users"
-        print(f"🔑 Usando {'Service Key' if supabase_config.SUPABASE_SERVICE_KEY else 'Anon Key'} para Supabase")
+        logger.info(
+            "Cliente Supabase criado",
+            extra={"key_type": "service" if supabase_config.SUPABASE_SERVICE_KEY else "anon"}
+        )
 
     async def create(self, email: str, name: str, hashed_password: str) -> User:
-        """Cria um novo usuário no Supabase"""
-        # Verifica se usuário já existe
-        existing_user = await self.get_by_email(email)
-        if existing_user:
-            raise ValueError("Email já está cadastrado")
-
+        """
+        Cria um novo usuário no Supabase com um único INSERT.
+        A unicidade do email é garantida pela restrição UNIQUE da tabela.
+        """
         try:
-            print(f"📝 Tentando inserir usuário no Supabase: {email}")
-            print(f"📋 Tabela: {self.table_name}")
-            print(f"🔑 Usando Service Key: {bool(supabase_config.SUPABASE_SERVICE_KEY)}")
+            logger.debug("Inserindo usuário no Supabase", extra={"email": email, "table": self.table_name})
 
             # Insere novo usuário
             response = self.client.table(self.table_name).insert({
@@ -54,50 +62,57 @@ class SupabaseUserRepository(IUserRepository):
                 "hashed_password": hashed_password
             }).execute()
 
-            # Log detalhado da resposta
-            print(f"📦 Resposta do Supabase:")
-            print(f"   - data: {response.data}")
-            print(f"   - data type: {type(response.data)}")
-            print(f"   - data length: {len(response.data) if response.data else 0}")
-            print(f"   - error: {getattr(response, 'error', None)}")
-            print(f"   - status_code: {getattr(response, 'status_code', 'N/A')}")
-
             # Verifica se há erro na resposta
             if hasattr(response, 'error') and response.error:
                 error_msg = f"Erro do Supabase: {response.error}"
-                print(f"❌ {error_msg}")
+                logger.error(error_msg, extra={"email": email})
                 raise ValueError(error_msg)
 
             if not response.data or len(response.data) == 0:
                 error_msg = "Erro ao criar usuário no banco de dados: resposta vazia do Supabase"
-                print(f"❌ {error_msg}")
-                print(f"⚠️  Possíveis causas:")
-                print(f"   1. RLS (Row Level Security) está habilitado - mas você disse que está desabilitado")
-                print(f"   2. A tabela 'users' não existe no Supabase")
-                print(f"   3. Problema com permissões da API key")
-                print(f"   4. Problema com a estrutura da tabela (campos faltando)")
                 # Tenta obter mais informações sobre o erro
                 if hasattr(response, 'status_code'):
                     error_msg += f" (Status: {response.status_code})"
-                # Verifica se há mensagem de erro em outros atributos
-                response_dict = response.__dict__ if hasattr(response, '__dict__') else {}
-                if response_dict:
-                    print(f"   Resposta completa: {response_dict}")
+                # Causas comuns: RLS habilitado, tabela 'users' inexistente,
+                # permissões da API key ou estrutura da tabela
+                logger.error(
+                    error_msg,
+                    extra={"email": email, "table": self.table_name, "count": getattr(response, "count", None)}
+                )
                 raise ValueError(error_msg)
 
             user_data: dict[str, Any] = response.data[0]
-            print(f"✅ Usuário criado no Supabase: {email} (ID: {user_data.get('id')})")
+            logger.debug("Usuário criado no Supabase", extra={"email": email, "user_id": user_data.get("id")})
             return self._map_to_user(user_data)
         except ValueError:
             # Re-raise ValueError para manter o comportamento esperado
             raise
+        except APIError as e:
+            if e.code == UNIQUE_VIOLATION:
+                raise EmailAlreadyRegisteredError() from e
+            error_msg = f"Erro ao criar usuário no Supabase: {type(e).__name__}: {str(e)}"
+            logger.error(error_msg, extra={"email": email, "code": e.code})
+            raise ValueError(error_msg) from e
         except Exception as e:
             error_msg = f"Erro ao criar usuário no Supabase: {type(e).__name__}: {str(e)}"
-            print(f"❌ {error_msg}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception(error_msg, extra={"email": email})
             raise ValueError(error_msg) from e
 
+    async def create_many(self, users: Sequence[NewUser]) -> list[Optional[User]]:
+        """Cria vários usuários com um único INSERT ... ON CONFLICT (email) DO NOTHING"""
+        if not users:
+            return []
+        response = self.client.table(self.table_name).upsert(
+            [
+                {"email": user.email, "name": user.name, "hashed_password": user.hashed_password}
+                for user in users
+            ],
+            on_conflict="email",
+            ignore_duplicates=True
+        ).execute()
+        rows = [self._map_to_user(row) for row in response.data or []]
+        return align_created_users(users, rows)
+
     async def get_by_email(self, email: str) -> Optional[User]:
         """Busca usuário por email no Supabase"""
         response = self.client.table(self.table_name)\
@@ -126,26 +141,52 @@ class SupabaseUserRepository(IUserRepository):
         user_data: dict[str, Any] = response.data[0]
         return self._map_to_user(user_data)
 
+    async def get_many_by_ids(self, user_ids: Sequence[int]) -> dict[int, User]:
+        """Busca vários usuários por ID com um único filtro in.(...)"""
+        if not user_ids:
+            return {}
+        response = self.client.table(self.table_name)\
+            .select("*")\
+            .in_("id", list(user_ids))\
+            .execute()
+        users = [self._map_to_user(row) for row in response.data or []]
+        return {user.id: user for user in users}
+
+    async def get_many_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        """Busca vários usuários por email com um único filtro in.(...)"""
+        if not emails:
+            return {}
+        response = self.client.table(self.table_name)\
+            .select("*")\
+            .in_("email", list(emails))\
+            .execute()
+        users = [self._map_to_user(row) for row in response.data or []]
+        return {user.email: user for user in users}
+
+    async def update_password(self, user_id: int, hashed_password: str) -> Optional[User]:
+        """Atualiza o hash de senha do usuário no Supabase"""
+        response = self.client.table(self.table_name)\
+            .update({"hashed_password": hashed_password})\
+            .eq("id", user_id)\
+            .execute()
+
+        if not response.data or len(response.data) == 0:
+            return None
+
+        user_data: dict[str, Any] = response.data[0]
+        return self._map_to_user(user_data)
+
+    async def close(self) -> None:
+        """Fecha a sessão HTTP do cliente PostgREST"""
+        self.client.postgrest.aclose()
+
     def _map_to_user(self, data: dict[str, Any]) -> User:
         """Mapeia dados do banco para o modelo User"""
-        def parse_datetime(dt_str: Optional[str]) -> datetime:
-            """Converte string de data do Supabase para datetime"""
-            if not dt_str:
-                return datetime.utcnow()
-            try:
-                # Remove timezone se presente e converte
-                dt_str = dt_str.replace("Z", "+00:00")
-                if "+" in dt_str or dt_str.endswith("+00:00"):
-                    return datetime.fromisoformat(dt_str)
-                return datetime.fromisoformat(dt_str)
-            except Exception:
-                return datetime.utcnow()
-
         return User(
             id=data["id"],
             email=data["email"],
             name=data["name"],
             hashed_password=data["hashed_password"],
-            created_at=parse_datetime(data.get("created_at")) if data.get("created_at") else None,
-            updated_at=parse_datetime(data.get("updated_at")) if data.get("updated_at") else None
+            created_at=parse_timestamp(data.get("created_at")),
+            updated_at=parse_timestamp(data.get("updated_at"))
         )
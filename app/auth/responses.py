@@ -0,0 +1,61 @@
+"""
+Caminho rápido de serialização das respostas de autenticação (opt-in, FAST_JSON_RESPONSES).
+As rotas retornam um Response já serializado, o que evita criar o modelo Pydantic,
+revalidá-lo pelo response_model e passá-lo por jsonable_encoder. O response_model
+continua declarado nas rotas, então o schema OpenAPI não muda.
+Usa orjson se estiver instalado; senão, um encoder json pré-configurado.
+O corpo gerado é idêntico ao do caminho padrão (JSON compacto, UTF-8).
+"""
+import json
+from typing import Any, Optional, Sequence
+from starlette.responses import Response
+from app.auth.models import AuthenticatedUser, IntrospectionResult
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+# Mesmo formato do JSONResponse do Starlette
+_encoder: json.JSONEncoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa tipos JSON nativos (dict, list, str, int...) para bytes"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return _encoder.encode(content).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """Resposta JSON sem jsonable_encoder: o conteúdo já deve ter apenas tipos nativos"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def user_response(user: AuthenticatedUser, status_code: int = 200) -> FastJSONResponse:
+    """Corpo de UserResponse a partir do usuário (User ou Principal)"""
+    return FastJSONResponse({"id": user.id, "email": user.email, "name": user.name}, status_code=status_code)
+
+
+def token_response(access_token: str, refresh_token: Optional[str] = None) -> FastJSONResponse:
+    """Corpo de TokenResponse"""
+    return FastJSONResponse({"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token})
+
+
+def introspection_response(results: Sequence[IntrospectionResult]) -> FastJSONResponse:
+    """Corpo de IntrospectResponse (as claims do JWT já são tipos JSON nativos)"""
+    return FastJSONResponse({"results": [
+        {
+            "active": result.active,
+            "claims": result.claims,
+            "user": (
+                {"id": result.user.id, "email": result.user.email, "name": result.user.name}
+                if result.user is not None else None
+            ),
+        }
+        for result in results
+    ]})
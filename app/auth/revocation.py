@@ -0,0 +1,146 @@
+"""
+Controle de revogação de tokens emitidos.
+Cada usuário tem uma versão de token; os tokens carregam a versão vigente
+na emissão (claim `ver`) e deixam de valer quando a versão é incrementada.
+Tokens individuais (claim `jti`) são revogados em RevokedTokenIndex.
+"""
+import heapq
+import math
+import time
+from typing import Optional
+from app.auth.config import auth_config
+
+
+class TokenVersionStore:
+    """
+    Versões de token por usuário, em memória.
+    Só usuários que já tiveram tokens revogados ocupam espaço (o padrão é 0).
+    Pode ser substituído por uma implementação compartilhada entre workers.
+    """
+
+    def __init__(self) -> None:
+        self._versions: dict[int, int] = {}
+
+    def get(self, user_id: int) -> int:
+        """Versão vigente dos tokens do usuário"""
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_id: int) -> int:
+        """Invalida todos os tokens emitidos até agora para o usuário"""
+        version = self._versions.get(user_id, 0) + 1
+        self._versions[user_id] = version
+        return version
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre strings: "não contém" é definitivo, "contém" pode ser
+    falso positivo (na taxa configurada). Não permite remoção; reconstrua com clear().
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(1, capacity)
+        self.capacity: int = capacity
+        self.size_bits: int = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count: int = max(1, round(self.size_bits / capacity * math.log(2)))
+        self._bits: bytearray = bytearray((self.size_bits + 7) // 8)
+
+    def _hashes(self, item: str) -> tuple[int, int]:
+        """
+        Dois hashes de 32 bits a partir do hash (SipHash) do Python, combinados
+        por hashing duplo (h1 + i*h2). O hash é aleatorizado por processo, o que
+        basta: o filtro vive só em memória e é reconstruído a partir do índice.
+        """
+        h = hash(item) & 0xFFFFFFFFFFFFFFFF
+        return h & 0xFFFFFFFF, (h >> 32) | 1
+
+    def add(self, item: str) -> None:
+        h1, h2 = self._hashes(item)
+        bits, size = self._bits, self.size_bits
+        for i in range(self.hash_count):
+            position = (h1 + i * h2) % size
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        h1, h2 = self._hashes(item)
+        bits, size = self._bits, self.size_bits
+        for i in range(self.hash_count):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                # Um bit zerado basta: no caso comum o laço para na primeira posição
+                return False
+        return True
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+
+
+class RevokedTokenIndex:
+    """
+    Conjunto de `jti` revogados, cada um até o `exp` do seu token.
+    Um filtro de Bloom na frente responde o caso comum (token não revogado)
+    sem tocar no dicionário; entradas vencidas saem por um heap de expiração
+    e o filtro é reconstruído quando acumula entradas removidas demais.
+    Capacidade 0 desativa o filtro (só o dicionário).
+    """
+
+    def __init__(self, capacity: Optional[int] = None, error_rate: Optional[float] = None) -> None:
+        self.capacity: int = capacity if capacity is not None else auth_config.REVOCATION_BLOOM_CAPACITY
+        self.error_rate: float = error_rate or auth_config.REVOCATION_BLOOM_ERROR_RATE
+        self._expires: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._bloom: Optional[BloomFilter] = (
+            BloomFilter(self.capacity, self.error_rate) if self.capacity > 0 else None
+        )
+        self._stale: int = 0
+        self.bloom_negatives: int = 0
+        self.bloom_false_positives: int = 0
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    @property
+    def size(self) -> int:
+        """jti revogados e ainda não vencidos"""
+        return len(self._expires)
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoga o jti até expires_at (epoch); depois disso o token já expirou sozinho"""
+        now = time.time()
+        self._purge(now)
+        if expires_at <= now:
+            return
+        self._expires[jti] = max(expires_at, self._expires.get(jti, 0.0))
+        heapq.heappush(self._heap, (expires_at, jti))
+        if self._bloom is not None:
+            self._bloom.add(jti)
+            if len(self._expires) > self._bloom.capacity:
+                self._rebuild(2 * len(self._expires))
+
+    def is_revoked(self, jti: str) -> bool:
+        """Indica se o jti foi revogado (e o token ainda não expirou)"""
+        if self._bloom is not None and jti not in self._bloom:
+            self.bloom_negatives += 1
+            return False
+        expires_at = self._expires.get(jti)
+        if expires_at is None:
+            if self._bloom is not None:
+                self.bloom_false_positives += 1
+            return False
+        return expires_at > time.time()
+
+    def _purge(self, now: float) -> None:
+        """Remove os jti vencidos; reconstrói o filtro se muitos bits ficaram órfãos"""
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._heap)
+            if self._expires.get(jti) == expires_at:
+                del self._expires[jti]
+                self._stale += 1
+        if self._bloom is not None and self._stale > self._bloom.capacity // 2:
+            self._rebuild(max(self.capacity, 2 * len(self._expires)))
+
+    def _rebuild(self, capacity: int) -> None:
+        self._bloom = BloomFilter(capacity, self.error_rate)
+        for jti in self._expires:
+            self._bloom.add(jti)
+        self._stale = 0
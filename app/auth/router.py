@@ -2,14 +2,81 @@
 Rotas da API de autenticação.
 Segue Single Responsibility - apenas definição de endpoints HTTP.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.auth.schemas import UserCreate, UserLogin, TokenResponse, UserResponse
+import json
+from typing import AsyncIterator, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.types import Receive, Scope, Send
+from app.auth.api_keys import ApiKeyService
+from app.auth.config import auth_config
+from app.auth.responses import introspection_response, token_response, user_response
+from app.auth.bulk_import import FORMATS, UserImporter, iter_records
+from app.auth.hashing import HashingQueueFullError, PasswordHasher
+from app.auth.rate_limit import LoginRateLimitedError
+from app.auth.schemas import (
+    ApiKeyCreate,
+    ApiKeyCreatedResponse,
+    ApiKeyResponse,
+    IntrospectRequest,
+    IntrospectResponse,
+    RefreshRequest,
+    TokenIntrospectionResponse,
+    UserCreate,
+    UserLogin,
+    TokenResponse,
+    UserResponse,
+)
 from app.auth.service import AuthService
-from app.auth.dependencies import get_auth_service, get_current_user
-from app.auth.models import User
+from app.auth.dependencies import (
+    security,
+    get_api_key_service,
+    get_auth_service,
+    get_client_ip,
+    get_current_user,
+    get_import_admin,
+    get_password_hasher,
+    get_session_user,
+    get_token_signer,
+    get_user_repository,
+)
+from app.auth.models import ApiKey, AuthenticatedUser, IntrospectionResult, TokenPair, User
+from app.auth.repository import IUserRepository
+from app.auth.signing import TokenSigner
 
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
+# Rotas na raiz do servidor (padrão .well-known)
+jwks_router = APIRouter(tags=["authentication"])
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que não escuta desconexões em paralelo.
+    O corpo da requisição continua sendo lido enquanto a resposta é enviada,
+    e a escuta padrão de desconexão consumiria as mensagens do corpo.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _service_unavailable(error: Exception) -> HTTPException:
+    """Resposta 503 rápida quando o pool de hashing está saturado"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": "1"},
+    )
+
+
+def _token_pair_response(tokens: TokenPair) -> Union[TokenResponse, Response]:
+    """Corpo de TokenResponse pelo caminho padrão ou pelo rápido (FAST_JSON_RESPONSES)"""
+    if auth_config.FAST_JSON_RESPONSES:
+        return token_response(tokens.access_token, tokens.refresh_token)
+    return TokenResponse(access_token=tokens.access_token, refresh_token=tokens.refresh_token)
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -36,40 +103,239 @@ async def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except HashingQueueFullError as e:
+        raise _service_unavailable(e)
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
     credentials: UserLogin,
-    auth_service: AuthService = Depends(get_auth_service)
-) -> TokenResponse:
+    auth_service: AuthService = Depends(get_auth_service),
+    client_ip: Optional[str] = Depends(get_client_ip)
+) -> Union[TokenResponse, Response]:
     """
     Endpoint para login de usuário.
-    Retorna token JWT para autenticação.
+    Retorna token JWT para autenticação e o refresh token para renová-lo.
     """
     try:
-        access_token: str = await auth_service.login(
+        tokens: TokenPair = await auth_service.login(
             email=credentials.email,
-            password=credentials.password
+            password=credentials.password,
+            client_ip=client_ip
+        )
+        return _token_pair_response(tokens)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
+    except LoginRateLimitedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": e.retry_after_header},
         )
-        return TokenResponse(access_token=access_token)
+    except HashingQueueFullError as e:
+        raise _service_unavailable(e)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(
+    request_data: RefreshRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+) -> Union[TokenResponse, Response]:
+    """
+    Endpoint para renovar o access token.
+    O refresh token é trocado por um novo a cada uso; reutilizar um antigo revoga a sessão.
+    """
+    try:
+        tokens: TokenPair = await auth_service.refresh(request_data.refresh_token)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e)
         )
+    return _token_pair_response(tokens)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> Response:
+    """
+    Endpoint para encerrar a sessão.
+    Revoga o access token informado e os refresh tokens emitidos junto com ele.
+    """
+    if not auth_service.logout(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido ou expirado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
-) -> UserResponse:
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> Union[UserResponse, Response]:
     """
     Endpoint para obter informações do usuário autenticado.
     Requer token JWT válido.
     """
+    if auth_config.FAST_JSON_RESPONSES:
+        return user_response(current_user)
     return UserResponse(
         id=current_user.id,
         email=current_user.email,
         name=current_user.name
     )
+
+
+@router.post("/introspect", response_model=IntrospectResponse)
+async def introspect(
+    request_data: IntrospectRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> Union[IntrospectResponse, Response]:
+    """
+    Endpoint para validar um lote de access tokens (gateways e outros serviços do ERP).
+    Requer autenticação (de preferência uma chave de API do serviço chamador).
+    Retorna, na ordem enviada, se cada token está ativo, suas claims e,
+    com include_user, o usuário dono dele.
+    """
+    if len(request_data.tokens) > auth_config.INTROSPECT_MAX_TOKENS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {auth_config.INTROSPECT_MAX_TOKENS} tokens por chamada"
+        )
+    results: list[IntrospectionResult] = await auth_service.introspect(
+        request_data.tokens, request_data.include_user
+    )
+    if auth_config.FAST_JSON_RESPONSES:
+        return introspection_response(results)
+    return IntrospectResponse(results=[
+        TokenIntrospectionResponse(
+            active=result.active,
+            claims=result.claims,
+            user=(
+                UserResponse(id=result.user.id, email=result.user.email, name=result.user.name)
+                if result.user is not None else None
+            )
+        )
+        for result in results
+    ])
+
+
+@router.post("/api-keys", response_model=ApiKeyCreatedResponse, status_code=status.HTTP_201_CREATED)
+async def issue_api_key(
+    request_data: ApiKeyCreate,
+    current_user: AuthenticatedUser = Depends(get_session_user),
+    api_key_service: ApiKeyService = Depends(get_api_key_service)
+) -> ApiKeyCreatedResponse:
+    """
+    Endpoint para emitir uma chave de API para integrações.
+    Requer o token JWT de um login. A chave autentica como o usuário que a
+    emitiu (Authorization: Bearer <chave>) e só é exibida nesta resposta.
+    """
+    key, api_key = await api_key_service.issue(current_user.id, request_data.name)
+    return ApiKeyCreatedResponse(
+        id=api_key.id,
+        name=api_key.name,
+        prefix=api_key.prefix,
+        created_at=api_key.created_at,
+        revoked_at=api_key.revoked_at,
+        api_key=key
+    )
+
+
+@router.get("/api-keys", response_model=list[ApiKeyResponse])
+async def list_api_keys(
+    current_user: AuthenticatedUser = Depends(get_session_user),
+    api_key_service: ApiKeyService = Depends(get_api_key_service)
+) -> list[ApiKeyResponse]:
+    """
+    Endpoint para listar as chaves de API do usuário, inclusive revogadas.
+    Requer o token JWT de um login.
+    """
+    api_keys: list[ApiKey] = await api_key_service.list_keys(current_user.id)
+    return [ApiKeyResponse.model_validate(api_key) for api_key in api_keys]
+
+
+@router.delete("/api-keys/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_api_key(
+    key_id: int = Path(..., ge=1),
+    current_user: AuthenticatedUser = Depends(get_session_user),
+    api_key_service: ApiKeyService = Depends(get_api_key_service)
+) -> Response:
+    """
+    Endpoint para revogar uma chave de API do usuário.
+    Requer o token JWT de um login.
+    """
+    if not await api_key_service.revoke(current_user.id, key_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chave de API não encontrada"
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post(
+    "/users/import",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"$ref": "#/components/schemas/UserCreate"}},
+                "text/csv": {"schema": {"type": "string", "example": "email,name,password"}},
+            },
+        }
+    },
+)
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson ou csv (padrão: pelo Content-Type)"),
+    batch_size: Optional[int] = Query(None, ge=1, le=5000),
+    current_user: AuthenticatedUser = Depends(get_import_admin),
+    user_repository: IUserRepository = Depends(get_user_repository),
+    password_hasher: PasswordHasher = Depends(get_password_hasher)
+) -> StreamingResponse:
+    """
+    Endpoint para importação em massa de usuários (NDJSON ou CSV).
+    Restrito aos administradores de USER_IMPORT_ADMIN_EMAILS (token de login ou
+    chave de API); com a lista vazia (padrão), responde 403 para todos.
+    O corpo é lido em streaming e a resposta é um
+    NDJSON com o resultado de cada linha, seguido de um resumo.
+    """
+    fmt: str = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Formato inválido: {fmt} (use {' ou '.join(FORMATS)})"
+        )
+
+    importer = UserImporter(user_repository, password_hasher, batch_size)
+
+    async def results() -> AsyncIterator[bytes]:
+        async for result in importer.run(iter_records(request.stream(), fmt)):
+            yield (json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8")
+
+    return _DuplexStreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@jwks_router.get("/.well-known/jwks.json")
+def jwks(request: Request, token_signer: TokenSigner = Depends(get_token_signer)) -> Response:
+    """
+    Chaves públicas (JWK Set) para outros serviços verificarem os JWT localmente.
+    Vazio com HS256. Resposta pré-serializada, com cache longo e ETag (304 se não mudou).
+    """
+    token_signer.load()
+    headers: dict[str, str] = {
+        "Cache-Control": f"public, max-age={auth_config.JWKS_CACHE_MAX_AGE_SECONDS}",
+        "ETag": token_signer.jwks_etag,
+    }
+    if request.headers.get("if-none-match") == token_signer.jwks_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=token_signer.jwks_body, media_type="application/json", headers=headers)
@@ -2,6 +2,8 @@
 Schemas para validação de dados de entrada e saída da API de autenticação.
 Segue o princípio de Single Responsibility - apenas validação de dados.
 """
+from datetime import datetime
+from typing import Any, Optional
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -24,9 +26,15 @@ class UserLogin(BaseModel):
 
 
 class TokenResponse(BaseModel):
-    """Schema de resposta com token de acesso"""
+    """Schema de resposta com token de acesso e, se habilitado, refresh token"""
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    """Schema para renovação do access token"""
+    refresh_token: str
 
 
 class UserResponse(BaseModel):
@@ -37,3 +45,43 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ApiKeyCreate(BaseModel):
+    """Schema para emissão de chave de API"""
+    name: str = Field(..., min_length=2, max_length=100, description="Identificação da integração")
+
+
+class ApiKeyResponse(BaseModel):
+    """Schema de resposta com os dados de uma chave de API (sem a chave)"""
+    id: int
+    name: str
+    prefix: str
+    created_at: datetime
+    revoked_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ApiKeyCreatedResponse(ApiKeyResponse):
+    """Schema de resposta da emissão: inclui a chave, exibida uma única vez"""
+    api_key: str
+
+
+class IntrospectRequest(BaseModel):
+    """Schema para introspecção de um lote de tokens"""
+    tokens: list[str] = Field(..., min_length=1, description="Access tokens a validar")
+    include_user: bool = Field(False, description="Inclui o usuário dono de cada token ativo")
+
+
+class TokenIntrospectionResponse(BaseModel):
+    """Resultado da introspecção de um token (claims só se ativo)"""
+    active: bool
+    claims: Optional[dict[str, Any]] = None
+    user: Optional[UserResponse] = None
+
+
+class IntrospectResponse(BaseModel):
+    """Schema de resposta da introspecção, na ordem dos tokens enviados"""
+    results: list[TokenIntrospectionResponse]
@@ -3,24 +3,24 @@ Serviço de autenticação contendo a lógica de negócio.
 Segue Single Responsibility Principle - apenas lógica de autenticação.
 Segue Dependency Inversion Principle - depende da abstração IUserRepository.
 """
+import asyncio
+import logging
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Any
-from jose import JWTError, jwt
-import bcrypt
-from app.auth.models import User
+from typing import Optional, Any, Sequence
+from app.auth.hashing import PasswordHasher
+from app.auth.models import AuthenticatedUser, IntrospectionResult, Principal, TokenPair, User
+from app.auth.rate_limit import LoginRateLimiter
+from app.auth.refresh_tokens import RefreshFamily, RefreshTokenStore
 from app.auth.repository import IUserRepository
+from app.auth.revocation import RevokedTokenIndex, TokenVersionStore
+from app.auth.signing import InvalidTokenError, TokenSigner
+from app.auth.token_cache import TokenCache
 from app.auth.config import auth_config
+from app.metrics import AUTH_STAGE_SECONDS, timed
 
-
-def _truncate_password(password: str) -> bytes:
-    """
-    Trunca a senha para 72 bytes (limitação do bcrypt).
-    Retorna os bytes da senha truncada.
-    """
-    password_bytes = password.encode('utf-8')
-    if len(password_bytes) > 72:
-        return password_bytes[:72]
-    return password_bytes
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
@@ -29,40 +29,52 @@ class AuthService:
     Contém toda a lógica de negócio relacionada a autenticação.
     """
 
-    def __init__(self, user_repository: IUserRepository) -> None:
+    def __init__(
+        self,
+        user_repository: IUserRepository,
+        password_hasher: Optional[PasswordHasher] = None,
+        token_cache: Optional[TokenCache] = None,
+        token_versions: Optional[TokenVersionStore] = None,
+        rate_limiter: Optional[LoginRateLimiter] = None,
+        revoked_tokens: Optional[RevokedTokenIndex] = None,
+        refresh_tokens: Optional[RefreshTokenStore] = None,
+        signer: Optional[TokenSigner] = None
+    ) -> None:
         """
-        Injeção de dependência do repositório.
+        Injeção de dependência do repositório, do pool de hashing, do cache de tokens,
+        do controle de versões (revogação) de tokens, do limite de tentativas de login
+        (None desativa), do índice de jti revogados, das famílias de refresh tokens
+        e das chaves de assinatura dos JWT.
         Segue Dependency Inversion Principle.
         """
         self.user_repository: IUserRepository = user_repository
+        self.password_hasher: PasswordHasher = password_hasher or PasswordHasher()
+        self.token_cache: TokenCache = token_cache if token_cache is not None else TokenCache()
+        self.token_versions: TokenVersionStore = token_versions or TokenVersionStore()
+        self.rate_limiter: Optional[LoginRateLimiter] = rate_limiter
+        self.revoked_tokens: RevokedTokenIndex = revoked_tokens if revoked_tokens is not None else RevokedTokenIndex()
+        self.refresh_tokens: RefreshTokenStore = refresh_tokens if refresh_tokens is not None else RefreshTokenStore()
+        self.signer: TokenSigner = signer or TokenSigner()
+        # Referências às tarefas de rehash em background (evita coleta prematura)
+        self._background_tasks: set[asyncio.Task[None]] = set()
 
-    def _hash_password(self, password: str) -> str:
+    @timed(AUTH_STAGE_SECONDS, "hash_password")
+    async def _hash_password(self, password: str) -> str:
         """
-        Gera hash da senha usando bcrypt.
+        Gera hash da senha usando bcrypt no pool de workers.
         Bcrypt tem limitação de 72 bytes, então truncamos se necessário.
         """
-        # Trunca a senha para 72 bytes antes de fazer o hash
-        password_bytes = _truncate_password(password)
-
-        # Gera o salt e faz o hash usando bcrypt diretamente
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password_bytes, salt)
+        return await self.password_hasher.hash(password)
 
-        # Retorna como string (formato bcrypt)
-        return hashed.decode('utf-8')
-
-    def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+    @timed(AUTH_STAGE_SECONDS, "verify_password")
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
-        Verifica se a senha está correta usando bcrypt.
+        Verifica se a senha está correta usando bcrypt no pool de workers.
         Trunca a senha se necessário para compatibilidade com bcrypt.
         """
-        # Trunca a senha para 72 bytes antes de verificar
-        password_bytes = _truncate_password(plain_password)
-        hashed_bytes = hashed_password.encode('utf-8')
-
-        # Verifica usando bcrypt diretamente
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
+        return await self.password_hasher.verify(plain_password, hashed_password)
 
+    @timed(AUTH_STAGE_SECONDS, "create_access_token")
     def _create_access_token(self, data: dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """Cria token JWT"""
         to_encode = data.copy()
@@ -71,22 +83,60 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=auth_config.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, auth_config.SECRET_KEY, algorithm=auth_config.ALGORITHM)
-        return encoded_jwt
+        to_encode.update({"exp": expire, "iat": datetime.utcnow()})
+        return self.signer.encode(to_encode)
+
+    def _create_refresh_token(self, family_id: str, family: RefreshFamily) -> str:
+        """Cria o refresh token vigente da família; expira junto com a família"""
+        to_encode: dict[str, Any] = {
+            "sub": str(family.user_id),
+            "typ": "refresh",
+            "jti": family.current_jti,
+            "fam": family_id,
+            "exp": int(family.expires_at),
+            "iat": datetime.utcnow(),
+        }
+        return self.signer.encode(to_encode)
+
+    def _issue_tokens(self, claims: dict[str, Any], family_id: Optional[str] = None) -> TokenPair:
+        """
+        Emite um access token e, com REFRESH_TOKEN_EXPIRE_DAYS > 0, o refresh token
+        da família (uma nova no login, a mesma na rotação).
+        """
+        access_jti: str = uuid.uuid4().hex
+        access_token_expires = timedelta(minutes=auth_config.ACCESS_TOKEN_EXPIRE_MINUTES)
+        if auth_config.REFRESH_TOKEN_EXPIRE_DAYS <= 0:
+            return TokenPair(self._create_access_token({**claims, "jti": access_jti}, access_token_expires))
+
+        now = time.time()
+        family: Optional[RefreshFamily] = self.refresh_tokens.get(family_id) if family_id else None
+        if family_id is None or family is None:
+            family_id = uuid.uuid4().hex
+            family = RefreshFamily(
+                user_id=int(claims["sub"]),
+                current_jti="",
+                claims=claims,
+                expires_at=now + auth_config.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+            )
+            self.refresh_tokens.create(family_id, family)
+
+        family.current_jti = uuid.uuid4().hex
+        family.access_jti = access_jti
+        family.access_expires_at = now + access_token_expires.total_seconds()
+        access_token = self._create_access_token(
+            {**claims, "jti": access_jti, "fam": family_id}, access_token_expires
+        )
+        return TokenPair(access_token, self._create_refresh_token(family_id, family))
 
     async def register_user(self, email: str, name: str, password: str) -> User:
         """
         Registra um novo usuário.
-        Lógica de negócio: valida, hash da senha e cria usuário.
+        Lógica de negócio: hash da senha e criação em uma única escrita;
+        email duplicado é detectado pela restrição UNIQUE do repositório
+        (EmailAlreadyRegisteredError), sem consulta prévia.
         """
-        # Verifica se usuário já existe
-        existing_user = await self.user_repository.get_by_email(email)
-        if existing_user:
-            raise ValueError("Email já está cadastrado")
-
         # Hash da senha
-        hashed_password = self._hash_password(password)
+        hashed_password = await self._hash_password(password)
 
         # Cria usuário
         user = await self.user_repository.create(
@@ -106,51 +156,212 @@ class AuthService:
         if not user:
             return None
 
-        if not self._verify_password(password, user.hashed_password):
+        if not await self._verify_password(password, user.hashed_password):
             return None
 
+        if self.password_hasher.needs_rehash(user.hashed_password):
+            # Migra o hash para o custo configurado sem atrasar a resposta do login
+            task = asyncio.create_task(self._rehash_password(user.id, password))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
         return user
 
-    async def login(self, email: str, password: str) -> str:
+    async def _rehash_password(self, user_id: int, password: str) -> None:
+        """Refaz o hash da senha com o custo atual e persiste no repositório"""
+        try:
+            hashed_password = await self._hash_password(password)
+            await self.user_repository.update_password(user_id, hashed_password)
+        except Exception as e:
+            # Falha no rehash não afeta o login; tenta de novo no próximo
+            logger.warning("Falha ao atualizar hash da senha: %s", e, extra={"user_id": user_id}, exc_info=True)
+
+    async def login(self, email: str, password: str, client_ip: Optional[str] = None) -> TokenPair:
         """
-        Realiza login e retorna token JWT.
-        Combina autenticação e geração de token.
+        Realiza login e retorna o access token JWT e o refresh token.
+        Combina autenticação e geração de token. O limite de tentativas é
+        checado antes da busca e do bcrypt (LoginRateLimitedError).
         """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.check(email, client_ip)
+
         user = await self.authenticate_user(email, password)
         if not user:
             raise ValueError("Email ou senha incorretos")
 
-        access_token_expires = timedelta(minutes=auth_config.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = self._create_access_token(
-            data={"sub": str(user.id), "email": user.email},
-            expires_delta=access_token_expires
-        )
+        return self._issue_tokens(self._user_claims(user))
+
+    @timed(AUTH_STAGE_SECONDS, "refresh")
+    async def refresh(self, refresh_token: str) -> TokenPair:
+        """
+        Troca um refresh token por um novo par (rotação).
+        Custa uma decodificação JWT e buscas em memória: sem repositório e sem bcrypt.
+        Apresentar um refresh token já trocado indica vazamento, e a família
+        inteira é encerrada (inclusive o último access token emitido).
+        """
+        try:
+            payload: dict[str, Any] = self.signer.decode(refresh_token)
+        except InvalidTokenError:
+            raise ValueError("Refresh token inválido ou expirado")
+
+        jti: Any = payload.get("jti")
+        family_id: Any = payload.get("fam")
+        if payload.get("typ") != "refresh" or not isinstance(jti, str) or not isinstance(family_id, str):
+            raise ValueError("Refresh token inválido ou expirado")
+
+        family: Optional[RefreshFamily] = self.refresh_tokens.get(family_id)
+        if self.revoked_tokens.is_revoked(jti) or (family is not None and jti != family.current_jti):
+            self._revoke_family(family_id)
+            logger.warning("Reuso de refresh token detectado; família revogada", extra={"user_id": payload.get("sub")})
+            raise ValueError("Refresh token inválido ou expirado")
+        if family is None:
+            raise ValueError("Refresh token inválido ou expirado")
 
-        return access_token
+        # Uma revogação por versão (revoke_user_tokens) também encerra as famílias
+        if family.claims.get("ver", 0) != self.token_versions.get(family.user_id):
+            self._revoke_family(family_id)
+            raise ValueError("Refresh token inválido ou expirado")
 
+        self.revoked_tokens.revoke(jti, float(payload["exp"]))
+        return self._issue_tokens(family.claims, family_id)
+
+    def logout(self, token: str) -> bool:
+        """
+        Revoga o access token e a família de refresh tokens de onde ele veio.
+        Retorna False se o token não for um access token válido.
+        """
+        payload = self.verify_token(token)
+        if payload is None or payload.get("typ") == "refresh":
+            return False
+        jti: Any = payload.get("jti")
+        if isinstance(jti, str):
+            self.revoked_tokens.revoke(jti, float(payload["exp"]))
+        family_id: Any = payload.get("fam")
+        if isinstance(family_id, str):
+            self._revoke_family(family_id)
+        return True
+
+    def _revoke_family(self, family_id: str) -> None:
+        """Encerra a família: o refresh token vigente e o último access token deixam de valer"""
+        family: Optional[RefreshFamily] = self.refresh_tokens.revoke(family_id)
+        if family is None:
+            return
+        if family.current_jti:
+            self.revoked_tokens.revoke(family.current_jti, family.expires_at)
+        if family.access_jti:
+            self.revoked_tokens.revoke(family.access_jti, family.access_expires_at)
+
+    def _user_claims(self, user: User) -> dict[str, Any]:
+        """
+        Claims do usuário no token. `ver` é a versão de token vigente do usuário;
+        no modo stateless o nome também vai no token para dispensar o repositório.
+        """
+        claims: dict[str, Any] = {
+            "sub": str(user.id),
+            "email": user.email,
+            "ver": self.token_versions.get(user.id),
+        }
+        if auth_config.AUTH_STATELESS:
+            claims["name"] = user.name
+        return claims
+
+    def revoke_user_tokens(self, user_id: int) -> None:
+        """Invalida todos os tokens já emitidos para o usuário"""
+        self.token_versions.bump(user_id)
+
+    @timed(AUTH_STAGE_SECONDS, "verify_token")
     def verify_token(self, token: str) -> Optional[dict[str, Any]]:
         """
         Verifica e decodifica token JWT.
         Retorna payload se válido, None caso contrário.
+        Tokens já verificados vêm do cache até expirarem.
         """
+        cached: Optional[dict[str, Any]] = self.token_cache.get(token)
+        if cached is not None:
+            return cached
+
         try:
-            payload: dict[str, Any] = jwt.decode(token, auth_config.SECRET_KEY, algorithms=[auth_config.ALGORITHM])
-            return payload
-        except JWTError:
+            payload: dict[str, Any] = self.signer.decode(token)
+        except InvalidTokenError:
             return None
 
-    async def get_current_user(self, token: str) -> Optional[User]:
+        self.token_cache.put(token, payload)
+        return payload
+
+    async def get_current_user(self, token: str) -> Optional[AuthenticatedUser]:
         """
         Obtém usuário atual a partir do token.
-        Combina verificação de token e busca de usuário.
+        Combina verificação de token e busca de usuário; no modo stateless,
+        monta o principal a partir das claims sem consultar o repositório.
         """
         payload = self.verify_token(token)
-        if payload is None:
+        user_id: Optional[int] = self._access_user_id(payload)
+        if payload is None or user_id is None:
+            return None
+
+        if auth_config.AUTH_STATELESS:
+            principal = self._principal_from_claims(user_id, payload)
+            if principal is not None:
+                return principal
+
+        user: Optional[User] = await self.user_repository.get_by_id(user_id)
+        return user
+
+    @timed(AUTH_STAGE_SECONDS, "introspect")
+    async def introspect(self, tokens: Sequence[str], include_user: bool = False) -> list[IntrospectionResult]:
+        """
+        Valida um lote de tokens (introspecção para outros serviços do ERP).
+        Cada token distinto é verificado uma única vez e os usuários saem de uma
+        única consulta em lote. Fora do modo stateless, um token cujo usuário não
+        existe mais é inativo, como em get_current_user. Resultado alinhado à entrada.
+        """
+        valid: dict[str, tuple[int, dict[str, Any]]] = {}
+        for token in dict.fromkeys(tokens):
+            payload = self.verify_token(token)
+            user_id: Optional[int] = self._access_user_id(payload)
+            if payload is not None and user_id is not None:
+                valid[token] = (user_id, payload)
+
+        users: dict[int, User] = {}
+        if valid and (include_user or not auth_config.AUTH_STATELESS):
+            users = await self.user_repository.get_many_by_ids(list({user_id for user_id, _ in valid.values()}))
+
+        results: dict[str, IntrospectionResult] = {}
+        for token, (user_id, payload) in valid.items():
+            user: Optional[AuthenticatedUser] = users.get(user_id)
+            if auth_config.AUTH_STATELESS:
+                user = user or self._principal_from_claims(user_id, payload)
+            elif user is None:
+                continue
+            results[token] = IntrospectionResult(payload, user if include_user else None)
+
+        inactive = IntrospectionResult()
+        return [results.get(token, inactive) for token in tokens]
+
+    def _access_user_id(self, payload: Optional[dict[str, Any]]) -> Optional[int]:
+        """ID do usuário de um access token válido e não revogado; None caso contrário"""
+        if payload is None or payload.get("typ") == "refresh":
             return None
 
         user_id: Any = payload.get("sub")
         if user_id is None:
             return None
+        user_id = int(str(user_id))
 
-        user: Optional[User] = await self.user_repository.get_by_id(int(str(user_id)))
-        return user
+        # Tokens emitidos antes de uma revogação carregam uma versão antiga
+        if payload.get("ver", 0) != self.token_versions.get(user_id):
+            return None
+
+        # Tokens revogados individualmente (logout, reuso de refresh token)
+        jti: Any = payload.get("jti")
+        if jti is not None and self.revoked_tokens.is_revoked(jti):
+            return None
+        return user_id
+
+    def _principal_from_claims(self, user_id: int, payload: dict[str, Any]) -> Optional[Principal]:
+        """Principal a partir das claims; None se o token não tiver os dados necessários"""
+        email: Any = payload.get("email")
+        name: Any = payload.get("name")
+        if not isinstance(email, str) or not isinstance(name, str):
+            return None
+        return Principal(id=user_id, email=email, name=name)
@@ -0,0 +1,219 @@
+"""
+Assinatura e verificação dos JWT.
+HS256 (padrão) usa o SECRET_KEY compartilhado. Com RS256/ES256, os tokens são
+assinados com uma chave privada e levam o `kid` no cabeçalho; as chaves
+públicas ficam em /.well-known/jwks.json, e outros serviços verificam os
+tokens localmente, sem o segredo e sem chamar esta API.
+As chaves são carregadas uma única vez: reconstruir uma chave RSA a partir do
+PEM a cada assinatura custa dezenas de milissegundos.
+"""
+import base64
+import hashlib
+import json
+import logging
+from typing import Any, Optional
+from app.auth.config import auth_config
+
+logger = logging.getLogger(__name__)
+
+# Algoritmos de chave pública aceitos em ALGORITHM (suportados pelo python-jose)
+ASYMMETRIC_ALGORITHMS: tuple[str, ...] = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+# Curva de cada algoritmo ECDSA, para gerar a chave efêmera de desenvolvimento
+_EC_CURVES: dict[str, str] = {"ES256": "SECP256R1", "ES384": "SECP384R1", "ES512": "SECP521R1"}
+
+
+class InvalidTokenError(ValueError):
+    """Token com assinatura inválida, expirado, malformado ou com kid desconhecido"""
+
+
+def _jose() -> tuple[Any, type[Exception]]:
+    """
+    python-jose (jwt, JWTError) importado no primeiro uso: o import, com o
+    backend cryptography, custa ~40 ms e fica fora do cold start (app.startup
+    o aquece em background).
+    """
+    from jose import JWTError, jwt
+    return jwt, JWTError
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def jwk_thumbprint(public_jwk: dict[str, Any]) -> str:
+    """Thumbprint RFC 7638 (SHA-256 dos membros obrigatórios da JWK), usado como kid padrão"""
+    required: tuple[str, ...] = ("e", "kty", "n") if public_jwk["kty"] == "RSA" else ("crv", "kty", "x", "y")
+    canonical = json.dumps({name: public_jwk[name] for name in required}, separators=(",", ":"), sort_keys=True)
+    return _b64url(hashlib.sha256(canonical.encode("utf-8")).digest())
+
+
+def parse_key_entries(value: str) -> list[tuple[Optional[str], str]]:
+    """
+    JWT_SIGNING_KEYS: "kid:caminho.pem,caminho.pem,..." -> [(kid ou None, caminho)].
+    A primeira chave assina; as demais só verificam (rotação).
+    """
+    entries: list[tuple[Optional[str], str]] = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        kid, separator, path = item.partition(":")
+        entries.append((kid.strip(), path.strip()) if separator else (None, item))
+    return entries
+
+
+class SigningKey:
+    """Chave já carregada (objeto do python-jose) com o kid e a JWK pública"""
+
+    __slots__ = ("kid", "algorithm", "private_key", "public_key", "public_jwk")
+
+    def __init__(
+        self,
+        kid: Optional[str],
+        algorithm: str,
+        private_key: Any,
+        public_key: Any,
+        public_jwk: Optional[dict[str, Any]]
+    ) -> None:
+        self.kid: Optional[str] = kid
+        self.algorithm: str = algorithm
+        # None para chaves só de verificação (arquivo com a chave pública)
+        self.private_key: Any = private_key
+        self.public_key: Any = public_key
+        self.public_jwk: Optional[dict[str, Any]] = public_jwk
+
+
+class TokenSigner:
+    """
+    Assina e verifica JWT com as chaves de AuthConfig.
+    HS256: SECRET_KEY, sem kid e com JWKS vazio (como antes).
+    RS*/ES*: JWT_SIGNING_KEYS; a primeira chave assina e todas verificam, pelo kid.
+    Sem chaves configuradas, gera uma chave efêmera (só para desenvolvimento).
+    As chaves são carregadas em load(): no startup para algoritmos assimétricos
+    (configuração inválida impede a subida), no primeiro uso para HS256.
+    """
+
+    def __init__(
+        self,
+        algorithm: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        signing_keys: Optional[str] = None
+    ) -> None:
+        self.algorithm: str = (algorithm or auth_config.ALGORITHM).upper()
+        self.symmetric: bool = self.algorithm not in ASYMMETRIC_ALGORITHMS
+        self._secret_key: str = secret_key or auth_config.SECRET_KEY
+        self._signing_keys: str = signing_keys if signing_keys is not None else auth_config.JWT_SIGNING_KEYS
+        self._active: Optional[SigningKey] = None
+        self._by_kid: dict[str, SigningKey] = {}
+        self.jwks: dict[str, Any] = {"keys": []}
+        # Corpo e ETag do JWKS, montados uma vez em load()
+        self.jwks_body: bytes = b'{"keys":[]}'
+        self.jwks_etag: str = ""
+
+    def load(self) -> None:
+        """Carrega (uma única vez) as chaves e monta o JWKS"""
+        if self._active is not None:
+            return
+        from jose import jwk
+
+        if self.symmetric:
+            secret = jwk.construct(self._secret_key, self.algorithm)
+            self._active = SigningKey(None, self.algorithm, secret, secret, None)
+            self._build_jwks()
+            return
+
+        keys: list[SigningKey] = [
+            self._load_key(jwk, kid, path) for kid, path in parse_key_entries(self._signing_keys)
+        ]
+        if not keys:
+            keys = [self._ephemeral_key(jwk)]
+        if keys[0].private_key is None:
+            raise ValueError("JWT_SIGNING_KEYS: a primeira chave assina os tokens e precisa ser uma chave privada")
+
+        self._by_kid = {}
+        for key in keys:
+            if key.kid in self._by_kid:
+                raise ValueError(f"JWT_SIGNING_KEYS: kid repetido: {key.kid}")
+            self._by_kid[str(key.kid)] = key
+        self.jwks = {"keys": [key.public_jwk for key in keys]}
+        self._build_jwks()
+        self._active = keys[0]
+        logger.info(
+            "Chaves de assinatura JWT carregadas",
+            extra={"algorithm": self.algorithm, "active_kid": keys[0].kid, "kids": list(self._by_kid)}
+        )
+
+    def _build_jwks(self) -> None:
+        self.jwks_body = json.dumps(self.jwks, separators=(",", ":")).encode("utf-8")
+        self.jwks_etag = f'"{_b64url(hashlib.sha256(self.jwks_body).digest()[:12])}"'
+
+    def _load_key(self, jwk: Any, kid: Optional[str], path: str) -> SigningKey:
+        """Lê um PEM (privado ou só público) e o converte para o objeto de chave do python-jose"""
+        with open(path, "r", encoding="utf-8") as pem_file:
+            pem = pem_file.read()
+        key = jwk.construct(pem, self.algorithm)
+        private_key = None if key.is_public() else key
+        return self._signing_key(kid, private_key, key.public_key() if private_key is not None else key)
+
+    def _ephemeral_key(self, jwk: Any) -> SigningKey:
+        """Chave gerada no startup: muda a cada reinício e difere entre workers"""
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+        logger.warning(
+            "JWT_SIGNING_KEYS não configurado: usando chave %s efêmera. "
+            "Tokens deixam de valer a cada reinício - NÃO use em produção!", self.algorithm
+        )
+        private: Any = (
+            ec.generate_private_key(getattr(ec, _EC_CURVES[self.algorithm])())
+            if self.algorithm.startswith("ES")
+            else rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        )
+        pem = private.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        key = jwk.construct(pem, self.algorithm)
+        return self._signing_key(None, key, key.public_key())
+
+    def _signing_key(self, kid: Optional[str], private_key: Any, public_key: Any) -> SigningKey:
+        public_jwk: dict[str, Any] = public_key.to_dict()
+        kid = kid or jwk_thumbprint(public_jwk)[:16]
+        public_jwk.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+        return SigningKey(kid, self.algorithm, private_key, public_key, public_jwk)
+
+    @property
+    def active_kid(self) -> Optional[str]:
+        self.load()
+        assert self._active is not None
+        return self._active.kid
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        """Assina as claims com a chave ativa (kid no cabeçalho, se houver)"""
+        self.load()
+        active = self._active
+        assert active is not None
+        jwt, _ = _jose()
+        headers: Optional[dict[str, Any]] = {"kid": active.kid} if active.kid else None
+        return jwt.encode(claims, active.private_key, algorithm=self.algorithm, headers=headers)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """
+        Verifica assinatura e expiração e retorna as claims.
+        Com chaves assimétricas, escolhe a chave pelo kid do cabeçalho.
+        Levanta InvalidTokenError se o token for inválido.
+        """
+        self.load()
+        jwt, JWTError = _jose()
+        try:
+            key: Optional[SigningKey]
+            if self.symmetric:
+                key = self._active
+            else:
+                key = self._by_kid.get(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise InvalidTokenError("kid desconhecido")
+            payload: dict[str, Any] = jwt.decode(token, key.public_key, algorithms=[self.algorithm])
+        except JWTError as e:
+            raise InvalidTokenError(str(e)) from e
+        return payload
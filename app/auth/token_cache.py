@@ -0,0 +1,73 @@
+"""
+Cache LRU de tokens JWT já verificados.
+Evita refazer HMAC, base64 e parsing JSON quando o mesmo bearer token
+chega repetidamente (clientes fazendo polling).
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from app.auth.config import auth_config
+
+
+class TokenCache:
+    """
+    Cache LRU limitado de payloads de tokens verificados.
+    O TTL de cada entrada é o menor entre o TTL configurado e o `exp` do token,
+    então um token nunca é aceito pelo cache depois de expirar.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None) -> None:
+        self.max_size: int = max_size if max_size is not None else auth_config.TOKEN_CACHE_SIZE
+        self.ttl_seconds: float = ttl_seconds if ttl_seconds is not None else auth_config.TOKEN_CACHE_TTL_SECONDS
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Proporção de consultas atendidas pelo cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, token: str) -> Optional[dict[str, Any]]:
+        """Retorna o payload em cache (somente leitura) ou None se ausente/expirado"""
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: dict[str, Any]) -> None:
+        """Guarda o payload verificado, respeitando o `exp` do token"""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        exp: Any = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+
+        self._entries[token] = (expires_at, payload)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        """Remove um token do cache (ex.: após revogação)"""
+        self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        """Esvazia o cache"""
+        self._entries.clear()
@@ -0,0 +1,142 @@
+"""
+Logging estruturado e não bloqueante da aplicação.
+Os módulos usam logging.getLogger(__name__); aqui fica a configuração:
+um QueueHandler (o event loop só enfileira o registro) com um QueueListener
+que formata em JSON e escreve no stdout em uma thread separada, níveis por
+módulo e amostragem de eventos DEBUG de alto volume.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import traceback
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# Atributos padrão de LogRecord; o que sobrar veio de extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+# Bibliotecas que logam cada requisição HTTP em INFO; sobrescreva via LOG_LEVELS
+_DEFAULT_LEVELS: dict[str, str] = {"httpx": "WARNING", "httpcore": "WARNING"}
+
+
+class LoggingConfig:
+    """Configurações de logging"""
+
+    LOG_LEVEL: str
+    LOG_LEVELS: dict[str, str]
+    LOG_FORMAT: str
+    LOG_DEBUG_SAMPLE_EVERY: int
+    LOG_QUEUE_SIZE: int
+
+    def __init__(self) -> None:
+        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+        # Níveis por módulo: "app.auth.repository_supabase=DEBUG,app.auth=WARNING"
+        self.LOG_LEVELS = {
+            name.strip(): level.strip().upper()
+            for name, _, level in (
+                item.partition("=") for item in os.getenv("LOG_LEVELS", "").split(",") if "=" in item
+            )
+        }
+        # json ou text
+        self.LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+        # Mantém 1 a cada N eventos DEBUG por logger (1 = todos)
+        self.LOG_DEBUG_SAMPLE_EVERY = max(1, int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "1")))
+        self.LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, incluindo os campos passados em extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = "".join(traceback.format_exception(*record.exc_info))
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Deixa passar só 1 a cada N registros DEBUG de cada logger; níveis maiores passam sempre"""
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self.every: int = every
+        self._counters: dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every <= 1:
+            return True
+        count = self._counters.get(record.name, 0)
+        self._counters[record.name] = count + 1
+        return count % self.every == 0
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta o registro (em vez de bloquear) se a fila estiver cheia"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve a mensagem e o traceback aqui; a serialização JSON fica para o listener
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info))
+            record.exc_info = None
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped = getattr(self, "dropped", 0) + 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(config: Optional[LoggingConfig] = None) -> None:
+    """Configura o logging da aplicação (idempotente)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    config = config or LoggingConfig()
+    output = logging.StreamHandler(sys.stdout)
+    if config.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(config.LOG_QUEUE_SIZE)
+    handler = _NonBlockingQueueHandler(log_queue)
+    handler.addFilter(DebugSamplingFilter(config.LOG_DEBUG_SAMPLE_EVERY))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(config.LOG_LEVEL)
+    for name, level in {**_DEFAULT_LEVELS, **config.LOG_LEVELS}.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e encerra a thread de escrita"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,21 +1,105 @@
-from typing import Dict
-from fastapi import FastAPI
-from dotenv import load_dotenv
-from app.auth.router import router as auth_router
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+from app.startup import StartupConfig, load_environment, startup_report, warm_up
+
+# Carrega variáveis de ambiente do arquivo .env (uma única vez; app.auth.config reaproveita)
+load_environment()
+startup_config: StartupConfig = StartupConfig()
+if startup_config.STARTUP_PROFILE_IMPORTS:
+    startup_report.profile_imports()
+
+from fastapi import FastAPI, Request, status  # noqa: E402
+from fastapi.responses import JSONResponse, PlainTextResponse  # noqa: E402
+from app.log import setup_logging  # noqa: E402
+
+setup_logging()
+startup_report.mark("framework_imports")
+
+from app.auth.router import jwks_router, router as auth_router  # noqa: E402
+from app.auth.dependencies import init_auth_state, shutdown_auth_state  # noqa: E402
+from app.auth.concurrency import ConcurrencyLimitMiddleware  # noqa: E402
+from app.auth.repository import RepositoryUnavailableError  # noqa: E402
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, registry  # noqa: E402
+from app.profiling import ProfilingConfig, install_profiling  # noqa: E402
+
+startup_report.mark("app_imports")
+
+
+async def _warm_up_deferred_imports() -> None:
+    """Carrega em uma thread os imports adiados, depois que o servidor começou a aceitar conexões"""
+    # Espera as primeiras requisições (health checks) passarem antes de disputar a CPU e o GIL
+    await asyncio.sleep(startup_config.STARTUP_WARMUP_DELAY_SECONDS)
+    timings = await asyncio.to_thread(warm_up)
+    startup_report.record("warmup", sum(timings.values()))
+    _finish_startup_report()
+
+
+def _finish_startup_report() -> None:
+    startup_report.stop_profiling()
+    if startup_config.STARTUP_REPORT:
+        startup_report.log(startup_config.STARTUP_REPORT_TOP)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Cria os recursos compartilhados no startup e os libera no shutdown"""
+    await init_auth_state(app)
+    startup_report.mark("lifespan")
+    startup_report.ready()
+    warmup_task = None
+    if startup_config.STARTUP_WARMUP:
+        warmup_task = asyncio.create_task(_warm_up_deferred_imports())
+    else:
+        _finish_startup_report()
+    try:
+        yield
+    finally:
+        if warmup_task is not None and not warmup_task.done():
+            warmup_task.cancel()
+        await shutdown_auth_state(app)
 
-# Carrega variáveis de ambiente do arquivo .env
-load_dotenv()
 
 app: FastAPI = FastAPI(
     title="ERP Backend API",
     description="API REST para sistema ERP",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Profiling sob demanda (middleware mais interno: mede só o tratamento da requisição).
+# Desligado, nada é registrado e o caminho da requisição não muda
+profiling_config: ProfilingConfig = ProfilingConfig()
+if profiling_config.PROFILING_ENABLED:
+    install_profiling(app, profiling_config)
+
+# Limita a concorrência por classe de rota (503 com a fila cheia)
+app.add_middleware(ConcurrencyLimitMiddleware)
+
+# Mede a duração de cada requisição por rota (middleware mais externo: inclui os 503 do limite)
+app.add_middleware(MetricsMiddleware)
+
 # Inclui rotas de autenticação
 app.include_router(auth_router)
+app.include_router(jwks_router)
+
+
+@app.exception_handler(RepositoryUnavailableError)
+async def repository_unavailable_handler(request: Request, exc: RepositoryUnavailableError) -> JSONResponse:
+    """Falha rápida com 503 quando o circuito do repositório está aberto ou a chamada estourou o prazo"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": exc.retry_after_header},
+    )
 
 
 @app.get("/")
 def read_root() -> Dict[str, str]:
     return {"message": "ERP Backend API", "version": "1.0.0"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    """Métricas no formato de texto do Prometheus"""
+    return PlainTextResponse(registry.render(), media_type=METRICS_CONTENT_TYPE)
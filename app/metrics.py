@@ -0,0 +1,276 @@
+"""
+Métricas da aplicação no formato de texto do Prometheus.
+Implementação mínima em memória (contadores, histogramas e gauges calculados
+na hora da coleta), sem dependência externa. Exposta em /metrics.
+"""
+import asyncio
+import functools
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Optional, TypeVar
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (segundos) adequados de ~0,5 ms (cache, JWT) a segundos (bcrypt, rede)
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    """Formata {a="1",b="2"} escapando aspas, barras e quebras de linha"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Inteiros sem casa decimal, +Inf no formato do Prometheus"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Contador monotônico com rótulos"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: tuple[str, ...] = labelnames
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        """Incrementa a série dos rótulos informados (na ordem de labelnames)"""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def collect(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram:
+    """Histograma com buckets fixos e rótulos"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: tuple[str, ...] = labelnames
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        # Por série: contagem por bucket (não cumulativa; o último é +Inf), soma e total
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Registra uma observação na série dos rótulos informados"""
+        series = self._series.get(labels)
+        if series is None:
+            series = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+            self._series[labels] = series
+        counts, totals = series
+        counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(series[1][1]) if series else 0
+
+    def collect(self) -> list[str]:
+        lines: list[str] = []
+        for labels, (counts, (total, count)) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {_format_value(count)}")
+        return lines
+
+
+class Gauge:
+    """Gauge cujo valor é lido de uma função no momento da coleta"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Optional[float]]) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.callback: Callable[[], Optional[float]] = callback
+
+    def collect(self) -> list[str]:
+        value = self.callback()
+        return [] if value is None else [f"{self.name} {_format_value(value)}"]
+
+
+Metric = Any  # Counter | Histogram | Gauge
+
+
+class MetricsRegistry:
+    """Conjunto de métricas renderizado no formato de exposição do Prometheus"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], Optional[float]]) -> Gauge:
+        """Registra (ou substitui, a cada startup) um gauge calculado na coleta"""
+        gauge = Gauge(name, documentation, callback)
+        self._metrics[name] = gauge
+        return gauge
+
+    def unregister(self, name: str) -> None:
+        self._metrics.pop(name, None)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def _register(self, metric: Any) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Texto no formato de exposição 0.0.4"""
+        lines: list[str] = []
+        for name, metric in sorted(self._metrics.items()):
+            samples = metric.collect()
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry: MetricsRegistry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS: Histogram = registry.histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições HTTP",
+    ("method", "route", "status"),
+)
+AUTH_STAGE_SECONDS: Histogram = registry.histogram(
+    "auth_stage_duration_seconds",
+    "Duração de cada etapa da autenticação (bcrypt, JWT)",
+    ("stage", "outcome"),
+)
+REPOSITORY_CALL_SECONDS: Histogram = registry.histogram(
+    "user_repository_call_duration_seconds",
+    "Duração das chamadas ao backend do repositório de usuários",
+    ("method", "outcome"),
+)
+
+
+def timed(histogram: Histogram, *labels: str) -> Callable[[F], F]:
+    """
+    Decorator que observa a duração de funções síncronas ou assíncronas.
+    O rótulo outcome (último) é "ok" ou "error", conforme a função levante exceção.
+    """
+
+    def decorator(fn: F) -> F:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                start = time.perf_counter()
+                outcome = "error"
+                try:
+                    result = await fn(*args, **kwargs)
+                    outcome = "ok"
+                    return result
+                finally:
+                    histogram.observe(time.perf_counter() - start, *labels, outcome)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                histogram.observe(time.perf_counter() - start, *labels, outcome)
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede cada requisição HTTP.
+    Usa o template da rota (/auth/me, não o path real) para não explodir a cardinalidade.
+    """
+
+    def __init__(self, app: ASGIApp, histogram: Histogram = HTTP_REQUEST_SECONDS) -> None:
+        self.app: ASGIApp = app
+        self.histogram: Histogram = histogram
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.histogram.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
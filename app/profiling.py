@@ -0,0 +1,323 @@
+"""
+Profiling sob demanda de requisições (cProfile).
+Desligado por padrão: sem PROFILING_ENABLED o middleware e as rotas de
+administração nem são registrados, então o caminho da requisição não muda.
+Ligado, perfila a requisição que trouxer o cabeçalho X-Profile-Token com o
+segredo configurado, ou uma a cada PROFILING_SAMPLE_EVERY requisições. Os
+perfis ficam em memória (os PROFILING_MAX_PROFILES mais recentes) e são
+consultados em /admin/profiles, com o mesmo cabeçalho.
+cProfile e pstats são importados só ao perfilar a primeira requisição.
+"""
+import hmac
+import io
+import itertools
+import logging
+import marshal
+import os
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.metrics import registry as metrics_registry
+
+if TYPE_CHECKING:
+    import pstats
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER: str = "X-Profile-Token"
+PROFILE_ID_HEADER: str = "X-Profile-Id"
+ADMIN_PREFIX: str = "/admin/profiles"
+
+_TOKEN_HEADER_KEY: bytes = PROFILE_TOKEN_HEADER.lower().encode("latin-1")
+_PROFILE_ID_HEADER_KEY: bytes = PROFILE_ID_HEADER.lower().encode("latin-1")
+
+PROFILES_CAPTURED = metrics_registry.counter(
+    "request_profiles_total",
+    "Requisições perfiladas com cProfile, por gatilho (header ou sample)",
+    ("trigger",),
+)
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+class ProfilingConfig:
+    """Configurações do profiling de requisições (lidas depois do .env)"""
+
+    PROFILING_ENABLED: bool
+    PROFILING_SECRET: str
+    PROFILING_SAMPLE_EVERY: int
+    PROFILING_MAX_PROFILES: int
+    PROFILING_TOP: int
+
+    def __init__(self) -> None:
+        # Registra o middleware e as rotas /admin/profiles; desligado, custo zero
+        self.PROFILING_ENABLED = _flag("PROFILING_ENABLED", "false")
+        # Valor do cabeçalho X-Profile-Token que dispara o profiling e libera a consulta
+        self.PROFILING_SECRET = os.getenv("PROFILING_SECRET", "")
+        # Perfila uma a cada N requisições (0 desativa a amostragem)
+        self.PROFILING_SAMPLE_EVERY = int(os.getenv("PROFILING_SAMPLE_EVERY", "0"))
+        # Perfis mantidos em memória (os mais antigos são descartados)
+        self.PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "20"))
+        # Linhas do relatório de texto, por padrão
+        self.PROFILING_TOP = int(os.getenv("PROFILING_TOP", "40"))
+
+
+class RequestProfile:
+    """Perfil de uma requisição: metadados e as estatísticas do cProfile"""
+
+    __slots__ = (
+        "id", "method", "path", "status_code", "duration", "created_at", "trigger", "concurrent_requests", "stats"
+    )
+
+    def __init__(
+        self,
+        id: int,
+        method: str,
+        path: str,
+        status_code: int,
+        duration: float,
+        trigger: str,
+        concurrent_requests: int,
+        stats: "pstats.Stats"
+    ) -> None:
+        self.id: int = id
+        self.method: str = method
+        self.path: str = path
+        self.status_code: int = status_code
+        self.duration: float = duration
+        self.created_at: float = time.time()
+        self.trigger: str = trigger
+        # Outras requisições em andamento durante o perfil: o trabalho delas no event loop também aparece
+        self.concurrent_requests: int = concurrent_requests
+        self.stats: "pstats.Stats" = stats
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration * 1000, 3),
+            "created_at": self.created_at,
+            "trigger": self.trigger,
+            "concurrent_requests": self.concurrent_requests,
+        }
+
+    def render(self, sort: str, limit: int) -> str:
+        """
+        Relatório de texto do pstats, ordenado por `sort`, com as `limit` primeiras funções.
+        Ordena uma cópia: a rota roda no threadpool, e leituras simultâneas do
+        mesmo perfil não podem trocar o stream nem a ordenação uma da outra.
+        """
+        import pstats
+
+        stream = io.StringIO()
+        stats = pstats.Stats(stream=stream)
+        stats.add(self.stats)
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump(self) -> bytes:
+        """Formato binário do cProfile (como Stats.dump_stats), para snakeviz ou pstats"""
+        return marshal.dumps(self.stats.stats)  # type: ignore[attr-defined]
+
+
+class ProfileStore:
+    """Os `max_profiles` perfis mais recentes, em memória (por processo/worker)"""
+
+    def __init__(self, max_profiles: int) -> None:
+        self._profiles: deque[RequestProfile] = deque(maxlen=max(1, max_profiles))
+        self._ids: itertools.count[int] = itertools.count(1)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles.append(profile)
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        for profile in self._profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def recent(self) -> list[RequestProfile]:
+        """Mais recentes primeiro"""
+        return list(reversed(self._profiles))
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+
+def token_matches(secret: str, token: Optional[str]) -> bool:
+    """Compara o cabeçalho com o segredo em tempo constante; sem segredo, nunca confere"""
+    return bool(secret) and token is not None and hmac.compare_digest(token.encode("utf-8"), secret.encode("utf-8"))
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila as requisições escolhidas com cProfile.
+    Um perfil por vez: enquanto uma requisição é perfilada, as demais passam
+    direto, sem perfil próprio. O cProfile registra a thread inteira do event
+    loop, então o trabalho das requisições concorrentes entra no perfil da
+    perfilada; quantas eram fica em concurrent_requests. O bcrypt no pool de
+    threads/processos aparece como espera.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, secret: str = "", sample_every: int = 0) -> None:
+        self.app: ASGIApp = app
+        self.store: ProfileStore = store
+        self.secret: str = secret
+        self.sample_every: int = max(0, sample_every)
+        self._requests: itertools.count[int] = itertools.count(1)
+        self._active: bool = False
+        self._in_flight: int = 0
+        # Requisições que rodaram (mesmo em parte) durante o perfil em andamento
+        self._concurrent: int = 0
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        if self.secret:
+            for name, value in scope["headers"]:
+                if name == _TOKEN_HEADER_KEY:
+                    if token_matches(self.secret, value.decode("latin-1")):
+                        return "header"
+                    break
+        if self.sample_every and next(self._requests) % self.sample_every == 0:
+            return "sample"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self._in_flight += 1
+        if self._active:
+            self._concurrent += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._active or scope["path"].startswith(ADMIN_PREFIX):
+            await self.app(scope, receive, send)
+            return
+        trigger: Optional[str] = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        # As que já estavam em andamento também dividem o event loop com a perfilada
+        self._concurrent = self._in_flight - 1
+        profile_id: int = self.store.next_id()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (_PROFILE_ID_HEADER_KEY, str(profile_id).encode("ascii"))]
+            await send(message)
+
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            duration = time.perf_counter() - start
+            self._active = False
+            route = scope.get("route")
+            self.store.add(RequestProfile(
+                profile_id, scope["method"], getattr(route, "path", scope["path"]), status_code,
+                duration, trigger, self._concurrent, pstats.Stats(profiler)
+            ))
+            PROFILES_CAPTURED.inc(1, trigger)
+            logger.info(
+                "Requisição perfilada",
+                extra={"profile_id": profile_id, "path": scope["path"], "trigger": trigger,
+                       "duration_ms": round(duration * 1000, 3), "concurrent_requests": self._concurrent}
+            )
+
+
+router = APIRouter(prefix=ADMIN_PREFIX, tags=["admin"], include_in_schema=False)
+
+
+def _get_store(request: Request) -> ProfileStore:
+    """Store de app.state, liberado só com o segredo no cabeçalho (404 sem segredo configurado)"""
+    store: Optional[ProfileStore] = getattr(request.app.state, "profile_store", None)
+    secret: str = getattr(request.app.state, "profiling_secret", "")
+    if store is None or not secret:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not token_matches(secret, request.headers.get(PROFILE_TOKEN_HEADER)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token de profiling inválido")
+    return store
+
+
+@router.get("")
+def list_profiles(request: Request) -> dict[str, Any]:
+    """Perfis guardados, mais recentes primeiro"""
+    return {"profiles": [profile.summary() for profile in _get_store(request).recent()]}
+
+
+@router.get("/{profile_id}")
+def get_profile(
+    request: Request,
+    profile_id: int,
+    sort: str = Query("cumulative", description="Chave de ordenação do pstats (cumulative, tottime, calls...)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    format: str = Query("text", pattern="^(text|prof)$")
+) -> Response:
+    """Relatório de texto do pstats, ou o arquivo .prof com format=prof"""
+    profile: Optional[RequestProfile] = _get_store(request).get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil não encontrado ou já descartado")
+    if format == "prof":
+        return Response(
+            content=profile.dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.prof"'},
+        )
+    import pstats
+
+    sort_keys: list[str] = sorted(pstats.Stats.sort_arg_dict_default)
+    if sort not in sort_keys:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ordenação inválida: {sort} (use {', '.join(sort_keys)})"
+        )
+    top: int = limit or getattr(request.app.state, "profiling_top", 40)
+    header = (f"{profile.method} {profile.path} -> {profile.status_code} "
+              f"em {profile.duration * 1000:.1f} ms ({profile.trigger})\n")
+    if profile.concurrent_requests:
+        header += (f"ATENÇÃO: {profile.concurrent_requests} outra(s) requisição(ões) em andamento durante o perfil; "
+                   "o trabalho delas no event loop também está nas estatísticas abaixo\n")
+    header += "\n"
+    return Response(content=header + profile.render(sort, top), media_type="text/plain; charset=utf-8")
+
+
+def install_profiling(app: Any, config: ProfilingConfig) -> None:
+    """Registra o middleware e as rotas de consulta (chamado só com PROFILING_ENABLED)"""
+    if not config.PROFILING_SECRET:
+        logger.warning("PROFILING_ENABLED sem PROFILING_SECRET: perfis não podem ser disparados por cabeçalho nem consultados")
+    logger.info(
+        "Profiling de requisições ativo",
+        extra={"sample_every": config.PROFILING_SAMPLE_EVERY, "max_profiles": config.PROFILING_MAX_PROFILES}
+    )
+    store = ProfileStore(config.PROFILING_MAX_PROFILES)
+    app.state.profile_store = store
+    app.state.profiling_secret = config.PROFILING_SECRET
+    app.state.profiling_top = config.PROFILING_TOP
+    app.add_middleware(
+        ProfilingMiddleware, store=store, secret=config.PROFILING_SECRET, sample_every=config.PROFILING_SAMPLE_EVERY
+    )
+    app.include_router(router)
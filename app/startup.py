@@ -0,0 +1,194 @@
+"""
+Cold start da aplicação.
+Carrega o .env uma única vez, mede o tempo de cada fase da inicialização e
+aquece em background os módulos cujo import foi adiado para o primeiro uso
+(python-jose, pool de processos), depois que o servidor já aceita conexões.
+O relatório de inicialização vai para o log (e, com STARTUP_PROFILE_IMPORTS,
+inclui o tempo de import por pacote).
+Este módulo deve continuar leve: é o primeiro import de app.main.
+"""
+import builtins
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Importados só no primeiro uso (ver app.auth.signing e app.auth.hashing)
+DEFERRED_MODULES: tuple[str, ...] = ("jose.jwt", "concurrent.futures.process")
+
+_environment_loaded: bool = False
+
+
+def load_environment() -> None:
+    """Carrega o .env (sem sobrescrever o ambiente) uma única vez por processo"""
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    _environment_loaded = True
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+class StartupConfig:
+    """Configurações de inicialização (lidas depois do .env)"""
+
+    STARTUP_WARMUP: bool
+    STARTUP_WARMUP_DELAY_SECONDS: float
+    STARTUP_REPORT: bool
+    STARTUP_PROFILE_IMPORTS: bool
+    STARTUP_REPORT_TOP: int
+
+    def __init__(self) -> None:
+        # Aquece os imports adiados em background logo após o startup
+        self.STARTUP_WARMUP = _flag("STARTUP_WARMUP", "true")
+        # Atraso do aquecimento, para não competir com as primeiras requisições
+        self.STARTUP_WARMUP_DELAY_SECONDS = float(os.getenv("STARTUP_WARMUP_DELAY_SECONDS", "1"))
+        # Registra no log o tempo de cada fase da inicialização
+        self.STARTUP_REPORT = _flag("STARTUP_REPORT", "true")
+        # Mede o tempo de import por pacote (instala um hook em __import__ até o fim do startup)
+        self.STARTUP_PROFILE_IMPORTS = _flag("STARTUP_PROFILE_IMPORTS", "false")
+        self.STARTUP_REPORT_TOP = int(os.getenv("STARTUP_REPORT_TOP", "10"))
+
+
+def process_age() -> Optional[float]:
+    """Segundos desde a criação do processo (Linux, resolução de um tick); None se indisponível"""
+    try:
+        with open("/proc/self/stat") as stat:
+            # Campos depois do nome do executável; starttime é o campo 22 (índice 19 aqui)
+            fields = stat.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as uptime:
+            seconds_since_boot = float(uptime.read().split()[0])
+        return seconds_since_boot - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class ImportProfiler:
+    """
+    Tempo de import por pacote de topo (tempo próprio, sem os imports aninhados
+    de outros pacotes), no estilo de `python -X importtime` mas agregado.
+    Só conta módulos carregados pela primeira vez; imports relativos não são medidos.
+    """
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = {}
+        self._original: Any = None
+        self._local: threading.local = threading.local()
+
+    def install(self) -> None:
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(
+        self, name: str, globals: Any = None, locals: Any = None, fromlist: Any = (), level: int = 0
+    ) -> Any:
+        original = self._original
+        if level or name in sys.modules or original is None:
+            return (original or builtins.__import__)(name, globals, locals, fromlist, level)
+
+        stack: list[float] = self._local.__dict__.setdefault("children", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            package = _package(name)
+            self.totals[package] = self.totals.get(package, 0.0) + own
+
+    def top(self, count: int) -> list[tuple[str, float]]:
+        """Pacotes mais caros, em ordem decrescente de tempo"""
+        return sorted(self.totals.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def _package(name: str) -> str:
+    """Pacote de topo; para o próprio app, o módulo até o segundo nível (app.auth, app.log...)"""
+    parts = name.split(".")
+    return ".".join(parts[:2]) if parts[0] == "app" else parts[0]
+
+
+class StartupReport:
+    """Fases da inicialização, medidas entre marcas sucessivas"""
+
+    def __init__(self) -> None:
+        self.started_at: float = time.perf_counter()
+        self._last_mark: float = self.started_at
+        self.phases: dict[str, float] = {}
+        self.profiler: Optional[ImportProfiler] = None
+        self.ready_process_age: Optional[float] = None
+
+    def mark(self, phase: str) -> None:
+        """Encerra a fase atual: tempo desde a marca anterior"""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last_mark)
+        self._last_mark = now
+
+    def ready(self) -> None:
+        """Marca o fim do startup bloqueante (o servidor passa a aceitar conexões)"""
+        self.ready_process_age = process_age()
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Registra uma fase medida à parte (ex.: aquecimento em background)"""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def profile_imports(self) -> None:
+        """Começa a medir o tempo de import por pacote"""
+        self.profiler = ImportProfiler()
+        self.profiler.install()
+
+    def stop_profiling(self) -> None:
+        if self.profiler is not None:
+            self.profiler.uninstall()
+
+    def as_dict(self, top: int = 10) -> dict[str, Any]:
+        report: dict[str, Any] = {
+            "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()},
+            "since_app_import_ms": round((self._last_mark - self.started_at) * 1000, 1),
+        }
+        if self.ready_process_age is not None:
+            # Desde o spawn do processo, incluindo o interpretador e o servidor ASGI
+            report["ready_since_process_start_ms"] = round(self.ready_process_age * 1000)
+        if self.profiler is not None:
+            report["imports_ms"] = {
+                package: round(seconds * 1000, 1) for package, seconds in self.profiler.top(top)
+            }
+        return report
+
+    def log(self, top: int = 10) -> None:
+        logger.info("Relatório de inicialização", extra={"startup": self.as_dict(top)})
+
+
+def warm_up(modules: tuple[str, ...] = DEFERRED_MODULES) -> dict[str, float]:
+    """Importa os módulos adiados; retorna o tempo de cada um (0 se já estava carregado)"""
+    timings: dict[str, float] = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            # __import__ (e não importlib) para passar pelo ImportProfiler, se instalado
+            __import__(name)
+        except ImportError:
+            logger.warning("Falha ao aquecer o módulo %s", name, exc_info=True)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+# Criado no import de app.main: as fases contam a partir daqui
+startup_report: StartupReport = StartupReport()
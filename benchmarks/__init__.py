@@ -0,0 +1 @@
+# Benchmarks de desempenho (executados como scripts, não fazem parte da suíte de testes)
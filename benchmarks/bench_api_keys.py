@@ -0,0 +1,62 @@
+"""
+Benchmark: autenticação de uma integração por /auth/login (bcrypt + JWT) versus
+chave de API (SHA-256 + busca pelo hash), com e sem o cache de usuários resolvidos,
+nos repositórios em memória e SQLite.
+
+Execute: python -m benchmarks.bench_api_keys [autenticações]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from app.auth.api_keys import ApiKeyService, IApiKeyRepository, InMemoryApiKeyRepository
+from app.auth.hashing import PasswordHasher
+from app.auth.repository import IUserRepository, InMemoryUserRepository
+from app.auth.repository_sqlite import SqliteApiKeyRepository, SqliteUserRepository
+from app.auth.service import AuthService
+from app.auth.token_cache import TokenCache
+
+
+async def _login(iterations: int) -> None:
+    """Reautenticação com senha: bcrypt a cada login"""
+    service = AuthService(InMemoryUserRepository(), PasswordHasher(mode="inline"), TokenCache(max_size=0))
+    await service.register_user("bench@example.com", "Bench User", "secret123")
+    logins = max(1, iterations // 1000)
+    start = time.perf_counter()
+    for _ in range(logins):
+        await service.login("bench@example.com", "secret123")
+    print(f"  {'/auth/login (bcrypt + JWT)':<34} {(time.perf_counter() - start) / logins * 1e6:>10.1f} µs")
+
+
+async def _api_keys(label: str, users: IUserRepository, keys: IApiKeyRepository, iterations: int) -> None:
+    """Chave de API sem cache (hash + busca) e com cache"""
+    user = await users.create("bench@example.com", "Bench User", "hash")
+    for cache_size, cache_label in ((0, "sem cache"), (1000, "com cache")):
+        service = ApiKeyService(keys, users, cache_size=cache_size)
+        key, _ = await service.issue(user.id, "Bench")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            assert await service.authenticate(key) is not None
+        elapsed = (time.perf_counter() - start) / iterations * 1e6
+        print(f"  {f'Chave de API, {label}, {cache_label}':<34} {elapsed:>10.1f} µs")
+    await keys.close()
+    await users.close()
+
+
+async def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print("=" * 60)
+    print(f"Autenticação de integração ({iterations} chamadas; logins: {max(1, iterations // 1000)})")
+    print("=" * 60)
+    await _login(iterations)
+    await _api_keys("memória", InMemoryUserRepository(), InMemoryApiKeyRepository(), iterations)
+    with tempfile.TemporaryDirectory(prefix="bench-api-keys-") as directory:
+        path = os.path.join(directory, "users.db")
+        await _api_keys("SQLite", SqliteUserRepository(path), SqliteApiKeyRepository(path), iterations)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
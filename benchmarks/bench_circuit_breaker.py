@@ -0,0 +1,105 @@
+"""
+Benchmark: latência de get_by_id durante uma queda do backend, com e sem
+ResilientUserRepository (prazo por chamada, circuit breaker e cópia antiga).
+
+O PostgREST simulado roda em um uvicorn em background; a "queda" é uma
+latência artificial maior que o prazo. Fases: saudável, queda, recuperação.
+
+Execute: python -m benchmarks.bench_circuit_breaker [buscas por fase] [latência da queda_s]
+"""
+import asyncio
+import sys
+import time
+
+from app.auth.repository import IUserRepository, RepositoryUnavailableError
+from app.auth.repository_breaker import CircuitBreaker, ResilientUserRepository
+from app.auth.repository_postgrest import PostgrestUserRepository
+from benchmarks.mock_postgrest import MockPostgrest
+from benchmarks.utils import BackgroundServer, percentile
+
+USERS = 20
+CONCURRENCY = 10
+
+
+async def _phase(label: str, repo: IUserRepository, lookups: int) -> None:
+    """Buscas em rodadas de CONCURRENCY chamadas concorrentes; imprime latência e resultados"""
+    latencies: list[float] = []
+    outcomes = {"ok": 0, "503": 0}
+
+    async def lookup(user_id: int) -> None:
+        start = time.perf_counter()
+        try:
+            await repo.get_by_id(user_id)
+            outcomes["ok"] += 1
+        except RepositoryUnavailableError:
+            outcomes["503"] += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    for start in range(0, lookups, CONCURRENCY):
+        await asyncio.gather(*(lookup(i % USERS + 1) for i in range(start, min(start + CONCURRENCY, lookups))))
+    print(
+        f"  {label:<22} p50={percentile(latencies, 50):>8.2f} ms  p99={percentile(latencies, 99):>8.2f} ms  "
+        f"ok={outcomes['ok']:<4} 503={outcomes['503']}"
+    )
+
+
+async def _scenario(
+    label: str,
+    mock: MockPostgrest,
+    repo: IUserRepository,
+    lookups: int,
+    outage: float,
+    outage_lookups: int
+) -> None:
+    print(label)
+    mock.latency = 0.0
+    await _phase("saudável", repo, lookups)
+    mock.latency = outage
+    await _phase("queda", repo, outage_lookups)
+    mock.latency = 0.0
+    if isinstance(repo, ResilientUserRepository):
+        # Espera o circuito passar a meio-aberto para a chamada de teste
+        await asyncio.sleep(repo.breaker.retry_after)
+    await _phase("recuperação", repo, lookups)
+
+
+async def main() -> None:
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    outage = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    mock = MockPostgrest()
+    with BackgroundServer(mock.app) as server:
+        await _run(mock, server.url, lookups, outage)
+
+
+async def _run(mock: MockPostgrest, url: str, lookups: int, outage: float) -> None:
+    plain = PostgrestUserRepository(base_url=url, api_key="benchmark")
+    for i in range(USERS):
+        await plain.create(f"user{i}@example.com", f"User {i}", "hash")
+
+    print("=" * 78)
+    print(f"{lookups} buscas por fase, {CONCURRENCY} concorrentes | queda: latência de {outage:g} s")
+    print("=" * 78)
+    # Na queda, só algumas rodadas: cada uma espera a latência inteira
+    await _scenario("Sem proteção", mock, plain, lookups, outage, CONCURRENCY * 3)
+    resilient = ResilientUserRepository(
+        plain,
+        CircuitBreaker(failure_rate=0.5, minimum_calls=10, window_size=20, open_seconds=1.0),
+        timeout=0.1,
+        stale_cache_size=USERS,
+    )
+    await _scenario("Prazo de 100 ms + breaker + cópia antiga", mock, resilient, lookups, outage, lookups)
+    print(f"  Atendidas pela cópia antiga: {resilient.stale_served} | recusadas: {resilient.breaker.rejected}")
+
+    no_stale = ResilientUserRepository(
+        plain,
+        CircuitBreaker(failure_rate=0.5, minimum_calls=10, window_size=20, open_seconds=1.0),
+        timeout=0.1,
+        stale_cache_size=0,
+    )
+    await _scenario("Prazo de 100 ms + breaker", mock, no_stale, lookups, outage, lookups)
+    await plain.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
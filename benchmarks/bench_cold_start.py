@@ -0,0 +1,78 @@
+"""
+Benchmark: cold start do servidor (tempo até a primeira resposta).
+Sobe `uvicorn app.main:app` em subprocesso várias vezes e mede, a partir do
+spawn do processo, o tempo até a primeira resposta de GET / e a duração do
+primeiro POST /auth/register (que paga os imports adiados, se ainda não aquecidos).
+
+Execute: python -m benchmarks.bench_cold_start [execuções]
+Compare com STARTUP_WARMUP=false para ver o custo dos imports adiados na 1ª requisição.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.utils import free_port, percentile
+
+
+def _cold_start() -> tuple[float, float]:
+    """(ms até a primeira resposta de GET /, ms do primeiro registro)"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "BCRYPT_ROUNDS": "4",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "ERROR"),
+        "USER_REPOSITORY_BACKEND": "memory",
+    }
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        with httpx.Client(base_url=url) as client:
+            while True:
+                try:
+                    client.get("/")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.002)
+            first_response = (time.perf_counter() - start) * 1000
+
+            request_start = time.perf_counter()
+            response = client.post(
+                "/auth/register", json={"email": "cold@example.com", "name": "Cold", "password": "secret123"}
+            )
+            first_register = (time.perf_counter() - request_start) * 1000
+            assert response.status_code == 201, response.text
+        return first_response, first_register
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    _cold_start()  # aquece o cache de bytecode e do sistema de arquivos
+
+    first_responses: list[float] = []
+    first_registers: list[float] = []
+    for _ in range(runs):
+        first_response, first_register = _cold_start()
+        first_responses.append(first_response)
+        first_registers.append(first_register)
+
+    print("=" * 60)
+    print(f"Cold start: {runs} execuções (STARTUP_WARMUP={os.environ.get('STARTUP_WARMUP', 'padrão')})")
+    print("=" * 60)
+    print(f"{'Até a 1ª resposta (GET /)':<32} p50={percentile(first_responses, 50):>7.1f} ms  "
+          f"max={max(first_responses):>7.1f} ms")
+    print(f"{'1º POST /auth/register':<32} p50={percentile(first_registers, 50):>7.1f} ms  "
+          f"max={max(first_registers):>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
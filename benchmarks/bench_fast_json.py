@@ -0,0 +1,100 @@
+"""
+Benchmark: caminho padrão (modelo Pydantic + response_model + jsonable_encoder)
+versus o caminho rápido (FAST_JSON_RESPONSES) em /auth/me e /auth/login.
+Mede a serialização isolada e a requisição completa em processo (ASGITransport).
+
+Execute: python -m benchmarks.bench_fast_json [requisições]
+"""
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.auth.config import auth_config  # noqa: E402
+from app.auth.models import User  # noqa: E402
+from app.auth.responses import orjson, user_response  # noqa: E402
+from app.auth.schemas import UserResponse  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.utils import percentile  # noqa: E402
+
+
+def _serialization(iterations: int) -> None:
+    """Custo de montar o corpo de /auth/me a partir de um User"""
+    user = User(1, "bench@example.com", "Bench User", "hash")
+
+    def standard() -> bytes:
+        # O que o FastAPI faz: modelo na rota, revalidação pelo response_model, encoder, JSONResponse
+        model = UserResponse(id=user.id, email=user.email, name=user.name)
+        validated = UserResponse.model_validate(model.model_dump())
+        return JSONResponse(jsonable_encoder(validated)).body
+
+    def fast() -> bytes:
+        return user_response(user).body
+
+    assert standard() == fast()
+    for label, build in (("Padrão (Pydantic)", standard), ("Rápido", fast)):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            build()
+        per_call_us = (time.perf_counter() - start) / iterations * 1e6
+        print(f"{label:<25} {per_call_us:>8.2f} µs/resposta")
+
+
+async def _requests(client: httpx.AsyncClient, token: str, count: int) -> tuple[list[float], list[float]]:
+    """Latências (ms) de /auth/me e /auth/login"""
+    me: list[float] = []
+    login: list[float] = []
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(count):
+        start = time.perf_counter()
+        response = await client.get("/auth/me", headers=headers)
+        me.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+        if i % 10 == 0:
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json={"email": "bench@example.com", "password": "secret123"})
+            login.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+    return me, login
+
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+
+    print("=" * 60)
+    print(f"Serialização de UserResponse (orjson: {'sim' if orjson is not None else 'não'})")
+    print("=" * 60)
+    _serialization(count * 10)
+
+    print()
+    print("=" * 60)
+    print(f"Requisições em processo: {count} x /auth/me, {count // 10} x /auth/login")
+    print("=" * 60)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post(
+                "/auth/register", json={"email": "bench@example.com", "name": "Bench User", "password": "secret123"}
+            )
+            response = await client.post("/auth/login", json={"email": "bench@example.com", "password": "secret123"})
+            token = response.json()["access_token"]
+            for label, enabled in (("Padrão (Pydantic)", False), ("Rápido", True)):
+                auth_config.FAST_JSON_RESPONSES = enabled
+                await _requests(client, token, 100)
+                me, login = await _requests(client, token, count)
+                print(
+                    f"{label:<18} /me p50={percentile(me, 50):.3f} ms p99={percentile(me, 99):.3f} ms  "
+                    f"/login p50={percentile(login, 50):.3f} ms"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
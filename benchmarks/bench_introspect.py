@@ -0,0 +1,62 @@
+"""
+Benchmark: validar um lote de tokens com os usuários, token a token
+(o equivalente a um GET /auth/me por token) versus AuthService.introspect
+(cada token distinto verificado uma vez e uma única consulta em lote),
+contra um PostgREST simulado com latência.
+
+Execute: python -m benchmarks.bench_introspect [tokens] [usuários_distintos] [latência_s]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from app.auth.hashing import PasswordHasher
+from app.auth.repository_postgrest import PostgrestUserRepository
+from app.auth.service import AuthService
+from app.auth.token_cache import TokenCache
+from benchmarks.mock_postgrest import MockPostgrest
+
+
+async def main() -> None:
+    tokens_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.005
+
+    mock = MockPostgrest()
+    transport = httpx.ASGITransport(app=mock.app)
+    repo = PostgrestUserRepository(base_url="http://mock", api_key="bench", transport=transport)
+    # Sem cache de tokens: mede a verificação das assinaturas
+    service = AuthService(repo, PasswordHasher(mode="inline", rounds=4), TokenCache(max_size=0))
+    distinct_tokens: list[str] = []
+    for i in range(distinct):
+        await service.register_user(f"user{i}@example.com", f"User {i}", "secret123")
+        distinct_tokens.append((await service.login(f"user{i}@example.com", "secret123")).access_token)
+    tokens = [distinct_tokens[i % distinct] for i in range(tokens_count)]
+    mock.latency = latency
+
+    print("=" * 70)
+    print(f"{tokens_count} tokens ({distinct} distintos), latência do backend {latency * 1000:.0f} ms")
+    print("=" * 70)
+
+    before = mock.request_count
+    start = time.perf_counter()
+    users = [await service.get_current_user(token) for token in tokens]
+    elapsed = time.perf_counter() - start
+    assert all(user is not None for user in users)
+    print(f"{'Token a token (get_current_user)':<36} {elapsed * 1000:>9.1f} ms  "
+          f"{mock.request_count - before:>5} consultas ao backend")
+
+    before = mock.request_count
+    start = time.perf_counter()
+    results = await service.introspect(tokens, include_user=True)
+    elapsed = time.perf_counter() - start
+    assert all(result.active and result.user is not None for result in results)
+    print(f"{'Em lote (introspect)':<36} {elapsed * 1000:>9.1f} ms  "
+          f"{mock.request_count - before:>5} consultas ao backend")
+    await repo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
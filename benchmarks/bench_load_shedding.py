@@ -0,0 +1,107 @@
+"""
+Benchmark: pico de logins (bcrypt com o custo de produção) com /auth/me em
+paralelo, com e sem os limites de concorrência por classe de rota.
+Sobe `uvicorn app.main:app` em subprocesso para cada cenário e mede a latência
+das duas classes de rota e quantos logins foram recusados com 503.
+
+Execute: python -m benchmarks.bench_load_shedding [logins simultâneos] [buscas em /auth/me]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.utils import free_port, percentile
+
+PASSWORD = "benchmark-password"
+
+
+async def _wait_ready(client: httpx.AsyncClient) -> None:
+    while True:
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.05)
+
+
+async def _spike(url: str, logins: int, lookups: int) -> None:
+    limits = httpx.Limits(max_connections=logins + 50, max_keepalive_connections=logins + 50)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        await _wait_ready(client)
+        await client.post("/auth/register", json={"email": "spike@example.com", "name": "Spike", "password": PASSWORD})
+        token = (await client.post("/auth/login", json={"email": "spike@example.com", "password": PASSWORD})).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+        login_latencies: list[float] = []
+        me_latencies: list[float] = []
+        statuses: dict[int, int] = {}
+
+        async def login() -> None:
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json={"email": "spike@example.com", "password": PASSWORD})
+            login_latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def me() -> None:
+            # Começa logo depois do pico, com os logins já enfileirados
+            await asyncio.sleep(0.05)
+            for _ in range(lookups):
+                start = time.perf_counter()
+                await client.get("/auth/me", headers=headers)
+                me_latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(me(), *(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        metrics = (await client.get("/metrics")).text
+
+    rejected = [line for line in metrics.splitlines() if line.startswith("route_concurrency_rejected_total{")]
+    print(f"  /auth/login  p50={percentile(login_latencies, 50):>8.1f} ms  p99={percentile(login_latencies, 99):>8.1f} ms  "
+          f"status={dict(sorted(statuses.items()))}")
+    print(f"  /auth/me     p50={percentile(me_latencies, 50):>8.1f} ms  p99={percentile(me_latencies, 99):>8.1f} ms")
+    print(f"  duração do pico: {elapsed:.1f} s")
+    for line in rejected:
+        print(f"  {line}")
+
+
+async def _scenario(label: str, environment: dict[str, str], logins: int, lookups: int) -> None:
+    print(label)
+    port = free_port()
+    env = {**os.environ, "LOG_LEVEL": "ERROR", "USER_REPOSITORY_BACKEND": "memory",
+           "LOGIN_RATE_LIMIT_ENABLED": "false", **environment}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        await _spike(f"http://127.0.0.1:{port}", logins, lookups)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+async def main() -> None:
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print("=" * 78)
+    print(f"Pico de {logins} logins simultâneos (BCRYPT_ROUNDS=12) + {lookups} buscas sequenciais em /auth/me")
+    print("=" * 78)
+    unlimited = {"CONCURRENCY_LIMITS_ENABLED": "false", "PASSWORD_HASHER_MAX_QUEUE": str(logins)}
+    await _scenario("Sem limites de concorrência", unlimited, logins, lookups)
+    limited = {
+        "CONCURRENCY_LIMITS_ENABLED": "true",
+        "PASSWORD_HASHER_MAX_QUEUE": str(logins),
+        "HASH_ROUTES_MAX_CONCURRENCY": "4",
+        "HASH_ROUTES_MAX_QUEUE": "16",
+        "HASH_ROUTES_QUEUE_TIMEOUT_SECONDS": "2",
+    }
+    await _scenario("Limite de 4 + fila de 16 (prazo de 2 s) nas rotas de bcrypt", limited, logins, lookups)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
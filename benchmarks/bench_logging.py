@@ -0,0 +1,89 @@
+"""
+Benchmark: custo de log por registro de usuário no caminho quente.
+Compara os ~15 print() que o repositório Supabase fazia por create (stdout sem
+buffer, como no Render) com logging via QueueHandler: DEBUG desativado,
+DEBUG amostrado e DEBUG completo. A saída vai para /dev/null com buffer de linha.
+
+Execute: python -m benchmarks.bench_logging [iterações]
+"""
+import logging
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+from app.log import LoggingConfig, setup_logging, shutdown_logging
+
+_RESPONSE = {"id": 1, "email": "bench@example.com", "name": "Bench", "created_at": "2024-01-01T00:00:00Z"}
+
+
+def _prints(email: str) -> None:
+    """O que SupabaseUserRepository.create imprimia antes por registro"""
+    print(f"📝 Tentando inserir usuário no Supabase: {email}")
+    print(f"📋 Tabela: users")
+    print(f"🔑 Usando Service Key: {True}")
+    print(f"📦 Resposta do Supabase:")
+    print(f"   - data: {[_RESPONSE]}")
+    print(f"   - data type: {type([_RESPONSE])}")
+    print(f"   - data length: {1}")
+    print(f"   - error: {None}")
+    print(f"   - status_code: {'N/A'}")
+    print(f"✅ Usuário criado com sucesso: {_RESPONSE}")
+    print(f"🔍 Mapeando usuário: {_RESPONSE}")
+    print(f"   - id: {_RESPONSE['id']}")
+    print(f"   - email: {_RESPONSE['email']}")
+    print(f"   - name: {_RESPONSE['name']}")
+    print(f"   - created_at: {_RESPONSE['created_at']}")
+
+
+def _logs(logger: logging.Logger, email: str) -> None:
+    """O que o repositório registra agora por create"""
+    logger.debug("Inserindo usuário no Supabase", extra={"email": email, "table": "users"})
+    logger.info("Usuário criado", extra={"user_id": _RESPONSE["id"]})
+
+
+def _measure_prints(iterations: int) -> float:
+    with open(os.devnull, "w", buffering=1) as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        for i in range(iterations):
+            _prints(f"user{i}@example.com")
+        return time.perf_counter() - start
+
+
+def _measure_logging(iterations: int, level: str, sample_every: int) -> float:
+    os.environ.update({"LOG_LEVEL": level, "LOG_DEBUG_SAMPLE_EVERY": str(sample_every)})
+    logger = logging.getLogger("app.auth.repository_supabase")
+    with open(os.devnull, "w", buffering=1) as devnull, redirect_stdout(devnull):
+        setup_logging(LoggingConfig())
+        try:
+            start = time.perf_counter()
+            for i in range(iterations):
+                _logs(logger, f"user{i}@example.com")
+            # Tempo visto pelo chamador; a escrita acontece na thread do listener
+            return time.perf_counter() - start
+        finally:
+            shutdown_logging()
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    os.environ["LOG_QUEUE_SIZE"] = str(iterations * 2)
+
+    results = [
+        ("print() x15 (antes)", _measure_prints(iterations)),
+        ("logging INFO", _measure_logging(iterations, "INFO", 1)),
+        ("logging DEBUG 1/100", _measure_logging(iterations, "DEBUG", 100)),
+        ("logging DEBUG completo", _measure_logging(iterations, "DEBUG", 1)),
+    ]
+
+    baseline = results[0][1]
+    print("=" * 60)
+    print(f"Log por create x {iterations}")
+    print("=" * 60)
+    for label, elapsed in results:
+        per_call_us = elapsed / iterations * 1e6
+        print(f"{label:<25} {per_call_us:>10.2f} µs/create   {baseline / elapsed:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: latência de /auth/me sob carga concorrente de login,
+com bcrypt no event loop (inline) versus no pool de workers.
+
+Execute: python -m benchmarks.bench_password_hasher [logins_concorrentes] [amostras]
+"""
+import asyncio
+import contextlib
+import io
+import sys
+import time
+
+import httpx
+
+from app.auth.config import auth_config
+from app.main import app
+from benchmarks.utils import percentile
+
+MODES = ("inline", "thread", "process")
+
+
+async def _login_loop(client: httpx.AsyncClient, stop: asyncio.Event) -> None:
+    """Gera carga de login (bcrypt) até o sinal de parada"""
+    while not stop.is_set():
+        await client.post("/auth/login", json={"email": "bench@example.com", "password": "secret123"})
+
+
+async def _run_mode(mode: str, logins: int, samples: int) -> str:
+    """Mede p50/p99 de /auth/me com `logins` clientes fazendo login em paralelo"""
+    auth_config.PASSWORD_HASHER_MODE = mode
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post(
+                "/auth/register",
+                json={"email": "bench@example.com", "name": "Bench", "password": "secret123"},
+            )
+            response = await client.post(
+                "/auth/login", json={"email": "bench@example.com", "password": "secret123"}
+            )
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            stop = asyncio.Event()
+            load = [asyncio.create_task(_login_loop(client, stop)) for _ in range(logins)]
+            await asyncio.sleep(0.2)
+
+            latencies: list[float] = []
+            for _ in range(samples):
+                start = time.perf_counter()
+                await client.get("/auth/me", headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.005)
+
+            stop.set()
+            await asyncio.gather(*load)
+
+    return (
+        f"{mode:<10} p50={percentile(latencies, 50):>8.2f} ms  "
+        f"p99={percentile(latencies, 99):>8.2f} ms  max={max(latencies):>8.2f} ms"
+    )
+
+
+async def main() -> None:
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    print("=" * 60)
+    print(f"/auth/me com {logins} logins concorrentes ({samples} amostras)")
+    print("=" * 60)
+    for mode in MODES:
+        # Descarta os logs do repositório; só o resumo de cada modo é impresso
+        with contextlib.redirect_stdout(io.StringIO()):
+            line = await _run_mode(mode, logins, samples)
+        print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
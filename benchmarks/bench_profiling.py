@@ -0,0 +1,59 @@
+"""
+Benchmark: latência de GET /auth/me sem o middleware de profiling (padrão),
+com o middleware registrado mas sem disparar, com amostragem 1 em 100 e com
+todas as requisições perfiladas pelo cabeçalho.
+
+Execute: python -m benchmarks.bench_profiling [requisições]
+"""
+import asyncio
+import sys
+import time
+from typing import Any
+
+import httpx
+
+from app.auth.dependencies import init_auth_state, shutdown_auth_state
+from app.main import app
+from app.profiling import PROFILE_TOKEN_HEADER, ProfileStore, ProfilingMiddleware
+from benchmarks.utils import percentile
+
+SECRET = "benchmark-secret"
+
+
+async def _measure(label: str, asgi_app: Any, headers: dict[str, str], requests: int) -> None:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get("/auth/me", headers=headers)
+        latencies: list[float] = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get("/auth/me", headers=headers)
+            latencies.append((time.perf_counter() - start) * 1e6)
+            assert response.status_code == 200
+    print(f"  {label:<40} p50={percentile(latencies, 50):>8.1f} µs  p99={percentile(latencies, 99):>8.1f} µs")
+
+
+async def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    await init_auth_state(app)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.post("/auth/register", json={"email": "bench@example.com", "name": "Bench", "password": "secret123"})
+        token = (await client.post("/auth/login", json={"email": "bench@example.com", "password": "secret123"})).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    print("=" * 78)
+    print(f"GET /auth/me ({requests} requisições em processo)")
+    print("=" * 78)
+    await _measure("Sem profiling (PROFILING_ENABLED=false)", app, headers, requests)
+    idle = ProfilingMiddleware(app, ProfileStore(20), secret=SECRET)
+    await _measure("Middleware registrado, sem disparar", idle, headers, requests)
+    sampled = ProfilingMiddleware(app, ProfileStore(20), secret=SECRET, sample_every=100)
+    await _measure("Amostragem 1 em 100", sampled, headers, requests)
+    always = ProfilingMiddleware(app, ProfileStore(20), secret=SECRET)
+    await _measure("Todas perfiladas (cabeçalho)", always, {**headers, PROFILE_TOKEN_HEADER: SECRET}, requests)
+    await shutdown_auth_state(app)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Benchmark: renovar a sessão por /auth/login (bcrypt) versus refresh token (rotação),
+e o custo da checagem de revogação de jti com e sem o filtro de Bloom.
+
+Execute: python -m benchmarks.bench_refresh [iterações] [jti revogados]
+"""
+import asyncio
+import sys
+import time
+import uuid
+
+from app.auth.hashing import PasswordHasher
+from app.auth.repository import InMemoryUserRepository
+from app.auth.revocation import RevokedTokenIndex
+from app.auth.service import AuthService
+from app.auth.token_cache import TokenCache
+
+
+async def _sessions(iterations: int) -> None:
+    """Custo por renovação: login completo versus refresh"""
+    service = AuthService(InMemoryUserRepository(), PasswordHasher(mode="inline"), TokenCache(max_size=0))
+    await service.register_user("bench@example.com", "Bench User", "secret123")
+
+    logins = max(1, iterations // 1000)
+    start = time.perf_counter()
+    for _ in range(logins):
+        tokens = await service.login("bench@example.com", "secret123")
+    login_us = (time.perf_counter() - start) / logins * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        tokens = await service.refresh(tokens.refresh_token)
+    refresh_us = (time.perf_counter() - start) / iterations * 1e6
+
+    print(f"{'Login (bcrypt)':<30} {login_us:>10.1f} µs/renovação")
+    print(f"{'Refresh (rotação)':<30} {refresh_us:>10.1f} µs/renovação")
+    print(f"Ganho: {login_us / refresh_us:.0f}x | jti revogados pela rotação: {service.revoked_tokens.size}")
+
+
+def _revocation(iterations: int, revoked: int) -> None:
+    """is_revoked para jti não revogados (caso comum) e revogados, com e sem o filtro de Bloom"""
+    expires_at = time.time() + 3600
+    revoked_jtis = [uuid.uuid4().hex for _ in range(revoked)]
+    probes = [uuid.uuid4().hex for _ in range(iterations)]
+    for label, capacity in (("Só dicionário", 0), ("Filtro de Bloom + dicionário", 2 * revoked)):
+        index = RevokedTokenIndex(capacity=capacity)
+        for jti in revoked_jtis:
+            index.revoke(jti, expires_at)
+
+        start = time.perf_counter()
+        for jti in probes:
+            index.is_revoked(jti)
+        miss_us = (time.perf_counter() - start) / iterations * 1e6
+
+        start = time.perf_counter()
+        for jti in revoked_jtis[:iterations]:
+            index.is_revoked(jti)
+        hit_us = (time.perf_counter() - start) / min(iterations, revoked) * 1e6
+        print(f"{label:<30} não revogado {miss_us:>6.3f} µs | revogado {hit_us:>6.3f} µs")
+
+    bloom = index._bloom
+    assert bloom is not None
+    print(
+        f"Filtro: {bloom.size_bits / 8 / 1024:.0f} KiB, {bloom.hash_count} hashes | "
+        f"falsos positivos: {index.bloom_false_positives}/{iterations}"
+    )
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    revoked = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+    print("=" * 60)
+    print(f"Renovação da sessão: {max(1, iterations // 1000)} logins, {iterations} refreshes")
+    print("=" * 60)
+    asyncio.run(_sessions(iterations))
+
+    print()
+    print("=" * 60)
+    print(f"Checagem de revogação: {revoked} jti revogados, {iterations} checagens")
+    print("=" * 60)
+    _revocation(iterations, revoked)
+
+
+if __name__ == "__main__":
+    main()
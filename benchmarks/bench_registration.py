@@ -0,0 +1,64 @@
+"""
+Benchmark: latência por registro contra um PostgREST simulado.
+Compara o fluxo antigo (get_by_email no serviço + get_by_email no repositório
++ INSERT) com o INSERT único apoiado na restrição UNIQUE de users.email.
+O hash bcrypt fica fora da medição para isolar as idas ao banco.
+
+Execute: python -m benchmarks.bench_registration [registros] [latência_s]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from app.auth.repository import EmailAlreadyRegisteredError
+from app.auth.repository_postgrest import PostgrestUserRepository
+from benchmarks.mock_postgrest import MockPostgrest
+from benchmarks.utils import percentile
+
+
+async def _legacy_register(repo: PostgrestUserRepository, email: str) -> None:
+    """Fluxo anterior: duas consultas de existência antes do INSERT"""
+    if await repo.get_by_email(email):
+        raise EmailAlreadyRegisteredError()
+    if await repo.get_by_email(email):
+        raise EmailAlreadyRegisteredError()
+    await repo.create(email, "Bench", "hash")
+
+
+async def _single_register(repo: PostgrestUserRepository, email: str) -> None:
+    """Fluxo atual: apenas o INSERT"""
+    await repo.create(email, "Bench", "hash")
+
+
+async def main() -> None:
+    registrations = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.005
+
+    print("=" * 60)
+    print(f"{registrations} registros sequenciais, latência simulada {latency * 1000:.0f} ms")
+    print("=" * 60)
+    for label, register in (("Antes (3 idas ao banco)", _legacy_register), ("INSERT único", _single_register)):
+        mock = MockPostgrest(latency=latency)
+        repo = PostgrestUserRepository(
+            base_url="http://mock", api_key="bench", transport=httpx.ASGITransport(app=mock.app)
+        )
+        samples: list[float] = []
+        for i in range(registrations):
+            start = time.perf_counter()
+            await register(repo, f"user{i}@example.com")
+            samples.append((time.perf_counter() - start) * 1000)
+        try:
+            await register(repo, "user0@example.com")
+        except EmailAlreadyRegisteredError as e:
+            conflict = str(e)
+        await repo.close()
+        print(
+            f"{label:<25} p50={percentile(samples, 50):>7.2f} ms  p99={percentile(samples, 99):>7.2f} ms  "
+            f"requisições={mock.request_count}  duplicado -> '{conflict}'"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Benchmark: assinatura e verificação de JWT com HS256, RS256 e ES256, passando a
+chave como texto/PEM a cada chamada (como jwt.encode(..., SECRET_KEY) fazia)
+versus TokenSigner, que carrega as chaves uma única vez.
+
+Execute: python -m benchmarks.bench_signing [iterações]
+"""
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwt
+
+from app.auth.signing import TokenSigner
+
+CLAIMS: dict[str, Any] = {"sub": "1", "email": "bench@example.com", "ver": 0, "exp": 4102444800}
+
+
+def _per_call(label: str, func: Callable[[], Any], iterations: int) -> None:
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    print(f"  {label:<40} {(time.perf_counter() - start) / iterations * 1e6:>10.1f} µs")
+
+
+def _write_pem(directory: str, name: str, private: Any) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as pem_file:
+        pem_file.write(private.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    return path
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print("=" * 60)
+    print(f"Assinatura/verificação de JWT ({iterations} iterações)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory(prefix="bench-signing-") as directory:
+        keys: dict[str, tuple[str, str]] = {
+            "HS256": ("benchmark-secret", ""),
+            "RS256": ("", _write_pem(directory, "rsa.pem", rsa.generate_private_key(65537, 2048))),
+            "ES256": ("", _write_pem(directory, "ec.pem", ec.generate_private_key(ec.SECP256R1()))),
+        }
+        for algorithm, (secret, path) in keys.items():
+            print(algorithm)
+            signer = TokenSigner(algorithm, secret_key=secret or None, signing_keys=f"k1:{path}" if path else "")
+            signer.load()
+            raw_key: Any = secret
+            verify_key: Any = secret
+            if path:
+                with open(path, "r", encoding="utf-8") as pem_file:
+                    raw_key = pem_file.read()
+                # Verificação como um serviço externo faria: a JWK publicada, convertida a cada chamada
+                verify_key = signer.jwks["keys"][0]
+            token = signer.encode(CLAIMS)
+
+            _per_call("encode, chave a cada chamada",
+                      lambda: jwt.encode(CLAIMS, raw_key, algorithm=algorithm), iterations)
+            _per_call("encode, TokenSigner (chave carregada)", lambda: signer.encode(CLAIMS), iterations)
+            _per_call("decode, chave a cada chamada",
+                      lambda: jwt.decode(token, verify_key, algorithms=[algorithm]), iterations)
+            _per_call("decode, TokenSigner (chave carregada)", lambda: signer.decode(token), iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: SqliteUserRepository (arquivo temporário, WAL) comparado ao repositório em memória.
+Mede importação em lote, buscas pontuais concorrentes por ID e por email
+e buscas em lote por ID.
+
+Execute: python -m benchmarks.bench_sqlite_repository [usuários] [buscas]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable
+
+from app.auth.models import NewUser
+from app.auth.repository import IUserRepository, InMemoryUserRepository
+from app.auth.repository_sqlite import SqliteUserRepository
+
+HASH = "$2b$12$" + "x" * 53
+
+
+async def _timed(label: str, count: int, operation: Callable[[], Awaitable[None]]) -> None:
+    """Operações por segundo"""
+    start = time.perf_counter()
+    await operation()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32} {count / elapsed / 1000:>8.1f} mil/s")
+
+
+async def _run(label: str, repo: IUserRepository, users: int, lookups: int) -> None:
+    print(label)
+    batch_size = 500
+
+    async def fill() -> None:
+        for start in range(0, users, batch_size):
+            await repo.create_many([
+                NewUser(f"user{i}@example.com", f"User {i}", HASH)
+                for i in range(start, min(start + batch_size, users))
+            ])
+
+    async def by_id() -> None:
+        await asyncio.gather(*(repo.get_by_id(i % users + 1) for i in range(lookups)))
+
+    async def by_email() -> None:
+        await asyncio.gather(*(repo.get_by_email(f"user{i % users}@example.com") for i in range(lookups)))
+
+    async def many_by_ids() -> None:
+        for start in range(0, lookups, 100):
+            await repo.get_many_by_ids([i % users + 1 for i in range(start, start + 100)])
+
+    await _timed(f"create_many (lotes de {batch_size})", users, fill)
+    await _timed("get_by_id (concorrente)", lookups, by_id)
+    await _timed("get_by_email (concorrente)", lookups, by_email)
+    await _timed("get_many_by_ids (lotes de 100)", lookups, many_by_ids)
+    await repo.close()
+
+
+async def main() -> None:
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    print("=" * 60)
+    print(f"{users} usuários, {lookups} buscas")
+    print("=" * 60)
+    await _run("InMemoryUserRepository", InMemoryUserRepository(), users, lookups)
+    with tempfile.TemporaryDirectory(prefix="bench-sqlite-") as directory:
+        path = os.path.join(directory, "users.db")
+        await _run(f"SqliteUserRepository ({path})", SqliteUserRepository(path), users, lookups)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""
+Benchmark: verify_token com e sem o cache de tokens verificados.
+
+Execute: python -m benchmarks.bench_token_cache [iterações]
+"""
+import sys
+import time
+
+from app.auth.hashing import PasswordHasher
+from app.auth.repository import InMemoryUserRepository
+from app.auth.service import AuthService
+from app.auth.token_cache import TokenCache
+
+
+def _measure(label: str, service: AuthService, token: str, iterations: int) -> None:
+    """Imprime o custo médio de verify_token para o mesmo token"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        assert service.verify_token(token) is not None
+    per_call_us = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<25} {per_call_us:>10.2f} µs/verificação")
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    hasher = PasswordHasher(mode="inline")
+    repo = InMemoryUserRepository()
+
+    uncached = AuthService(repo, hasher, TokenCache(max_size=0))
+    cached = AuthService(repo, hasher, TokenCache(max_size=1024))
+    token = uncached._create_access_token({"sub": "1", "email": "bench@example.com"})
+
+    print("=" * 50)
+    print(f"verify_token x {iterations}")
+    print("=" * 50)
+    _measure("Sem cache (jwt.decode)", uncached, token, iterations)
+    _measure("Com cache LRU", cached, token, iterations)
+    print(f"Hits: {cached.token_cache.hits} | misses: {cached.token_cache.misses}")
+
+
+if __name__ == "__main__":
+    main()
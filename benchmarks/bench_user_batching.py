@@ -0,0 +1,49 @@
+"""
+Benchmark: N buscas concorrentes por usuário contra um PostgREST simulado,
+direto no repositório versus com coalescência/agrupamento (BatchingUserRepository).
+
+Execute: python -m benchmarks.bench_user_batching [buscas] [usuários_distintos] [latência_s]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from app.auth.repository import IUserRepository
+from app.auth.repository_batching import BatchingUserRepository
+from app.auth.repository_postgrest import PostgrestUserRepository
+from benchmarks.mock_postgrest import MockPostgrest
+
+
+async def _run(label: str, repo: IUserRepository, mock: MockPostgrest, lookups: int, distinct: int) -> None:
+    """Dispara as buscas concorrentes e conta as requisições ao backend"""
+    before = mock.request_count
+    start = time.perf_counter()
+    users = await asyncio.gather(*(repo.get_by_id(i % distinct + 1) for i in range(lookups)))
+    elapsed = time.perf_counter() - start
+    assert all(user is not None for user in users)
+    print(f"{label:<30} {elapsed * 1000:>9.1f} ms  {mock.request_count - before:>5} consultas ao backend")
+
+
+async def main() -> None:
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+
+    mock = MockPostgrest(latency=latency)
+    transport = httpx.ASGITransport(app=mock.app)
+    repo = PostgrestUserRepository(base_url="http://mock", api_key="bench", transport=transport)
+    for i in range(distinct):
+        await repo.create(f"user{i}@example.com", f"User {i}", "hash")
+
+    print("=" * 60)
+    print(f"{lookups} buscas concorrentes, {distinct} usuários distintos, latência {latency * 1000:.0f} ms")
+    print("=" * 60)
+    await _run("Direto no repositório", repo, mock, lookups, distinct)
+    await _run("BatchingUserRepository", BatchingUserRepository(repo), mock, lookups, distinct)
+    await repo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+"""
+Benchmark: memória e vazão do modelo User e do mapeamento de linhas.
+Compara o User antigo (classe comum, __dict__ por instância, dois datetime.utcnow())
+com o User atual (__slots__, timestamp compartilhado), e o mapeamento antigo
+do SupabaseUserRepository (closure parse_datetime recriada a cada linha, replace
++ fromisoformat) com parse_timestamp (função única, em cache).
+
+Execute: python -m benchmarks.bench_user_model [usuários] [linhas]
+"""
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from app.auth.models import NewUser, User
+from app.auth.repository import InMemoryUserRepository, parse_timestamp
+
+HASH = "$2b$12$" + "x" * 53
+
+
+class LegacyUser:
+    """Modelo anterior, para comparação"""
+
+    def __init__(
+        self,
+        id: int,
+        email: str,
+        name: str,
+        hashed_password: str,
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None
+    ) -> None:
+        self.id: int = id
+        self.email: str = email
+        self.name: str = name
+        self.hashed_password: str = hashed_password
+        self.created_at: datetime = created_at or datetime.utcnow()
+        self.updated_at: datetime = updated_at or datetime.utcnow()
+
+
+def legacy_map_to_user(data: dict[str, Any]) -> LegacyUser:
+    """SupabaseUserRepository._map_to_user anterior"""
+    def parse_datetime(dt_str: Optional[str]) -> datetime:
+        if not dt_str:
+            return datetime.utcnow()
+        try:
+            dt_str = dt_str.replace("Z", "+00:00")
+            if "+" in dt_str or dt_str.endswith("+00:00"):
+                return datetime.fromisoformat(dt_str)
+            return datetime.fromisoformat(dt_str)
+        except Exception:
+            return datetime.utcnow()
+
+    return LegacyUser(
+        id=data["id"],
+        email=data["email"],
+        name=data["name"],
+        hashed_password=data["hashed_password"],
+        created_at=parse_datetime(data.get("created_at")) if data.get("created_at") else None,
+        updated_at=parse_datetime(data.get("updated_at")) if data.get("updated_at") else None
+    )
+
+
+def map_to_user(data: dict[str, Any]) -> User:
+    """Mapeamento atual (igual ao dos repositórios Supabase e PostgREST)"""
+    return User(
+        id=data["id"],
+        email=data["email"],
+        name=data["name"],
+        hashed_password=data["hashed_password"],
+        created_at=parse_timestamp(data.get("created_at")),
+        updated_at=parse_timestamp(data.get("updated_at"))
+    )
+
+
+def _measure_memory(label: str, build: Callable[[], Any], count: int) -> None:
+    """Memória alocada (tracemalloc) e tempo para construir `count` usuários"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    users = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<34} {current / 1024 ** 2:>8.1f} MB  {current / count:>6.0f} B/usuário  "
+        f"{count / elapsed / 1000:>7.0f} mil/s"
+    )
+    del users
+    gc.collect()
+
+
+def _build_legacy(count: int) -> dict[int, LegacyUser]:
+    return {i: LegacyUser(i, f"user{i}@example.com", f"User {i}", HASH) for i in range(count)}
+
+
+def _build_slotted(count: int) -> dict[int, User]:
+    return {i: User(i, f"user{i}@example.com", f"User {i}", HASH) for i in range(count)}
+
+
+def _build_repository(count: int) -> InMemoryUserRepository:
+    repo = InMemoryUserRepository()
+    batch_size = 10000
+
+    async def fill() -> None:
+        for start in range(0, count, batch_size):
+            await repo.create_many([
+                NewUser(f"user{i}@example.com", f"User {i}", HASH)
+                for i in range(start, min(start + batch_size, count))
+            ])
+
+    asyncio.run(fill())
+    return repo
+
+
+def _measure_mapping(label: str, mapper: Callable[[dict[str, Any]], Any], rows: list[dict[str, Any]]) -> float:
+    """Linhas mapeadas por segundo"""
+    start = time.perf_counter()
+    for row in rows:
+        mapper(row)
+    rate = len(rows) / (time.perf_counter() - start)
+    print(f"{label:<34} {rate / 1000:>8.0f} mil linhas/s")
+    return rate
+
+
+def main() -> None:
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    row_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    print("=" * 78)
+    print(f"Memória: {users} usuários (o hash bcrypt é a mesma string, como em um lote importado)")
+    print("=" * 78)
+    _measure_memory("User antigo (__dict__)", lambda: _build_legacy(users), users)
+    _measure_memory("User com __slots__", lambda: _build_slotted(users), users)
+    _measure_memory("InMemoryUserRepository.create_many", lambda: _build_repository(users), users)
+
+    # Linhas como o PostgREST devolve; lotes compartilham created_at
+    rows = [
+        {
+            "id": i,
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "hashed_password": HASH,
+            "created_at": f"2024-01-01T12:00:{i // 1000 % 60:02d}.{i // 1000 % 1000:06d}+00:00",
+            "updated_at": f"2024-01-01T12:00:{i // 1000 % 60:02d}.{i // 1000 % 1000:06d}+00:00",
+        }
+        for i in range(row_count)
+    ]
+    print()
+    print("=" * 78)
+    print(f"Mapeamento de {row_count} linhas")
+    print("=" * 78)
+    legacy = _measure_mapping("_map_to_user antigo (closure)", legacy_map_to_user, rows)
+    parse_timestamp.cache_clear()
+    current = _measure_mapping("_map_to_user com parse_timestamp", map_to_user, rows)
+    print(f"Ganho: {current / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
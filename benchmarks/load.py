@@ -0,0 +1,365 @@
+"""
+Teste de carga dos endpoints de autenticação (/auth/register, /auth/login, /auth/me).
+Dispara requisições com concorrência configurável e mede RPS e latência
+(p50/p95/p99) por cenário, gerando um baseline JSON comparável entre commits.
+
+Alvos (--mode):
+    inprocess  app ASGI no mesmo processo, via httpx.ASGITransport (sem rede)
+    uvicorn    app servido por um uvicorn em subprocesso (ou --url de um servidor já rodando)
+
+Repositórios (--backend):
+    memory     InMemoryUserRepository
+    postgrest  PostgrestUserRepository contra o PostgREST simulado (benchmarks.mock_postgrest)
+    sqlite     SqliteUserRepository em um arquivo temporário
+
+Exemplos:
+    python -m benchmarks.load --mode inprocess --backend memory -c 16 -n 500 --output base.json
+    python -m benchmarks.load --mode uvicorn --backend postgrest --latency 0.005 --compare base.json
+
+O custo do bcrypt domina login e registro; por padrão usa BCRYPT_ROUNDS=4 para
+medir o restante da pilha. Use --bcrypt-rounds 12 para o custo de produção.
+Com --compare, sai com código 1 se algum cenário regredir além de --threshold.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+
+from benchmarks.utils import free_port, percentile
+
+SCENARIOS = ("register", "login", "me")
+PASSWORD = "benchmark-password"
+
+# (cliente, índice da requisição) -> resposta
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def _git_revision() -> Optional[str]:
+    """Commit atual (com sufixo -dirty se houver alterações), para identificar o baseline"""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f"{revision}-dirty" if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _wait_until_ready(url: str, timeout: float = 20.0) -> None:
+    """Aguarda o servidor responder em url"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Servidor não respondeu em {url}")
+                await asyncio.sleep(0.1)
+
+
+@asynccontextmanager
+async def _subprocess_server(args: list[str], url: str, env: dict[str, str]) -> AsyncIterator[str]:
+    """Sobe um servidor em subprocesso e o encerra ao final"""
+    process = subprocess.Popen([sys.executable, *args], env=env)
+    try:
+        await _wait_until_ready(url)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _app_environment(
+    options: argparse.Namespace,
+    postgrest_url: Optional[str],
+    sqlite_path: Optional[str] = None
+) -> dict[str, str]:
+    """Variáveis de ambiente da aplicação testada"""
+    env: dict[str, str] = {
+        "BCRYPT_ROUNDS": str(options.bcrypt_rounds),
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "ERROR"),
+        # A carga parte de um único IP e repete os mesmos emails
+        "LOGIN_RATE_LIMIT_ENABLED": "false",
+    }
+    if postgrest_url is not None:
+        env.update({
+            "USER_REPOSITORY_BACKEND": "postgrest",
+            "SUPABASE_URL": postgrest_url,
+            "SUPABASE_KEY": "benchmark",
+        })
+    elif sqlite_path is not None:
+        env.update({"USER_REPOSITORY_BACKEND": "sqlite", "SQLITE_PATH": sqlite_path})
+    else:
+        env.update({"USER_REPOSITORY_BACKEND": "memory", "SUPABASE_URL": "", "SUPABASE_KEY": ""})
+    return env
+
+
+@asynccontextmanager
+async def _target(options: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    """Cliente HTTP apontando para o app configurado (sobe mock e servidor se necessário)"""
+    limits = httpx.Limits(max_connections=options.concurrency, max_keepalive_connections=options.concurrency)
+    timeout = httpx.Timeout(60.0)
+
+    async with AsyncExitStack() as stack:
+        postgrest_url: Optional[str] = None
+        if options.backend == "postgrest" and options.url is None:
+            port = free_port()
+            postgrest_url = f"http://127.0.0.1:{port}"
+            await stack.enter_async_context(_subprocess_server(
+                ["-m", "benchmarks.mock_postgrest", "--port", str(port), "--latency", str(options.latency)],
+                f"{postgrest_url}/rest/v1/users?limit=1",
+                dict(os.environ),
+            ))
+        sqlite_path: Optional[str] = None
+        if options.backend == "sqlite" and options.url is None:
+            directory = stack.enter_context(tempfile.TemporaryDirectory(prefix="load-sqlite-"))
+            sqlite_path = os.path.join(directory, "users.db")
+
+        if options.url is not None:
+            base_url: str = options.url
+            transport: Optional[httpx.AsyncBaseTransport] = None
+        elif options.mode == "uvicorn":
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            await stack.enter_async_context(_subprocess_server(
+                ["-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+                f"{base_url}/",
+                {**os.environ, **_app_environment(options, postgrest_url, sqlite_path)},
+            ))
+            transport = None
+        else:
+            # As configurações são lidas no import: o ambiente precisa estar pronto antes
+            os.environ.update(_app_environment(options, postgrest_url, sqlite_path))
+            from app.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            base_url = "http://benchmark"
+            transport = httpx.ASGITransport(app=app)
+
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=timeout)
+        )
+        yield client
+
+
+async def _register(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/auth/register", json={"email": email, "name": "Benchmark", "password": PASSWORD})
+
+
+async def _login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+
+
+async def _prepare(client: httpx.AsyncClient, run_id: str, accounts: int) -> list[str]:
+    """Cria as contas usadas por login e /me e devolve um token por conta"""
+    emails = [f"load-{run_id}-{i}@example.com" for i in range(accounts)]
+    for email in emails:
+        response = await _register(client, email)
+        if response.status_code not in (201, 400):
+            raise RuntimeError(f"Falha ao preparar contas: {response.status_code} {response.text}")
+    tokens: list[str] = []
+    for email in emails:
+        response = await _login(client, email)
+        response.raise_for_status()
+        tokens.append(response.json()["access_token"])
+    return tokens
+
+
+def _scenario_requests(run_id: str, tokens: list[str]) -> dict[str, Request]:
+    """Requisição de cada cenário para o índice i"""
+    accounts = len(tokens)
+    # Contador próprio: o warmup não pode reutilizar emails da medição
+    registrations = itertools.count()
+    return {
+        "register": lambda client, i: _register(client, f"new-{run_id}-{next(registrations)}@example.com"),
+        "login": lambda client, i: _login(client, f"load-{run_id}-{i % accounts}@example.com"),
+        "me": lambda client, i: client.get(
+            "/auth/me", headers={"Authorization": f"Bearer {tokens[i % accounts]}"}
+        ),
+    }
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient,
+    request: Request,
+    total: int,
+    concurrency: int
+) -> dict[str, Any]:
+    """Executa `total` requisições com `concurrency` workers e resume latência e vazão"""
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await request(client, index)
+                status = str(response.status_code)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "statuses": statuses,
+        "duration_s": round(elapsed, 4),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(max(latencies, default=0.0), 3),
+    }
+
+
+async def run(options: argparse.Namespace) -> dict[str, Any]:
+    """Executa os cenários pedidos e devolve o baseline"""
+    run_id = f"{int(time.time() * 1000):x}"
+    results: dict[str, Any] = {}
+    async with _target(options) as client:
+        tokens = await _prepare(client, run_id, options.accounts)
+        requests = _scenario_requests(run_id, tokens)
+        for scenario in options.scenarios:
+            if options.warmup:
+                await _run_scenario(client, requests[scenario], options.warmup, options.concurrency)
+            results[scenario] = await _run_scenario(
+                client, requests[scenario], options.requests, options.concurrency
+            )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "mode": "url" if options.url else options.mode,
+            "backend": options.backend,
+            "postgrest_latency_s": options.latency if options.backend == "postgrest" else None,
+            "concurrency": options.concurrency,
+            "requests": options.requests,
+            "accounts": options.accounts,
+            "bcrypt_rounds": options.bcrypt_rounds,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """
+    Compara com um baseline anterior e imprime as variações.
+    Regressão: RPS cai ou p95/p99 sobem mais que `threshold` (fração).
+    """
+    regressions: list[str] = []
+    print(f"\nComparação com {baseline['meta'].get('git_revision')} (limite {threshold:.0%})")
+    for key in ("mode", "backend", "concurrency", "bcrypt_rounds", "postgrest_latency_s", "cpu_count"):
+        if current["meta"].get(key) != baseline["meta"].get(key):
+            print(f"  aviso: {key} difere ({baseline['meta'].get(key)} -> {current['meta'].get(key)})")
+    for scenario, result in current["results"].items():
+        previous = baseline["results"].get(scenario)
+        if previous is None:
+            continue
+        for metric, higher_is_better in (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False)):
+            before, after = previous[metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold and metric != "p50_ms":
+                flag = "  REGRESSÃO"
+                regressions.append(f"{scenario}.{metric}")
+            print(f"  {scenario:<9} {metric:<7} {before:>10.2f} -> {after:>10.2f}  {change:>+7.1%}{flag}")
+    return regressions
+
+
+def _print_table(report: dict[str, Any]) -> None:
+    meta = report["meta"]
+    print("=" * 78)
+    print(
+        f"{meta['mode']} / {meta['backend']}  concorrência={meta['concurrency']}  "
+        f"requisições={meta['requests']}  bcrypt={meta['bcrypt_rounds']}  rev={meta['git_revision']}"
+    )
+    print("=" * 78)
+    print(f"{'cenário':<10} {'RPS':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'erros':>6}")
+    for scenario, result in report["results"].items():
+        print(
+            f"{scenario:<10} {result['rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+            f"{result['p99_ms']:>9.2f} {result['max_ms']:>9.2f} {result['errors']:>6}"
+        )
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Teste de carga dos endpoints de autenticação")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--backend", choices=("memory", "postgrest", "sqlite"), default="memory")
+    parser.add_argument("--url", default=None, help="servidor já em execução (ignora --mode e --backend)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-n", "--requests", type=int, default=200, help="requisições por cenário")
+    parser.add_argument("--warmup", type=int, default=20, help="requisições descartadas antes de cada cenário")
+    parser.add_argument("--accounts", type=int, default=20, help="contas usadas por login e /me")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="lista separada por vírgula")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.005, help="latência do PostgREST simulado (s)")
+    parser.add_argument("--output", default=None, help="grava o baseline JSON neste arquivo ('-' = stdout)")
+    parser.add_argument("--compare", default=None, help="baseline JSON anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regressão tolerada (fração)")
+    options = parser.parse_args(argv)
+
+    options.scenarios = [s.strip() for s in options.scenarios.split(",") if s.strip()]
+    unknown = set(options.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"cenários desconhecidos: {', '.join(sorted(unknown))}")
+    return options
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    options = _parse_args(argv)
+    report = asyncio.run(run(options))
+
+    if options.output == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        _print_table(report)
+        if options.output:
+            with open(options.output, "w") as output:
+                json.dump(report, output, indent=2)
+            print(f"\nBaseline gravado em {options.output}")
+
+    if options.compare:
+        with open(options.compare) as previous:
+            regressions = compare(report, json.load(previous), options.threshold)
+        if regressions:
+            print(f"\nRegressões: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Servidor PostgREST simulado (em memória) para testes e benchmarks dos repositórios.
+Implementa o subconjunto da API usado pela aplicação: filtros eq./in.,
+limit, insert (também em lote, com resolution=ignore-duplicates), update e delete, além da
+violação de UNIQUE em users.email (código 23505, status 409).
+
+Uso em processo (sem rede):
+    mock = MockPostgrest()
+    transport = httpx.ASGITransport(app=mock.app)
+    repo = PostgrestUserRepository(base_url="http://mock", api_key="x", transport=transport)
+
+Uso como servidor:
+    python -m benchmarks.mock_postgrest --port 54321 --latency 0.005
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Parâmetros de query que não são filtros de coluna
+_RESERVED_PARAMS = {"select", "limit", "offset", "order", "on_conflict", "columns"}
+# Colunas com restrição UNIQUE por tabela (espelha supabase_schema.sql)
+_UNIQUE_COLUMNS: dict[str, tuple[str, ...]] = {"users": ("email",), "api_keys": ("key_hash",)}
+
+
+class MockPostgrest:
+    """Banco em memória exposto como uma API PostgREST mínima"""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency: float = latency
+        self.tables: dict[str, dict[int, dict[str, Any]]] = {}
+        self.next_ids: dict[str, int] = {}
+        self.request_count: int = 0
+        self.app: Starlette = Starlette(routes=[
+            Route("/rest/v1/{table}", self._handle, methods=["GET", "POST", "PATCH", "DELETE"]),
+        ])
+
+    def _matches(self, row: dict[str, Any], filters: list[tuple[str, str]]) -> bool:
+        """Aplica filtros eq./in. (comparação textual, como na URL)"""
+        for column, expression in filters:
+            value: Optional[str] = None if row.get(column) is None else str(row.get(column))
+            operator, _, operand = expression.partition(".")
+            if operator == "eq":
+                if value != operand:
+                    return False
+            elif operator == "in":
+                options = [item.strip().strip('"') for item in operand.strip("()").split(",")]
+                if value not in options:
+                    return False
+            elif operator == "is" and operand == "null":
+                if value is not None:
+                    return False
+            else:
+                return False
+        return True
+
+    def _select(self, table: str, request: Request) -> list[dict[str, Any]]:
+        """Retorna as linhas da tabela que satisfazem os filtros da query"""
+        filters = [(k, v) for k, v in request.query_params.multi_items() if k not in _RESERVED_PARAMS]
+        rows = [row for row in self.tables.get(table, {}).values() if self._matches(row, filters)]
+        limit: Optional[str] = request.query_params.get("limit")
+        if limit is not None:
+            rows = rows[:int(limit)]
+        return rows
+
+    def _conflict(self, table: str, column: str, value: Any) -> JSONResponse:
+        """Erro equivalente a uma violação de UNIQUE no Postgres"""
+        return JSONResponse(
+            {
+                "code": "23505",
+                "details": f"Key ({column})=({value}) already exists.",
+                "hint": None,
+                "message": f'duplicate key value violates unique constraint "{table}_{column}_key"',
+            },
+            status_code=409,
+        )
+
+    def _representation(self, request: Request, rows: list[dict[str, Any]], status_code: int) -> Response:
+        """Devolve as linhas apenas se o cliente pediu Prefer: return=representation"""
+        if "return=representation" in request.headers.get("prefer", ""):
+            return JSONResponse(rows, status_code=status_code)
+        return Response(status_code=status_code if status_code != 200 else 204)
+
+    async def _handle(self, request: Request) -> Response:
+        """Roteia GET/POST/PATCH/DELETE para a tabela pedida"""
+        self.request_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        table: str = request.path_params["table"]
+        rows_by_id = self.tables.setdefault(table, {})
+
+        if request.method == "GET":
+            return JSONResponse(self._select(table, request))
+
+        if request.method == "DELETE":
+            deleted = self._select(table, request)
+            for row in deleted:
+                rows_by_id.pop(row["id"], None)
+            return self._representation(request, deleted, 200)
+
+        body: Any = json.loads(await request.body() or b"null")
+
+        if request.method == "PATCH":
+            updated = self._select(table, request)
+            for column in _UNIQUE_COLUMNS.get(table, ()):
+                if column in body and any(
+                    r[column] == body[column] and r not in updated for r in rows_by_id.values()
+                ):
+                    return self._conflict(table, column, body[column])
+            now = datetime.now(timezone.utc).isoformat()
+            for row in updated:
+                row.update(body)
+                row["updated_at"] = now
+            return self._representation(request, updated, 200)
+
+        # POST: insere um registro ou uma lista (tudo ou nada, como uma transação);
+        # com resolution=ignore-duplicates, conflitos são descartados (ON CONFLICT DO NOTHING)
+        records: list[dict[str, Any]] = body if isinstance(body, list) else [body]
+        ignore_duplicates = "resolution=ignore-duplicates" in request.headers.get("prefer", "")
+        for column in _UNIQUE_COLUMNS.get(table, ()):
+            seen = {r[column] for r in rows_by_id.values()}
+            accepted: list[dict[str, Any]] = []
+            for record in records:
+                if record.get(column) in seen:
+                    if not ignore_duplicates:
+                        return self._conflict(table, column, record.get(column))
+                    continue
+                seen.add(record.get(column))
+                accepted.append(record)
+            records = accepted
+
+        created: list[dict[str, Any]] = []
+        now = datetime.now(timezone.utc).isoformat()
+        for record in records:
+            row_id = self.next_ids.get(table, 1)
+            self.next_ids[table] = row_id + 1
+            row = {"id": row_id, "created_at": now, "updated_at": now, **record}
+            rows_by_id[row_id] = row
+            created.append(row)
+        return self._representation(request, created, 201)
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="PostgREST simulado em memória")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency", type=float, default=0.0, help="atraso artificial por requisição (s)")
+    args = parser.parse_args()
+
+    mock = MockPostgrest(latency=args.latency)
+    uvicorn.run(mock.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+"""
+import socket
+import threading
+import time
+from types import TracebackType
+from typing import Any, Optional, Type
+
+
+def free_port() -> int:
+    """Reserva uma porta TCP livre em localhost"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+class BackgroundServer:
+    """Executa um app ASGI no uvicorn em uma thread separada (context manager)"""
+
+    def __init__(self, app: Any, port: Optional[int] = None) -> None:
+        import uvicorn
+
+        self.port: int = port or free_port()
+        self.url: str = f"http://127.0.0.1:{self.port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "BackgroundServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType]
+    ) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Percentil por interpolação linear (samples não precisa estar ordenado)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
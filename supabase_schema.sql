@@ -29,6 +29,20 @@ CREATE TRIGGER update_users_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Chaves de API das integrações: só o SHA-256 da chave é guardado
+-- (key_hash UNIQUE: a autenticação é uma busca no índice)
+CREATE TABLE IF NOT EXISTS api_keys (
+    id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name VARCHAR(100) NOT NULL,
+    prefix VARCHAR(16) NOT NULL,
+    key_hash CHAR(64) UNIQUE NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    revoked_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_api_keys_user_id ON api_keys(user_id);
+
 -- Opcional: Configurar Row Level Security (RLS)
 -- Descomente as linhas abaixo se quiser habilitar RLS
 -- ALTER TABLE users ENABLE ROW LEVEL SECURITY;